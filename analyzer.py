@@ -1,7 +1,12 @@
 """Sentiment analysis and categorization of posts"""
-from textblob import TextBlob
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
 import re
+import config
+import metrics
+from keyword_matcher import KeywordMatcher, KEYWORD_LABEL
+from sentiment_backends import TextBlobBackend, get_backend
+from sentiment_cache import SentimentCache
 
 
 class PostAnalyzer:
@@ -21,6 +26,38 @@ class PostAnalyzer:
                        'loading', 'timeout']
     }
     
+    def __init__(self, matcher: KeywordMatcher = None, cache: SentimentCache = None,
+                 backend=None):
+        """
+        Args:
+            matcher: Optional shared keyword automaton (see
+                ``KeywordMatcher.for_tracker``); built from config.KEYWORDS and
+                CATEGORIES if omitted
+            cache: Optional sentiment cache; defaults to the one selected by
+                ``config.SENTIMENT_CACHE``
+            backend: Optional sentiment backend (see ``sentiment_backends``);
+                defaults to ``config.SENTIMENT_BACKEND``
+        """
+        self.matcher = matcher or KeywordMatcher.for_tracker(
+            config.KEYWORDS, self.CATEGORIES, word_boundary=config.KEYWORD_WORD_BOUNDARY
+        )
+        self.cache = cache if cache is not None else SentimentCache.from_config()
+        self.backend = backend or get_backend(config.SENTIMENT_BACKEND)
+        # TextBlob results keep the original cache keys
+        self._cache_namespace = '' if self.backend.name == TextBlobBackend.name else self.backend.name
+        # Worker pool kept between analyze_posts calls (see open_pool)
+        self._pool = None
+        self._pool_workers = 0
+    
+    @staticmethod
+    def _label(polarity: float) -> str:
+        """Map a polarity score to positive/negative/neutral"""
+        if polarity > 0.1:
+            return 'positive'
+        elif polarity < -0.1:
+            return 'negative'
+        return 'neutral'
+    
     def analyze_sentiment(self, text: str) -> Dict:
         """
         Analyze sentiment of text
@@ -31,22 +68,52 @@ class PostAnalyzer:
         Returns:
             Dictionary with sentiment info
         """
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        return self.analyze_sentiments([text])[0]
+    
+    def analyze_sentiments(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze sentiment of a batch of texts
         
-        if polarity > 0.1:
-            sentiment = 'positive'
-        elif polarity < -0.1:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
+        Cache hits are answered directly; all misses are scored by the
+        backend in a single batch.
         
-        return {
-            'sentiment': sentiment,
-            'polarity': round(polarity, 3),
-            'subjectivity': round(subjectivity, 3)
-        }
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Sentiment info dictionaries, in the same order as ``texts``
+        """
+        results = [None] * len(texts)
+        misses = []
+        for idx, text in enumerate(texts):
+            cached = self.cache.get(text, self._cache_namespace) if self.cache is not None else None
+            if cached is not None:
+                results[idx] = dict(cached)
+            else:
+                misses.append(idx)
+        
+        metrics.count('sentiment_cache_hits', len(texts) - len(misses))
+        if misses:
+            for idx, result in zip(misses, self._score([texts[idx] for idx in misses])):
+                results[idx] = result
+        return results
+    
+    def _score(self, texts: List[str]) -> List[Dict]:
+        """Score texts with the backend in one batch (no cache lookups) and cache them"""
+        with metrics.timer('sentiment_scoring'):
+            scores = self.backend.score_batch(texts)
+        metrics.count('sentiment_scored', len(texts))
+        results = []
+        for text, (polarity, subjectivity) in zip(texts, scores):
+            result = {
+                'sentiment': self._label(polarity),
+                'polarity': round(polarity, 3),
+                'subjectivity': round(subjectivity, 3)
+            }
+            results.append(result)
+            if self.cache is not None:
+                self.cache.put(text, result, self._cache_namespace)
+        return results
     
     def categorize_post(self, post: Dict) -> List[str]:
         """
@@ -58,14 +125,16 @@ class PostAnalyzer:
         Returns:
             List of categories
         """
-        text = f"{post['title']} {post['selftext']}".lower()
-        categories = []
-        
-        for category, keywords in self.CATEGORIES.items():
-            if any(keyword in text for keyword in keywords):
-                categories.append(category)
+        return self._scan(post)[1]
+    
+    def _scan(self, post: Dict) -> Tuple[List[str], List[str]]:
+        """The tracked keywords and the categories of a post"""
+        text = f"{post['title']} {post['selftext']}"
+        # One pass over the text finds the keywords and every category's words at once
+        keywords, hits = self.matcher.scan(text, KEYWORD_LABEL)
+        categories = [category for category in self.CATEGORIES if category in hits]
         
-        return categories if categories else ['General']
+        return sorted(keywords), categories if categories else ['General']
     
     def analyze_post(self, post: Dict) -> Dict:
         """
@@ -77,10 +146,17 @@ class PostAnalyzer:
         Returns:
             Enhanced post dictionary with analysis
         """
-        text = f"{post['title']} {post['selftext']}"
-        
-        sentiment_data = self.analyze_sentiment(text)
-        categories = self.categorize_post(post)
+        sentiment_data = self.analyze_sentiment(self._post_text(post))
+        return self._build_analysis(post, sentiment_data)
+    
+    @staticmethod
+    def _post_text(post: Dict) -> str:
+        """Text that sentiment is scored on"""
+        return f"{post['title']} {post['selftext']}"
+    
+    def _build_analysis(self, post: Dict, sentiment_data: Dict) -> Dict:
+        """Combine a post with its sentiment, categories, keywords and priority"""
+        keywords, categories = self._scan(post)
         
         post_copy = post.copy()
         post_copy.update({
@@ -88,6 +164,7 @@ class PostAnalyzer:
             'polarity': sentiment_data['polarity'],
             'subjectivity': sentiment_data['subjectivity'],
             'categories': categories,
+            'keywords': keywords,
             'priority': self._calculate_priority(post, sentiment_data)
         })
         
@@ -117,6 +194,126 @@ class PostAnalyzer:
         
         return 'Low'
     
-    def analyze_posts(self, posts: List[Dict]) -> List[Dict]:
-        """Analyze a list of posts"""
-        return [self.analyze_post(post) for post in posts]
+    @metrics.timed('analyze_posts')
+    def analyze_posts(self, posts: List[Dict], workers: int = None,
+                      chunk_size: int = None) -> List[Dict]:
+        """
+        Analyze a list of posts
+        
+        Args:
+            posts: List of post dictionaries
+            workers: Worker processes (defaults to ``config.ANALYSIS_WORKERS``);
+                1 analyzes serially in this process
+            chunk_size: Posts per batch sent to a worker
+                (defaults to ``config.ANALYSIS_CHUNK_SIZE``)
+            
+        Returns:
+            Analyzed posts, in the same order as ``posts``
+        """
+        workers = config.ANALYSIS_WORKERS if workers is None else workers
+        chunk_size = chunk_size or config.ANALYSIS_CHUNK_SIZE
+        if workers <= 1 or len(posts) <= chunk_size:
+            sentiments = self.analyze_sentiments([self._post_text(post) for post in posts])
+            return [self._build_analysis(post, sentiment_data)
+                    for post, sentiment_data in zip(posts, sentiments)]
+        return self._analyze_parallel(posts, workers, chunk_size)
+    
+    def _analyze_parallel(self, posts: List[Dict], workers: int, chunk_size: int) -> List[Dict]:
+        """
+        Shard cache misses across a process pool; cache hits stay in-process
+        
+        No worker is started unless there are more than ``chunk_size`` misses.
+        """
+        results = [None] * len(posts)
+        pending = []
+        for idx, post in enumerate(posts):
+            cached = (self.cache.get(self._post_text(post), self._cache_namespace)
+                      if self.cache is not None else None)
+            if cached is not None:
+                results[idx] = self._build_analysis(post, dict(cached))
+            else:
+                pending.append(idx)
+        
+        metrics.count('sentiment_cache_hits', len(posts) - len(pending))
+        if len(pending) <= chunk_size:
+            # Mostly cache hits: scoring the rest here beats starting processes
+            sentiments = self._score([self._post_text(posts[idx]) for idx in pending])
+            for idx, sentiment_data in zip(pending, sentiments):
+                results[idx] = self._build_analysis(posts[idx], sentiment_data)
+            return results
+        
+        metrics.count('sentiment_scored', len(pending))
+        chunks = [[posts[idx] for idx in pending[start:start + chunk_size]]
+                  for start in range(0, len(pending), chunk_size)]
+        if self._pool is None and self._pool_workers > 1:
+            self._pool = self._start_pool(self._pool_workers)
+        if self._pool is not None:
+            analyzed = [post for chunk in self._pool.map(_analyze_chunk, chunks) for post in chunk]
+        else:
+            with self._start_pool(workers) as pool:
+                analyzed = [post for chunk in pool.map(_analyze_chunk, chunks) for post in chunk]
+        
+        for idx, post in zip(pending, analyzed):
+            results[idx] = post
+            if self.cache is not None:
+                self.cache.put(self._post_text(post), {
+                    'sentiment': post['sentiment'],
+                    'polarity': post['polarity'],
+                    'subjectivity': post['subjectivity']
+                }, self._cache_namespace)
+        return results
+    
+    def _start_pool(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.backend.name, self.matcher))
+    
+    def open_pool(self, workers: int = None):
+        """
+        Keep a worker pool up for every later ``analyze_posts`` call
+        
+        For long-running processes: the workers load the sentiment lexicon
+        once instead of on every batch. The pool starts with the first batch
+        that has more than a chunk of cache misses, so runs answered from
+        the cache never start processes. No-op with a single worker.
+        """
+        workers = config.ANALYSIS_WORKERS if workers is None else workers
+        if workers > 1:
+            self._pool_workers = workers
+    
+    def close_pool(self):
+        """Shut down the pool kept by ``open_pool`` (if it was ever started)"""
+        self._pool_workers = 0
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    def save_cache(self):
+        """Persist the sentiment cache (if it is disk-backed)"""
+        if self.cache is not None:
+            self.cache.save()
+
+
+# Per-process analyzer used by the batch analysis pool
+_worker_analyzer = None
+
+
+def _init_worker(backend_name: str, matcher: KeywordMatcher):
+    """
+    Build the worker's analyzer once and load the sentiment lexicon up front
+    
+    Args:
+        backend_name: Sentiment backend of the parent analyzer
+        matcher: The parent analyzer's matcher, so workers match the same
+            keywords and word boundaries as a serial run
+    """
+    global _worker_analyzer
+    # Counts made here would never reach the parent's run metrics
+    metrics.stop()
+    _worker_analyzer = PostAnalyzer(matcher=matcher, cache=SentimentCache(),
+                                    backend=get_backend(backend_name))
+    _worker_analyzer.backend.warm_up()
+
+
+def _analyze_chunk(posts: List[Dict]) -> List[Dict]:
+    """Analyze one batch of posts inside a worker process"""
+    return _worker_analyzer.analyze_posts(posts, workers=1)
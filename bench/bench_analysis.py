@@ -0,0 +1,40 @@
+"""Benchmark PostAnalyzer.analyze_posts throughput by worker count
+
+Usage: python bench/bench_analysis.py [--posts 4000] [--workers 1,2,4,8] [--chunk-size 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import PostAnalyzer  # noqa: E402
+from sentiment_cache import SentimentCache  # noqa: E402
+from bench_sentiment_cache import synthetic_posts  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=4000)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--chunk-size', type=int, default=200)
+    args = parser.parse_args()
+
+    posts = synthetic_posts(args.posts)
+    print(f"cpus: {os.cpu_count()}  posts: {len(posts)}  chunk size: {args.chunk_size}")
+    print(f"{'workers':>8} {'seconds':>8} {'posts/s':>9} same")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(',')):
+        # Fresh memory cache per run so every post is really scored
+        analyzer = PostAnalyzer(cache=SentimentCache())
+        start = time.perf_counter()
+        results = analyzer.analyze_posts(posts, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = results
+        print(f"{workers:>8} {elapsed:>8.2f} {len(posts) / elapsed:>9.0f} {results == baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark near-duplicate clustering: speed per run size and accuracy on planted duplicates
+
+Each story is posted several times with a few words changed (a repost in
+another subreddit). Day one is clustered on an empty index, day two (new
+copies of the same stories plus new ones) against the stored index. Recall
+is the share of stories whose copies all land in one cluster, precision the
+share of clusters holding a single story. Short stories with a few words
+changed fall below CLUSTER_THRESHOLD, so recall under 100% is expected.
+
+Usage: python bench/bench_clusters.py [--sizes 1000,10000,50000] [--copies 4] [--edits 2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_clusters import ClusterIndex  # noqa: E402
+from replay_source import VOCABULARY  # noqa: E402
+
+WORDS = VOCABULARY + [f"word{i}" for i in range(5000)]
+
+
+def make_day(rng: random.Random, stories: dict, count: int, copies: int, edits: int, day: int):
+    """``count`` posts: copies of known and new stories, each with a few words changed"""
+    posts = []
+    while len(posts) < count:
+        story = rng.randrange(len(stories) + count // copies) if stories else len(stories)
+        if story not in stories:
+            story = len(stories)
+            stories[story] = [rng.choice(WORDS) for _ in range(rng.randint(12, 60))]
+        for _ in range(copies):
+            words = list(stories[story])
+            for _ in range(edits):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+            posts.append({'id': f"d{day}p{len(posts)}", 'story': story,
+                          'title': ' '.join(words[:10]), 'selftext': ' '.join(words[10:]),
+                          'created_utc': time.time() - (2 - day) * 86400 + len(posts)})
+    return posts[:count]
+
+
+def accuracy(posts):
+    """(recall, precision) of the clusters against the planted stories"""
+    by_story, by_cluster = {}, {}
+    for post in posts:
+        by_story.setdefault(post['story'], set()).add(post['cluster_id'])
+        by_cluster.setdefault(post['cluster_id'], set()).add(post['story'])
+    # Recall: stories kept in a single cluster; precision: clusters holding a single story
+    recall = sum(len(c) == 1 for c in by_story.values()) / len(by_story)
+    precision = sum(len(s) == 1 for s in by_cluster.values()) / len(by_cluster)
+    return recall, precision
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,50000', help='posts per day')
+    parser.add_argument('--copies', type=int, default=4, help='posts per story')
+    parser.add_argument('--edits', type=int, default=2, help='words changed per copy')
+    args = parser.parse_args()
+
+    print(f"{args.copies} copies per story, {args.edits} words changed per copy")
+    print(f"{'posts/day':>9} {'day 1':>8} {'day 2':>8} {'posts/s':>8} {'recall':>7} "
+          f"{'precision':>9} {'joined earlier':>14} {'index':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        rng = random.Random(size)
+        stories = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'clusters.sqlite3')
+            index = ClusterIndex(path)
+            day1 = make_day(rng, stories, size, args.copies, args.edits, 1)
+            first = index.assign(day1)
+            day2 = make_day(rng, stories, size, args.copies, args.edits, 2)
+            second = index.assign(day2)
+            index.close()
+            index_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / 1e6
+        recall, precision = accuracy(day1 + day2)
+        print(f"{size:>9} {first['seconds']:>7.2f}s {second['seconds']:>7.2f}s "
+              f"{size / second['seconds']:>8.0f} {recall:>7.1%} {precision:>9.1%} "
+              f"{second['joined_earlier']:>14} {index_mb:>6.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
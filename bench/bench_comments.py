@@ -0,0 +1,81 @@
+"""Benchmark the cost of comment harvesting for different caps on the replay backend
+
+Reads the threads of --posts posts (50-600 comments each) with each
+combination of "load more" requests per thread and reply depth, and reports
+API requests and seconds per thread, comments read and their share of the
+threads' comments.
+
+Usage: python bench/bench_comments.py [--posts 25] [--latency 0.05] [--workers 1,4]
+                                      [--more 0,2,4,8] [--depths 2,4,8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from analyzer import PostAnalyzer  # noqa: E402
+from comment_harvester import CommentHarvester  # noqa: E402
+from reddit_fetcher import RedditFetcher  # noqa: E402
+from replay_source import ReplayReddit  # noqa: E402
+from sentiment_cache import SentimentCache  # noqa: E402
+
+
+def make_posts(reddit: ReplayReddit, count: int):
+    """Posts with big comment threads (num_comments drives the replayed thread size)"""
+    rng = random.Random(count)
+    submissions = reddit.posts_for('benchcomments')[:count]
+    for submission in submissions:
+        submission.num_comments = rng.randint(50, 600)
+    return [{'id': s.id, 'num_comments': s.num_comments} for s in submissions]
+
+
+def run_once(args, workers: int, more_limit: int, max_depth: int):
+    reddit = ReplayReddit(latency=args.latency, quota=0)
+    posts = make_posts(reddit, args.posts)
+    fetcher = RedditFetcher(reddit=reddit)
+    harvester = CommentHarvester(fetcher, PostAnalyzer(cache=SentimentCache()),
+                                 max_posts=len(posts), more_limit=more_limit,
+                                 max_depth=max_depth, workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = harvester.harvest(posts)
+    wall = time.perf_counter() - start
+    total = sum(post['num_comments'] for post in posts)
+    return summary, wall, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per API request')
+    parser.add_argument('--workers', default='1,4')
+    parser.add_argument('--more', default='0,2,4,8', help='COMMENT_MORE_LIMIT values')
+    parser.add_argument('--depths', default='2,4,8', help='COMMENT_MAX_DEPTH values')
+    args = parser.parse_args()
+    config.API_REQUESTS_PER_MINUTE = 1_000_000
+    config.API_BURST = 1_000_000
+
+    print(f"{args.posts} threads, {args.latency * 1000:.0f}ms per request, "
+          f"{config.COMMENT_LIMIT} comments in the first request")
+    print(f"{'workers':>7} {'more':>5} {'depth':>5} {'req/thread':>10} {'s/thread':>9} "
+          f"{'comments':>9} {'share':>6} {'unread more':>11} {'wall':>7}")
+    for workers in (int(w) for w in args.workers.split(',')):
+        for max_depth in (int(d) for d in args.depths.split(',')):
+            for more_limit in (int(m) for m in args.more.split(',')):
+                summary, wall, total = run_once(args, workers, more_limit, max_depth)
+                threads = summary['threads']
+                print(f"{workers:>7} {more_limit:>5} {max_depth:>5} "
+                      f"{summary['requests'] / threads:>10.1f} "
+                      f"{summary['seconds'] / threads:>8.3f}s {summary['comments']:>9} "
+                      f"{summary['comments'] / total:>6.0%} {summary['more_skipped']:>11} "
+                      f"{wall:>6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
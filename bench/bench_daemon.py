@@ -0,0 +1,144 @@
+"""Benchmark per-run latency: a fresh process per run vs the long-running daemon
+
+"cron" starts a new Python process for every run, as cron or setup_cron.sh
+does: imports, praw clients and OAuth tokens, the seen-ID index, the
+sentiment cache and lexicon and the report templates are all rebuilt.
+"daemon" builds them once (python3 scheduler.py --daemon) and then only runs
+cycles. Both use the replay backend (replay_source.py) with a simulated
+OAuth token fetch and publish a few new posts per subreddit between runs.
+
+Usage: python bench/bench_daemon.py [--runs 5] [--subreddits 16] [--latency 0.05]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+started_process = time.perf_counter()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+STAGES = ('fetch', 'filter', 'analyze', 'save', 'report')
+
+
+def setup(args, data_dir):
+    """Point the tracker at a scratch directory and the replay backend"""
+    from reddit_fetcher import RedditFetcher
+    from replay_source import ReplayReddit
+
+    config.SUBREDDITS = [f"sub{i:03d}" for i in range(args.subreddits)]
+    config.FETCH_WORKERS = args.workers
+    config.API_REQUESTS_PER_MINUTE = 60000
+    config.POST_LIMIT = 100
+    config.DATA_DIR = config.REPORT_DIR = data_dir
+    config.TEMPLATE_CACHE_DIR = os.path.join(data_dir, 'template_cache')
+    config.SEEN_SNAPSHOT_FILE = os.path.join(data_dir, 'seen.snapshot')
+    config.SEEN_LOG_FILE = os.path.join(data_dir, 'seen.log')
+    config.SEEN_POSTS_FILE = ''
+    config.SENTIMENT_CACHE_FILE = os.path.join(data_dir, 'sentiment_cache.json')
+    config.LISTING_CURSORS_FILE = os.path.join(data_dir, 'listing_cursors.json')
+    config.WAREHOUSE_FILE = os.path.join(data_dir, 'posts.sqlite3')
+    config.HISTORY_DATASET = False
+
+    reddit = ReplayReddit(latency=args.latency, posts_per_subreddit=args.posts)
+    RedditFetcher._new_client = staticmethod(lambda: reddit.client(args.token_latency))
+    return reddit
+
+
+def publish(reddit, run):
+    """New posts that appeared since the previous run"""
+    for _ in range(run):
+        for name in config.SUBREDDITS:
+            reddit.add_new_posts(name, 5)
+
+
+def cron_run(args):
+    """Child process: one run from scratch, printed as JSON"""
+    reddit = setup(args, args.data_dir)
+    publish(reddit, args.run)
+    from main import Tracker
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker = Tracker()
+        result = tracker.run()
+    result['timings']['process'] = time.perf_counter() - started_process
+    print(json.dumps(result['timings']))
+
+
+def daemon_runs(args, data_dir):
+    """All runs from one warm Tracker, as the daemon does"""
+    reddit = setup(args, data_dir)
+    from main import Tracker
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        tracker = Tracker(whole_day_report=True)
+        tracker.warm_up()
+        startup = time.perf_counter() - start
+        runs = []
+        for run in range(args.runs):
+            publish(reddit, 1 if run else 0)
+            start = time.perf_counter()
+            timings = tracker.run()['timings']
+            timings['process'] = time.perf_counter() - start
+            runs.append(timings)
+        tracker.close()
+    return startup, runs
+
+
+def print_row(label, timings):
+    stages = ' '.join(f"{timings.get(stage, 0.0):>8.2f}" for stage in STAGES)
+    print(f"  {label:<10} {stages} {timings['total']:>8.2f} {timings['process']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--subreddits', type=int, default=16)
+    parser.add_argument('--posts', type=int, default=100, help='synthetic posts per subreddit')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per API request')
+    parser.add_argument('--token-latency', type=float, default=0.3,
+                        help='seconds for a new client to get an OAuth token')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--run', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run is not None:
+        cron_run(args)
+        return
+
+    header = ' '.join(f"{stage:>8}" for stage in STAGES)
+    print(f"{args.subreddits} subreddits, {args.workers} fetch workers, "
+          f"{args.latency * 1000:.0f}ms per request, {args.token_latency:.1f}s per OAuth token")
+    print(f"  {'run':<10} {header} {'tracker':>8} {'wall':>9}")
+
+    cron = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print("cron (new process per run)")
+        for run in range(args.runs):
+            command = [sys.executable, os.path.abspath(__file__), f'--run={run}',
+                       f'--data-dir={tmp}'] + [
+                f"--{name.replace('_', '-')}={value}" for name, value in vars(args).items()
+                if name not in ('run', 'data_dir')]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            cron.append(json.loads(output.strip().splitlines()[-1]))
+            print_row(f"#{run + 1}", cron[-1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        startup, runs = daemon_runs(args, tmp)
+        print(f"daemon (one process, components ready in {startup:.2f}s)")
+        for run, timings in enumerate(runs):
+            print_row(f"#{run + 1}", timings)
+
+    later = slice(1, None)
+    cron_wall = sum(t['process'] for t in cron[later]) / max(1, len(cron) - 1)
+    daemon_wall = sum(t['process'] for t in runs[later]) / max(1, len(runs) - 1)
+    print(f"runs 2+: {cron_wall:.2f}s per cron run vs {daemon_wall:.2f}s per daemon cycle")
+
+
+if __name__ == '__main__':
+    main()
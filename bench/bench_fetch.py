@@ -0,0 +1,81 @@
+"""Benchmark sequential vs concurrent fetch_all_subreddits on the replay backend
+
+Also measures how much the `new` listing cursors save on a follow-up run.
+
+Usage: python bench/bench_fetch.py [--latency 0.05] [--counts 4,16,64]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from reddit_fetcher import RedditFetcher  # noqa: E402
+from replay_source import ReplayReddit  # noqa: E402
+
+
+def run_once(subreddits, workers, latency):
+    """Fetch all subreddits once and return (seconds, posts, requests)"""
+    config.SUBREDDITS = subreddits
+    config.FETCH_WORKERS = workers
+    random.seed(len(subreddits))  # same shuffle and budgets in both modes
+    reddit = ReplayReddit(latency=latency)
+    fetcher = RedditFetcher(reddit=reddit)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        posts = fetcher.fetch_all_subreddits()
+    return time.perf_counter() - start, posts, fetcher.limiter.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per API request')
+    parser.add_argument('--counts', default='4,16,64', help='subreddit counts to test')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rpm', type=int, default=6000,
+                        help='API_REQUESTS_PER_MINUTE (fallback pacing before rate-limit headers arrive)')
+    args = parser.parse_args()
+
+    config.API_REQUESTS_PER_MINUTE = args.rpm
+    config.POST_LIMIT = 100
+
+    print(f"{'subs':>5} {'sequential':>11} {'concurrent':>11} {'speedup':>8} "
+          f"{'requests':>9} {'throttled':>10} {'waited':>7} same")
+    for count in (int(c) for c in args.counts.split(',')):
+        subreddits = [f"sub{i:03d}" for i in range(count)]
+        seq_time, seq_posts, _ = run_once(subreddits, 1, args.latency)
+        con_time, con_posts, stats = run_once(subreddits, args.workers, args.latency)
+        same = [p['id'] for p in seq_posts] == [p['id'] for p in con_posts]
+        print(f"{count:>5} {seq_time:>10.2f}s {con_time:>10.2f}s "
+              f"{seq_time / con_time:>7.1f}x {stats['requests_sent']:>9} "
+              f"{stats['requests_throttled']:>10} {stats['seconds_waited']:>6.1f}s {same}")
+
+    incremental(args.latency, args.workers)
+
+
+def incremental(latency, workers, subreddit_count=16):
+    """API cost of a follow-up run, by number of posts published in between"""
+    config.SUBREDDITS = [f"sub{i:03d}" for i in range(subreddit_count)]
+    config.FETCH_WORKERS = workers
+    print()
+    print(f"{'new/sub':>8} {'requests':>9} {'items':>7} {'matched':>8}")
+    for new_per_sub in (0, 5, 50, 200):
+        reddit = ReplayReddit(latency=latency)
+        fetcher = RedditFetcher(reddit=reddit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetcher.fetch_all_subreddits()  # Establishes the cursors
+            for name in config.SUBREDDITS:
+                reddit.add_new_posts(name, new_per_sub)
+            before = (reddit.requests, reddit.items_served)
+            posts = fetcher.fetch_all_subreddits()
+        print(f"{new_per_sub:>8} {reddit.requests - before[0]:>9} "
+              f"{reddit.items_served - before[1]:>7} {len(posts):>8}")
+
+
+if __name__ == '__main__':
+    main()
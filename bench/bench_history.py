@@ -0,0 +1,118 @@
+"""Benchmark loading a year of history: daily JSON files vs the columnar dataset
+
+Each load runs in a fresh interpreter, and the peak RSS counter is reset
+right before it (Linux), so the memory column is the load's own high-water mark.
+
+Usage: python bench/bench_history.py [--days 365] [--per-day 300]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from history import HistoryDataset  # noqa: E402
+from bench_warehouse import analyzed_posts, write_json  # noqa: E402
+
+TREND_COLUMNS = ['subreddit', 'created_utc', 'sentiment', 'polarity', 'priority', 'categories']
+
+
+def rss_mb(field):
+    with open('/proc/self/status') as f:
+        return int(re.search(rf'{field}:\s+(\d+)', f.read()).group(1)) / 1024
+
+
+def reset_peak_rss():
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def load_json(root, start=None):
+    """The analysts' current path: parse every day, then build a frame"""
+    records = []
+    for path in sorted(glob.glob(os.path.join(root, 'posts_*.json'))):
+        if start and os.path.basename(path)[6:16] < start:
+            continue
+        with open(path) as f:
+            records.extend(json.load(f)['posts'])
+    return pd.DataFrame.from_records(records)[TREND_COLUMNS]
+
+
+def dir_size(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def cases(tmp, last_month):
+    json_root = os.path.join(tmp, 'json')
+    parquet = HistoryDataset(os.path.join(tmp, 'parquet'), use_parquet=True)
+    pickle = HistoryDataset(os.path.join(tmp, 'pickle'), use_parquet=False)
+    return {
+        'json, full year': lambda: load_json(json_root),
+        'parquet, full year': lambda: parquet.load(TREND_COLUMNS),
+        'pickle, full year': lambda: pickle.load(TREND_COLUMNS),
+        'json, last 30 days': lambda: load_json(json_root, last_month),
+        'parquet, last 30 days': lambda: parquet.load(TREND_COLUMNS, start=last_month),
+        'pickle, last 30 days': lambda: pickle.load(TREND_COLUMNS, start=last_month),
+    }
+
+
+def run_case(tmp, last_month, label):
+    """Child process: one load, reporting seconds, peak RSS growth and frame size"""
+    func = cases(tmp, last_month)[label]
+    baseline = rss_mb('VmRSS')
+    reset_peak_rss()
+    start = time.perf_counter()
+    frame = func()
+    elapsed = time.perf_counter() - start
+    peak = rss_mb('VmHWM') - baseline
+    frame_mb = frame.memory_usage(deep=True).sum() / 1e6
+    print(json.dumps([elapsed, peak, frame_mb, len(frame)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=300)
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    parser.add_argument('--since', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        run_case(args.root, args.since, args.case)
+        return
+
+    by_day = analyzed_posts(args.days, args.per_day)
+    last_month = sorted(by_day)[-30]
+    print(f"{args.days * args.per_day} posts over {args.days} days")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_root = os.path.join(tmp, 'json')
+        os.makedirs(json_root)
+        write_json(json_root, by_day)
+        datasets = {'parquet': HistoryDataset(os.path.join(tmp, 'parquet'), use_parquet=True),
+                    'pickle': HistoryDataset(os.path.join(tmp, 'pickle'), use_parquet=False)}
+        for dataset in datasets.values():
+            for date_str, posts in by_day.items():
+                dataset.write(posts, date_str)
+
+        print(f"  on disk: json {dir_size(json_root) / 1e6:.1f} MB, " + ', '.join(
+            f"{name} {dir_size(d.root) / 1e6:.1f} MB" for name, d in datasets.items()))
+        print()
+        print(f"  {'load':<24} {'seconds':>8} {'peak RSS +MB':>13} {'frame MB':>9} {'rows':>8}")
+        for label in cases(tmp, last_month):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--case', label, '--root', tmp,
+                 '--since', last_month], capture_output=True, text=True, check=True).stdout
+            seconds, peak, frame_mb, rows = json.loads(output.strip().splitlines()[-1])
+            print(f"  {label:<24} {seconds:>8.2f} {peak:>13.1f} {frame_mb:>9.1f} {rows:>8}")
+
+
+if __name__ == '__main__':
+    main()
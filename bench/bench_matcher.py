@@ -0,0 +1,95 @@
+"""Microbenchmark: Aho-Corasick matcher vs per-keyword substring loops
+
+Compares the old fetcher check (any(kw in text)) plus the old analyzer
+categorisation (one any() loop per category) against a single scan() per
+post with the substring fallback and with the automaton, and shows which
+of the two KeywordMatcher.for_tracker picks at each size.
+
+Usage: python bench/bench_matcher.py [--posts 2000] [--sizes 10,100,1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import KeywordMatcher, SubstringMatcher  # noqa: E402
+
+CATEGORY_COUNT = 5
+
+
+def make_vocabulary(rng, size):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return list({''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+                 for _ in range(size)})
+
+
+def make_posts(rng, vocabulary, count):
+    """Titles plus ~500 characters of selftext, like stored posts"""
+    posts = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(90)]
+        posts.append(' '.join(words[:10]) + ' ' + ' '.join(words[10:])[:500])
+    return posts
+
+
+def old_loops(posts, keywords, categories):
+    hits = 0
+    for text in posts:
+        text = text.lower()
+        if any(keyword in text for keyword in keywords):
+            hits += 1
+        for category_keywords in categories.values():
+            if any(keyword in text for keyword in category_keywords):
+                hits += 1
+    return hits
+
+
+def scan_all(posts, matcher):
+    hits = 0
+    for text in posts:
+        _, labels = matcher.scan(text)
+        hits += len(labels)
+    return hits
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--sizes', default='10,100,1000', help='keyword counts to test')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, 20000)
+    posts = make_posts(rng, vocabulary, args.posts)
+
+    print(f"{'keywords':>9} {'loops':>9} {'substring':>10} {'automaton':>10} {'build':>8} "
+          f"{'picked':>10} same")
+    for size in (int(s) for s in args.sizes.split(',')):
+        # Half the keywords drive the fetcher, half are spread over the categories
+        keywords = rng.sample(vocabulary, size)
+        search = keywords[:max(1, size // 2)]
+        categories = {f"cat{i}": keywords[size // 2:][i::CATEGORY_COUNT] for i in range(CATEGORY_COUNT)}
+
+        picked = KeywordMatcher.for_tracker(search, categories)
+        build_time, automaton = timed(KeywordMatcher, dict(zip(picked.keywords, picked.labels)))
+        substring = SubstringMatcher(dict(zip(picked.keywords, picked.labels)))
+        loop_time, loop_hits = timed(old_loops, posts, search, categories)
+        sub_time, sub_hits = timed(scan_all, posts, substring)
+        ac_time, ac_hits = timed(scan_all, posts, automaton)
+        name = 'substring' if isinstance(picked, SubstringMatcher) else 'automaton'
+        print(f"{size:>9} {loop_time * 1000:>7.1f}ms {sub_time * 1000:>8.1f}ms {ac_time * 1000:>8.1f}ms "
+              f"{build_time * 1000:>6.1f}ms {name:>10} "
+              f"{loop_hits == sub_hits == ac_hits}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark the cost of the run metrics, disabled and enabled
+
+Per call: a bare function vs the same function under ``metrics.timed``, and
+``metrics.count``, with recording off and on. Per run: the tracker on the
+replay backend (as in bench_daemon.py) with METRICS off and on.
+
+Usage: python bench/bench_metrics.py [--runs 5] [--subreddits 16] [--calls 200000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import metrics  # noqa: E402
+from bench_daemon import publish, setup  # noqa: E402
+
+
+def per_call(calls: int):
+    def bare():
+        return None
+
+    wrapped = metrics.timed('bench')(bare)
+    rows = [('bare function', None, bare)]
+    for enabled in (False, True):
+        label = 'on' if enabled else 'off'
+        rows.append((f'metrics.timed ({label})', enabled, wrapped))
+        rows.append((f'metrics.count ({label})', enabled, lambda: metrics.count('bench')))
+    for label, enabled, func in rows:
+        metrics.start_run(enabled=bool(enabled))
+        seconds = min(timeit.repeat(func, number=calls, repeat=5))
+        print(f"  {label:<22} {seconds / calls * 1e9:>7.0f} ns per call")
+    metrics.stop()
+
+
+def per_run(args, enabled: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        reddit = setup(args, tmp)
+        config.METRICS = enabled
+        config.METRICS_FILE = os.path.join(tmp, 'metrics.jsonl')
+        from main import Tracker
+        seconds = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = Tracker(whole_day_report=True)
+            tracker.warm_up()
+            for run in range(args.runs + 1):
+                publish(reddit, 1 if run else 0)
+                start = time.perf_counter()
+                tracker.run()
+                seconds.append(time.perf_counter() - start)
+            tracker.close()
+    # The first run fetches and analyzes every post; later ones only the new
+    return seconds[0], statistics.median(seconds[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--subreddits', type=int, default=16)
+    parser.add_argument('--posts', type=int, default=100, help='synthetic posts per subreddit')
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+    args.latency, args.token_latency, args.workers = 0.0, 0.0, 4
+
+    print("per call")
+    per_call(args.calls)
+    print(f"per run ({args.subreddits} subreddits, {args.posts} posts each, no API latency)")
+    for enabled in (False, True, False, True):
+        first, later = per_run(args, enabled)
+        print(f"  METRICS={str(enabled).lower():<5}  first run {first:.3f}s, "
+              f"later runs {later:.3f}s (median of {args.runs})")
+
+
+if __name__ == '__main__':
+    main()
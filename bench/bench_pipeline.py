@@ -0,0 +1,90 @@
+"""Benchmark the batch vs streaming run pipeline on the replay backend
+
+Runs main's fetch -> filter -> analyze stage in both modes, each in a fresh
+process, and reports time to the first analyzed post, total time and peak RSS.
+
+Usage: python bench/bench_pipeline.py [--subreddits 32] [--latency 0.1] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+
+def run_mode(mode, args):
+    """Child process: one collect run, printed as JSON"""
+    from main import collect_batch, collect_streaming, peak_rss_mb
+    from analyzer import PostAnalyzer
+    from data_manager import DataManager
+    from reddit_fetcher import RedditFetcher
+    from sentiment_backends import get_backend
+    from replay_source import ReplayReddit
+
+    config.SUBREDDITS = [f"sub{i:03d}" for i in range(args.subreddits)]
+    config.FETCH_WORKERS = args.workers
+    config.API_REQUESTS_PER_MINUTE = 60000
+    config.POST_LIMIT = 150
+    config.HISTORY_DATASET = False
+    config.SENTIMENT_CACHE = 'off'
+    random.seed(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.SEEN_SNAPSHOT_FILE = os.path.join(tmp, 'seen.snapshot')
+        config.SEEN_LOG_FILE = os.path.join(tmp, 'seen.log')
+        config.SEEN_POSTS_FILE = ''
+        data_manager = DataManager()
+        fetcher = RedditFetcher(reddit=ReplayReddit(latency=args.latency,
+                                                  posts_per_subreddit=args.posts))
+        backend = get_backend(args.backend)
+        backend.warm_up()
+        analyzer = PostAnalyzer(backend=backend)
+        collect = collect_streaming if mode == 'stream' else collect_batch
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            posts, first = collect(fetcher, data_manager, analyzer, started)
+        total = time.perf_counter() - started
+    print(json.dumps({'first': first, 'total': total, 'posts': len(posts),
+                      'peak': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subreddits', type=int, default=32)
+    parser.add_argument('--posts', type=int, default=300, help='synthetic posts per subreddit')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds per API request')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--backend', default='textblob')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args)
+        return
+
+    print(f"{args.subreddits} subreddits, {args.workers} fetch workers, "
+          f"{args.latency * 1000:.0f}ms per request, {args.backend} sentiment")
+    print(f"{'mode':>7} {'first post':>11} {'total':>8} {'posts':>7} {'peak RSS':>9}")
+    results = {}
+    for mode in ('batch', 'stream'):
+        command = [sys.executable, os.path.abspath(__file__), '--mode', mode] + [
+            f"--{name}={value}" for name, value in vars(args).items() if name != 'mode']
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = results[mode] = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>7} {result['first']:>10.2f}s {result['total']:>7.2f}s "
+              f"{result['posts']:>7} {result['peak']:>6.0f} MB")
+    same = results['batch']['posts'] == results['stream']['posts']
+    print(f"same posts in both modes: {same}")
+
+
+if __name__ == '__main__':
+    main()
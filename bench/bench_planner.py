@@ -0,0 +1,166 @@
+"""Benchmark fixed vs velocity-planned fetching on simulated subreddits
+
+Subreddits get very different post rates (a few busy ones, many quiet ones)
+and keyword hit rates. Posts arrive on a simulated clock and the tracker runs
+every --interval hours for --days days, once with the fixed plan (every
+subreddit, POST_LIMIT +/- 10) and once with FETCH_PLANNER=velocity under the
+same request budget. Coverage is exact: the simulation knows every keyword
+match that was posted before the last run.
+
+Usage: python bench/bench_planner.py [--subreddits 30] [--days 3] [--interval 2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from reddit_fetcher import RedditFetcher  # noqa: E402
+from subreddit_planner import MAX_LISTING_DEPTH, SubredditPlanner  # noqa: E402
+from replay_source import base36  # noqa: E402
+
+KEYWORD_WORDS = ['bug', 'broken', 'problem', 'issue', 'request']
+OTHER_WORDS = ['today', 'phone', 'screen', 'battery', 'account', 'great', 'love', 'new']
+
+
+class SimSubmission:
+    def __init__(self, serial: int, subreddit: str, created: float, matches: bool,
+                 rng: random.Random):
+        self.id = base36(serial + 10_000_000)
+        self.name = f"t3_{self.id}"
+        words = rng.sample(OTHER_WORDS, 5) + ([rng.choice(KEYWORD_WORDS)] if matches else [])
+        self.title = ' '.join(words)
+        self.selftext = ''
+        self.author = 'user'
+        self.subreddit = subreddit
+        self.created_utc = created
+        self.score = self.num_comments = 0
+        self.permalink = f"/r/{subreddit}/comments/{self.id}/"
+        self.upvote_ratio = 1.0
+        self.is_self = True
+
+
+class SimSubreddit:
+    def __init__(self, reddit, name: str):
+        self._reddit = reddit
+        self._name = name
+
+    def _listing(self, limit: int = 100, params=None):
+        self._reddit.requests += 1
+        posts = self._reddit.listing(self._name)
+        start = 0
+        after = (params or {}).get('after')
+        if after:
+            start = next((i + 1 for i, p in enumerate(posts) if p.name == after), len(posts))
+        return iter(posts[start:start + min(limit, 100)])
+
+    new = hot = rising = _listing
+
+    def __str__(self):
+        return self._name
+
+
+class SimReddit:
+    """Posts arrive per subreddit as a Poisson process on a simulated clock"""
+
+    def __init__(self, rates, hit_rates, seed: int = 7):
+        self.rates = rates            # {subreddit: posts per hour}
+        self.hit_rates = hit_rates    # {subreddit: share matching the keywords}
+        self.now = 1_700_000_000.0
+        self.requests = 0
+        self.auth = None
+        self._rng = random.Random(seed)
+        self._posts = {name: [] for name in rates}   # newest first
+        self._serial = 0
+        self.matching = {}            # id -> subreddit, every keyword match posted
+
+    def advance(self, hours: float):
+        end = self.now + hours * 3600
+        for name, rate in self.rates.items():
+            created = self.now
+            arrivals = []
+            while True:
+                created += self._rng.expovariate(rate / 3600)
+                if created >= end:
+                    break
+                self._serial += 1
+                matches = self._rng.random() < self.hit_rates[name]
+                post = SimSubmission(self._serial, name, created, matches, self._rng)
+                arrivals.append(post)
+                if matches:
+                    self.matching[post.id] = name
+            self._posts[name] = (arrivals[::-1] + self._posts[name])[:MAX_LISTING_DEPTH]
+        self.now = end
+
+    def listing(self, name: str):
+        return self._posts[name]
+
+    def subreddit(self, name: str) -> SimSubreddit:
+        return SimSubreddit(self, name)
+
+
+def simulate(mode: str, args, rates, hit_rates):
+    reddit = SimReddit(rates, hit_rates)
+    config.FETCH_PLANNER = mode
+    planner = SubredditPlanner(path='', clock=lambda: reddit.now) if mode == 'velocity' else None
+    fetcher = RedditFetcher(reddit=reddit, planner=planner)
+    fetcher._rate_limits = lambda: {}
+    random.seed(1)
+
+    fetched = set()
+    runs = int(args.days * 24 / args.interval)
+    for _ in range(runs):
+        reddit.advance(args.interval)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetched.update(post['id'] for post in fetcher.fetch_all_subreddits())
+
+    return reddit, fetched, runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subreddits', type=int, default=30)
+    parser.add_argument('--days', type=float, default=3)
+    parser.add_argument('--interval', type=float, default=2, help='hours between runs')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    # Heavy-tailed activity: a few subreddits produce most of the posts
+    rates = {f"sub{i:02d}": round(400 * rng.paretovariate(1.2) / (i + 1) ** 1.5, 2)
+             for i in range(args.subreddits)}
+    hit_rates = {name: rng.uniform(0.05, 0.4) for name in rates}
+    config.SUBREDDITS = list(rates)
+    config.POST_LIMIT = 100
+    config.FETCH_WORKERS = 1
+    config.API_REQUESTS_PER_MINUTE = 10 ** 9
+    config.API_BURST = 10 ** 9
+    config.FETCH_REQUEST_BUDGET = 2 * args.subreddits
+
+    total_rate = sum(rates.values())
+    print(f"{args.subreddits} subreddits, {total_rate:.0f} posts/h in total "
+          f"(busiest {max(rates.values()):.0f}/h, quietest {min(rates.values()):.2f}/h), "
+          f"a run every {args.interval:g}h for {args.days:g} days")
+    print(f"{'plan':>9} {'requests':>9} {'per run':>8} | {'matches fetched':>15} "
+          f"{'posted':>7} {'coverage':>9} | {'busiest 3':>9} {'others':>7}")
+    busiest = sorted(rates, key=rates.get, reverse=True)[:3]
+    for mode in ('fixed', 'velocity'):
+        reddit, fetched, runs = simulate(mode, args, rates, hit_rates)
+        posted = reddit.matching
+        covered = sum(1 for post_id in posted if post_id in fetched)
+
+        def share(names):
+            ids = [post_id for post_id, name in posted.items() if name in names]
+            return sum(1 for post_id in ids if post_id in fetched) / len(ids) if ids else 1.0
+
+        others = [name for name in rates if name not in busiest]
+        print(f"{mode:>9} {reddit.requests:>9} {reddit.requests / runs:>8.1f} | {covered:>15} "
+              f"{len(posted):>7} {covered / len(posted):>9.1%} | {share(busiest):>9.1%} "
+              f"{share(others):>7.1%}")
+
+
+if __name__ == '__main__':
+    main()
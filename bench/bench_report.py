@@ -0,0 +1,88 @@
+"""Benchmark the streaming report writer against building the page in memory
+
+Peak memory is what the report step allocates on top of the input posts
+(tracemalloc), so it shows the size of the page copies held while writing.
+
+The second table compares the single-file report with the paged one
+(REPORT_MODE=paged): bytes a browser must load before showing the first page,
+and how many post cards it builds up front and touches per filter click.
+No browser is driven here, so those are structural counts, not paint timings.
+
+Usage: python bench/bench_report.py [--counts 1000,10000,100000]
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from report_generator import ReportGenerator  # noqa: E402
+from bench_warehouse import analyzed_posts  # noqa: E402
+from legacy_report import LegacyReportGenerator  # noqa: E402
+
+
+def in_memory_report(posts, date_str):
+    """The original generate_report: join every card, format the page, write once"""
+    return LegacyReportGenerator().generate_report(posts, date_str)
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, os.path.getsize(path) / 1e6
+
+
+def paged_sizes(report_path):
+    """(total bytes, bytes needed for the first page) of a paged report"""
+    shards = sorted(glob.glob(report_path[:-len('.html')] + '_posts/shard_*.js'))
+    total = os.path.getsize(report_path) + sum(os.path.getsize(path) for path in shards)
+    first_page = os.path.getsize(report_path) + (os.path.getsize(shards[0]) if shards else 0)
+    return total, first_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--counts', default='1000,10000,100000')
+    args = parser.parse_args()
+
+    generator = ReportGenerator()
+    print(f"{'posts':>7} {'page MB':>8} | {'in-memory':>10} {'peak MB':>8} | "
+          f"{'streaming':>10} {'peak MB':>8}")
+    paged = []
+    with tempfile.TemporaryDirectory() as tmp:
+        config.REPORT_DIR = tmp
+        for count in (int(c) for c in args.counts.split(',')):
+            days = max(1, count // 1000)
+            posts = [p for day in analyzed_posts(days, count // days).values() for p in day]
+
+            old_time, old_peak, size = measure(lambda: in_memory_report(posts, 'old'))
+            new_time, new_peak, _ = measure(lambda: generator.generate_report(posts, 'new'))
+            print(f"{count:>7} {size:>8.1f} | {old_time:>9.2f}s {old_peak:>8.1f} | "
+                  f"{new_time:>9.2f}s {new_peak:>8.1f}")
+
+            start = time.perf_counter()
+            paged_path = generator.generate_paged_report(posts, 'paged')
+            paged.append((count, size, time.perf_counter() - start, new_time,
+                          *paged_sizes(paged_path)))
+
+        print()
+        print(f"{'posts':>7} | {'single MB':>9} {'paged MB':>9} {'1st page MB':>11} | "
+              f"{'cards built':>13} {'per click':>13} | {'write single':>12} {'paged':>7}")
+        for count, size, paged_time, single_time, total, first_page in paged:
+            cards = min(count, config.REPORT_PAGE_SIZE)
+            print(f"{count:>7} | {size:>9.2f} {total / 1e6:>9.2f} {first_page / 1e6:>11.3f} | "
+                  f"{count:>6} vs {cards:<3} {count:>6} vs {cards:<3} | "
+                  f"{single_time:>11.2f}s {paged_time:>6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark the rolling N-day report with and without the fragment cache
+
+Saves synthetic daily posts_*.json files, then builds the rolling report for
+consecutive end dates, as a daily run would. Each day is built twice: with
+every card rendered from scratch (what generate_report does) and with the
+fragment cache left by the previous day. A share of the window's posts has
+its score bumped every day, so those cards must be rendered again.
+
+Usage: python bench/bench_rolling_report.py [--window 7] [--per-day 500] [--runs 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+from fragment_cache import FragmentCache  # noqa: E402
+from report_generator import ReportGenerator  # noqa: E402
+from bench_warehouse import START, analyzed_posts, write_json  # noqa: E402
+
+
+def build(generator, posts, window, end_date):
+    """(seconds, fragment cache stats) of one rolling report"""
+    stats = {}
+    original = FragmentCache.save
+
+    def save(cache):
+        stats.update(cache.stats())
+        original(cache)
+
+    FragmentCache.save = save
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = generator.generate_rolling_report(posts, window, end_date)
+        return time.perf_counter() - start, stats, path
+    finally:
+        FragmentCache.save = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--per-day', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=5, help='consecutive days to report on')
+    parser.add_argument('--changed', type=float, default=0.05,
+                        help='share of posts whose score changes each day')
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    generator = ReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_DIR = config.REPORT_DIR = tmp
+        config.TEMPLATE_CACHE_DIR = os.path.join(tmp, 'template_cache')
+        config.FRAGMENT_CACHE_FILE = os.path.join(tmp, 'report_fragments.sqlite3')
+        config.STORAGE_BACKEND = 'json'
+        config.HISTORY_DATASET = False
+        write_json(tmp, analyzed_posts(args.window + args.runs, args.per_day))
+        data_manager = DataManager()
+
+        print(f"{args.window}-day window, {args.per_day} posts/day, "
+              f"{args.changed:.0%} of posts change per day")
+        print(f"{'end date':>10} {'posts':>6} | {'scratch':>9} | {'cached':>8} {'reused':>7} "
+              f"{'rendered':>8} {'hit rate':>8} | {'same html':>9}")
+        for run in range(args.runs):
+            start_date = (START + timedelta(days=run)).strftime('%Y-%m-%d')
+            end_date = (START + timedelta(days=args.window - 1 + run)).strftime('%Y-%m-%d')
+            posts = data_manager.load_recent_posts(args.window, end_date)
+            for post in rng.sample(posts, int(len(posts) * args.changed)):
+                post['score'] += 1
+
+            # What generate_report does: every card rendered from scratch
+            start = time.perf_counter()
+            path = generator._render_single_file(posts, f"{start_date} to {end_date}", 'scratch')
+            cold = time.perf_counter() - start
+            with open(path, 'rb') as f:
+                cold_html = f.read()
+
+            warm, stats, path = build(generator, posts, args.window, end_date)
+            with open(path, 'rb') as f:
+                same = f.read() == cold_html
+            print(f"{end_date:>10} {len(posts):>6} | {cold:>8.3f}s | {warm:>7.3f}s "
+                  f"{stats['hits']:>7} {stats['misses']:>8} {stats['hit_rate']:>8.0%} | {str(same):>9}")
+        print(f"fragment cache file: {os.path.getsize(config.FRAGMENT_CACHE_FILE) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
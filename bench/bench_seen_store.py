@@ -0,0 +1,137 @@
+"""Benchmark seen_posts.json vs the snapshot + log seen-ID store
+
+For each size, measures startup load time, the per-run write cost of
+marking a typical batch of new posts as seen, memory held by the index and
+the cost of filtering a fetched batch (half new, half seen) against it.
+
+Usage: python bench/bench_seen_store.py [--sizes 10000,100000,1000000] [--batch 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seen_store import SeenStore, encode_id  # noqa: E402
+
+
+def reddit_ids(count, rng):
+    """Realistic base36 post IDs (6-7 characters)"""
+    start = int('1a0000', 36)
+    return [encode_id(n) for n in rng.sample(range(start, start + count * 20), count)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def bench_json(tmp, ids, batch):
+    path = os.path.join(tmp, 'seen_posts.json')
+    with open(path, 'w') as f:
+        json.dump({'seen_ids': ids}, f, indent=2)
+
+    def load():
+        with open(path) as f:
+            return set(json.load(f)['seen_ids'])
+
+    def write():
+        # The old mark_as_seen: add, then rewrite everything
+        seen.update(batch)
+        with open(path, 'w') as f:
+            json.dump({'seen_ids': list(seen)}, f, indent=2)
+
+    load_time, seen = timed(load)
+    write_time, _ = timed(write)
+    return load_time, write_time, os.path.getsize(path)
+
+
+def set_memory(ids):
+    """Bytes allocated for the old in-memory set of strings"""
+    text = json.dumps(ids)
+    tracemalloc.start()
+    seen = set(json.loads(text))  # fresh str objects, as when loading the JSON file
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del seen
+    return size
+
+
+def bench_lookups(tmp, ids, batch, rounds=20):
+    """Seconds to filter one fetched batch: old set vs index vs index + Bloom filter"""
+    fetched = ids[:len(batch)] + batch
+    seen = set(ids)
+    results = []
+    set_time, _ = timed(lambda: [[i for i in fetched if i not in seen] for _ in range(rounds)])
+    results.append(set_time / rounds)
+    memory = []
+    for bloom in (False, True):
+        store = SeenStore(snapshot_file=os.path.join(tmp, 'seen.snapshot'),
+                          log_file=os.path.join(tmp, 'seen.log'), legacy_file='', bloom=bloom)
+        lookup_time, _ = timed(lambda: [store.contains_many(fetched) for _ in range(rounds)])
+        results.append(lookup_time / rounds)
+        memory.append(store.memory_bytes())
+    return results, memory
+
+
+def bench_store(tmp, ids, batch):
+    legacy = os.path.join(tmp, 'seen_posts.json')
+    with open(legacy, 'w') as f:
+        json.dump({'seen_ids': ids}, f)
+    paths = dict(snapshot_file=os.path.join(tmp, 'seen.snapshot'),
+                 log_file=os.path.join(tmp, 'seen.log'), legacy_file=legacy)
+
+    migrate_time, _ = timed(lambda: SeenStore(**paths))
+    load_time, store = timed(lambda: SeenStore(**paths))
+    write_time, _ = timed(lambda: store.add_many(batch))
+    compact_time, _ = timed(store.compact)
+    return migrate_time, load_time, write_time, compact_time, os.path.getsize(paths['snapshot_file'])
+
+
+def megabytes(size):
+    return f"{size / 1e6:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--batch', type=int, default=200, help='new IDs marked per run')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    sizes = [int(s) for s in args.sizes.split(',')]
+    print("Load and write")
+    print(f"{'ids':>8} | {'json load':>9} {'json write':>10} {'json MB':>7} | "
+          f"{'migrate':>7} {'load':>7} {'write':>7} {'compact':>7} {'snap MB':>7}")
+    rows = []
+    for size in sizes:
+        ids = reddit_ids(size + args.batch, rng)
+        existing, batch = ids[:size], ids[size:]
+        with tempfile.TemporaryDirectory() as tmp:
+            json_load, json_write, json_size = bench_json(tmp, existing, batch)
+        with tempfile.TemporaryDirectory() as tmp:
+            migrate, load, write, compact, snap_size = bench_store(tmp, existing, batch)
+            lookups, memory = bench_lookups(tmp, existing, batch)
+        rows.append((size, set_memory(existing), memory, lookups))
+        print(f"{size:>8} | {json_load:>8.3f}s {json_write:>9.3f}s {json_size / 1e6:>7.1f} | "
+              f"{migrate:>6.3f}s {load:>6.3f}s {write * 1000:>5.1f}ms {compact:>6.3f}s "
+              f"{snap_size / 1e6:>7.1f}")
+
+    print()
+    print(f"Memory and filtering {2 * args.batch} fetched IDs")
+    print(f"{'ids':>8} | {'set':>8} {'index':>8} {'+bloom':>8} | "
+          f"{'set':>8} {'index':>8} {'+bloom':>8}")
+    for size, set_size, (index_size, bloom_size), (set_time, index_time, bloom_time) in rows:
+        print(f"{size:>8} | {megabytes(set_size):>8} {megabytes(index_size):>8} "
+              f"{megabytes(bloom_size):>8} | {set_time * 1000:>6.2f}ms "
+              f"{index_time * 1000:>6.2f}ms {bloom_time * 1000:>6.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
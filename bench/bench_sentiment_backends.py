@@ -0,0 +1,86 @@
+"""Compare the vectorized lexicon backend with TextBlob on synthetic posts
+
+Reports throughput for both backends, label agreement and polarity error.
+
+Usage: python bench/bench_sentiment_backends.py [--posts 10000] [data/posts_YYYY-MM-DD.json ...]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import PostAnalyzer  # noqa: E402
+from sentiment_backends import LexiconBackend, TextBlobBackend  # noqa: E402
+
+FILLER = ['the', 'app', 'i', 'it', 'is', 'my', 'a', 'to', 'and', 'this', 'phone', 'update',
+          'after', 'since', 'support', 'was', 'they', 'for', 'with', 'account', 'keeps']
+SENTIMENT = ['good', 'bad', 'terrible', 'great', 'awful', 'slow', 'broken', 'happy', 'annoying',
+             'useless', 'perfect', 'horrible', 'nice', 'frustrating', 'worst', 'best', 'fine']
+MODIFIERS = ['very', 'really', 'extremely', 'so', 'pretty', 'quite', 'totally']
+NEGATIONS = ['not', "don't", 'never', "isn't", 'no']
+
+
+def synthetic_texts(count, seed=3):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(8, 60)):
+            roll = rng.random()
+            if roll < 0.12:
+                words.append(rng.choice(SENTIMENT))
+            elif roll < 0.17:
+                words.append(rng.choice(MODIFIERS))
+            elif roll < 0.21:
+                words.append(rng.choice(NEGATIONS))
+            else:
+                words.append(rng.choice(FILLER))
+            if rng.random() < 0.03:
+                words[-1] += '!'
+            elif rng.random() < 0.06:
+                words[-1] += '.'
+        texts.append(' '.join(words))
+    return texts
+
+
+def label(polarity):
+    return PostAnalyzer._label(polarity)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('day_files', nargs='*', help='stored posts_*.json to score instead')
+    parser.add_argument('--posts', type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.day_files:
+        texts = []
+        for path in args.day_files:
+            with open(path) as f:
+                texts.extend(PostAnalyzer._post_text(p) for p in json.load(f)['posts'])
+    else:
+        texts = synthetic_texts(args.posts)
+
+    results = {}
+    for backend in (TextBlobBackend(), LexiconBackend()):
+        backend.warm_up()
+        start = time.perf_counter()
+        results[backend.name] = backend.score_batch(texts)
+        elapsed = time.perf_counter() - start
+        print(f"{backend.name:>9}: {elapsed:6.2f}s  {len(texts) / elapsed:9.0f} posts/s")
+
+    reference, fast = results['textblob'], results['lexicon']
+    agree = sum(label(a[0]) == label(b[0]) for a, b in zip(reference, fast))
+    polarity_error = [abs(a[0] - b[0]) for a, b in zip(reference, fast)]
+    subjectivity_error = [abs(a[1] - b[1]) for a, b in zip(reference, fast)]
+    print(f"label agreement: {agree / len(texts):.1%}")
+    print(f"polarity |diff|: mean {sum(polarity_error) / len(texts):.4f}  max {max(polarity_error):.3f}")
+    print(f"subjectivity |diff|: mean {sum(subjectivity_error) / len(texts):.4f}")
+
+
+if __name__ == '__main__':
+    main()
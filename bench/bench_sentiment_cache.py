@@ -0,0 +1,68 @@
+"""Benchmark re-analysing a stored day with a cold vs warm sentiment cache
+
+Usage: python bench/bench_sentiment_cache.py [data/posts_YYYY-MM-DD.json] [--posts 2000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import PostAnalyzer  # noqa: E402
+from sentiment_cache import SentimentCache  # noqa: E402
+
+WORDS = ['app', 'keeps', 'crashing', 'terrible', 'update', 'love', 'the', 'new', 'design',
+         'support', 'never', 'answers', 'slow', 'great', 'refund', 'please', 'add', 'dark',
+         'mode', 'broken', 'again', 'awful', 'really', 'happy', 'not', 'working', 'good']
+
+
+def synthetic_posts(count):
+    rng = random.Random(7)
+    return [{
+        'id': f"p{i}",
+        'title': ' '.join(rng.choice(WORDS) for _ in range(8)),
+        'selftext': ' '.join(rng.choice(WORDS) for _ in range(60)),
+        'score': rng.randint(0, 200),
+        'num_comments': rng.randint(0, 80),
+    } for i in range(count)]
+
+
+def run(posts, cache_path):
+    """Analyse with a freshly loaded cache; returns (seconds, stats)"""
+    analyzer = PostAnalyzer(cache=SentimentCache(cache_path))
+    start = time.perf_counter()
+    analyzer.analyze_posts(posts)
+    elapsed = time.perf_counter() - start
+    analyzer.save_cache()
+    return elapsed, analyzer.cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('day_file', nargs='?', help='stored posts_*.json to re-analyse')
+    parser.add_argument('--posts', type=int, default=2000, help='synthetic posts if no file')
+    args = parser.parse_args()
+
+    if args.day_file:
+        with open(args.day_file) as f:
+            posts = json.load(f)['posts']
+    else:
+        posts = synthetic_posts(args.posts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'sentiment_cache.json')
+        cold, cold_stats = run(posts, cache_path)
+        warm, warm_stats = run(posts, cache_path)
+
+    print(f"posts: {len(posts)}")
+    print(f"cold: {cold:.3f}s  hits={cold_stats['hits']} misses={cold_stats['misses']}")
+    print(f"warm: {warm:.3f}s  hits={warm_stats['hits']} misses={warm_stats['misses']}")
+    print(f"speedup: {cold / warm:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
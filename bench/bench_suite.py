@@ -0,0 +1,179 @@
+"""End-to-end benchmark of main.py on the replay backend, saved per commit
+
+Runs ``python3 main.py`` in a scratch directory with REDDIT_SOURCE=replay and
+METRICS=true at each size (1k, 10k and 100k synthetic posts by default) and
+reads the run's metrics record:
+- throughput: posts per second of process wall time, startup included;
+- wall-clock seconds per stage;
+- peak RSS.
+Each subreddit starts with a listing cursor, so its whole `new` listing is
+read; a run reads at most MAX_POST_LIMIT (150) posts per subreddit, so larger
+sizes use more subreddits.
+
+Results are appended to bench/results/suite.jsonl (untracked: they only
+compare with runs on the same machine) with the commit they were measured
+at. --compare prints the change against the latest saved result from
+another commit (or the one given).
+
+Usage: python bench/bench_suite.py [--sizes 1000,10000,100000] [--latency 0]
+                                   [--backend textblob] [--no-save] [--compare [COMMIT]]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reddit_fetcher import MAX_POST_LIMIT, POST_LIMIT_JITTER  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, 'bench', 'results', 'suite.jsonl')
+STAGES = ('fetch', 'filter', 'analyze', 'save', 'report')
+# A run reads POST_LIMIT +/- POST_LIMIT_JITTER posts per subreddit, capped at
+# MAX_POST_LIMIT: listings up to the cap are read whole
+MAX_PER_SUBREDDIT = MAX_POST_LIMIT
+
+
+def git_commit() -> str:
+    """Short hash of HEAD, marked -dirty when tracked files have changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except Exception:
+        return 'unknown'
+
+
+def run_size(size: int, args) -> dict:
+    """One main.py run over ``size`` posts in a scratch directory"""
+    subreddits = max(10, math.ceil(size / MAX_PER_SUBREDDIT))
+    per_subreddit = size // subreddits
+    names = [f"bench{i:04d}" for i in range(subreddits)]
+    env = dict(
+        os.environ,
+        REDDIT_SOURCE='replay',
+        REPLAY_POSTS=str(per_subreddit),
+        REPLAY_LATENCY=str(args.latency),
+        SUBREDDITS=','.join(names),
+        # POST_LIMIT varies per subreddit; never drop below the listing size
+        POST_LIMIT=str(per_subreddit + POST_LIMIT_JITTER),
+        API_REQUESTS_PER_MINUTE='1000000000',
+        API_BURST='1000000000',
+        SENTIMENT_BACKEND=args.backend,
+        PIPELINE_MODE=args.pipeline,
+        FETCH_PLANNER='fixed',
+        METRICS='true',
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'data'))
+        # A cursor older than every post: the run reads each whole `new` listing
+        with open(os.path.join(tmp, 'data', 'listing_cursors.json'), 'w') as f:
+            json.dump({'cursors': {name: {'fullname': 't3_0', 'created_utc': 0}
+                                   for name in names}}, f)
+        started = time.perf_counter()
+        process = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py')], cwd=tmp,
+                                 env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if process.returncode != 0:
+            raise RuntimeError(f"main.py failed at {size} posts:\n{process.stdout[-2000:]}"
+                               f"{process.stderr[-2000:]}")
+        with open(os.path.join(tmp, 'data', 'metrics.jsonl')) as f:
+            record = json.loads(f.read().splitlines()[-1])
+    return {
+        'size': size,
+        'subreddits': subreddits,
+        'posts': record['posts'],
+        'wall_seconds': round(wall, 3),
+        'posts_per_second': round(record['posts'] / wall, 1),
+        'stages': record['stages'],
+        'peak_rss_mb': record['peak_rss_mb'],
+        'api_requests': record['counters'].get('api_requests', 0),
+    }
+
+
+def print_header():
+    header = ' '.join(f"{stage:>8}" for stage in STAGES)
+    print(f"{'posts':>7} {'subs':>5} {'wall':>8} {'posts/s':>8} | {header} | {'peak RSS':>9}")
+
+
+def print_results(results):
+    for row in results:
+        stages = ' '.join(f"{row['stages'].get(stage, 0.0):>7.2f}s" for stage in STAGES)
+        print(f"{row['posts']:>7} {row['subreddits']:>5} {row['wall_seconds']:>7.2f}s "
+              f"{row['posts_per_second']:>8.0f} | {stages} | {row['peak_rss_mb']:>6.0f} MB")
+
+
+def load_saved():
+    if not os.path.exists(RESULTS_FILE):
+        return []
+    with open(RESULTS_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: dict, saved, commit: str = None):
+    """Print the change per size against a saved result"""
+    candidates = [entry for entry in saved
+                  if (entry['commit'] == commit if commit else entry['commit'] != current['commit'])]
+    if not candidates:
+        print(f"No saved result to compare with ({commit or 'another commit'})")
+        return
+    baseline = candidates[-1]
+    print(f"vs {baseline['commit']} ({baseline['date']}):")
+    before = {row['size']: row for row in baseline['results']}
+    for row in current['results']:
+        old = before.get(row['size'])
+        if old is None:
+            continue
+        print(f"  {row['size']:>7} posts: wall {old['wall_seconds']:.2f}s -> "
+              f"{row['wall_seconds']:.2f}s ({row['wall_seconds'] / old['wall_seconds'] - 1:+.0%}), "
+              f"peak RSS {old['peak_rss_mb']:.0f} -> {row['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per API request')
+    parser.add_argument('--backend', default='textblob', help='SENTIMENT_BACKEND')
+    parser.add_argument('--pipeline', default='batch', help='PIPELINE_MODE')
+    parser.add_argument('--no-save', action='store_true', help="don't append to the results file")
+    parser.add_argument('--compare', nargs='?', const='', metavar='COMMIT',
+                        help='compare with the latest result from another (or this) commit')
+    args = parser.parse_args()
+
+    current = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'options': {'latency': args.latency, 'backend': args.backend, 'pipeline': args.pipeline},
+        'results': [],
+    }
+    print(f"main.py on the replay backend at {current['commit']} "
+          f"({args.backend} sentiment, {args.pipeline} pipeline, {args.latency * 1000:.0f}ms per request)")
+    print_header()
+    for size in (int(size) for size in args.sizes.split(',')):
+        current['results'].append(run_size(size, args))
+        print_results(current['results'][-1:])
+
+    saved = load_saved()
+    if args.compare is not None:
+        compare(current, saved, args.compare or None)
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, 'a') as f:
+            f.write(json.dumps(current) + '\n')
+        print(f"Saved to {os.path.relpath(RESULTS_FILE, ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark report rendering: the old str.format page vs the Jinja2 templates
+
+Times one single-file report of N posts four ways (median of --repeat runs):
+  legacy       the original f-string/str.format renderer (no escaping)
+  cold         Jinja2 in a fresh process with an empty template cache (parse + compile)
+  bytecode     a fresh process whose compiled templates are in TEMPLATE_CACHE_DIR
+  warm         the same process rendering again (templates already in memory)
+
+Usage: python bench/bench_templates.py [--posts 200] [--repeat 7]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import report_generator  # noqa: E402
+from report_generator import ReportGenerator  # noqa: E402
+from bench_warehouse import analyzed_posts  # noqa: E402
+from legacy_report import LegacyReportGenerator  # noqa: E402
+
+
+def median_time(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    posts = analyzed_posts(1, args.posts)['2024-01-01']
+    generator = ReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        config.REPORT_DIR = tmp
+        cache_dir = os.path.join(tmp, 'template_cache')
+        render = lambda: generator.generate_report(posts, 'jinja')  # noqa: E731
+
+        def fresh_process(empty_cache):
+            # A new process starts without an environment; the cache may be on disk
+            report_generator._environment = None
+            config.TEMPLATE_CACHE_DIR = cache_dir
+            if empty_cache:
+                config.TEMPLATE_CACHE_DIR = tempfile.mkdtemp(dir=tmp)
+
+        results = [
+            ('legacy', median_time(
+                lambda: LegacyReportGenerator().generate_report(posts, 'legacy'), args.repeat)),
+            ('cold', median_time(render, args.repeat, lambda: fresh_process(True))),
+        ]
+        fresh_process(False)
+        render()
+        results.append(('bytecode', median_time(render, args.repeat, lambda: fresh_process(False))))
+        results.append(('warm', median_time(render, args.repeat)))
+
+        # Per-card cost with templates warm, which is what the streaming loop pays
+        card = report_generator.template_environment().get_template('_post.html')
+        legacy = LegacyReportGenerator()
+        card_jinja = median_time(lambda: [card.render(post=p) for p in posts], args.repeat)
+        card_legacy = median_time(lambda: [legacy._generate_post_html(p) for p in posts], args.repeat)
+
+    print(f"{args.posts} posts per report")
+    for name, seconds in results:
+        print(f"  {name:<9} {seconds * 1000:8.2f} ms/report")
+    print(f"  per card  legacy {card_legacy / len(posts) * 1e6:.1f} us, "
+          f"jinja {card_jinja / len(posts) * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark trend detection: update cost, rebuild from history, false alarms and detection rate
+
+Update and rebuild: --days days of synthetic posts across 20 subreddits,
+counted incrementally (what each run does) and rebuilt from the columnar
+history dataset (what `python3 trend_detector.py` does).
+
+Detection: one Poisson series per daily rate, checked --checks times a day
+as posts arrive. A false alarm is a flag on a normal day. A spike day has
+three times the usual posts. A rise is five days at 1.6x, caught if flagged
+on its fourth to seventh day.
+
+Usage: python bench/bench_trends.py [--days 60] [--posts-per-day 2000] [--rates 3,8,20,60]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import PostAnalyzer  # noqa: E402
+from history import HistoryDataset  # noqa: E402
+from trend_detector import TrendDetector  # noqa: E402
+
+DAY = 86400
+KEYWORDS = ['issue', 'problem', 'bug', 'broken', 'need', 'request']
+
+
+def make_posts(rng: random.Random, days: int, per_day: int, start: float):
+    posts = []
+    subreddits = [f"sub{i}" for i in range(20)]
+    categories = list(PostAnalyzer.CATEGORIES) + ['General']
+    for number in range(days * per_day):
+        posts.append({
+            'id': f"t{number}", 'subreddit': rng.choice(subreddits),
+            'created_utc': start + number * DAY / per_day,
+            'categories': rng.sample(categories, rng.choice((1, 1, 2))),
+            'keywords': rng.sample(KEYWORDS, rng.choice((1, 1, 2))),
+            'title': '', 'selftext': '', 'author': '', 'url': '',
+            'score': 1, 'num_comments': 0, 'sentiment': 'neutral', 'priority': 'Low',
+        })
+    return posts
+
+
+def bench_speed(args):
+    rng = random.Random(0)
+    start = (time.time() // DAY - args.days) * DAY
+    posts = make_posts(rng, args.days, args.posts_per_day, start)
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = TrendDetector(path=os.path.join(tmp, 'trends.json'))
+        began = time.perf_counter()
+        # One run per hour's worth of posts
+        per_run = max(1, args.posts_per_day // 24)
+        for offset in range(0, len(posts), per_run):
+            detector.update(posts[offset:offset + per_run])
+        update = time.perf_counter() - began
+        began = time.perf_counter()
+        trends = detector.detect()
+        detect = time.perf_counter() - began
+        detector.save()
+        state_kb = os.path.getsize(detector.path) / 1024
+
+        history = HistoryDataset(os.path.join(tmp, 'history'))
+        for day in range(args.days):
+            history.write(posts[day * args.posts_per_day:(day + 1) * args.posts_per_day],
+                          time.strftime('%Y-%m-%d', time.gmtime(start + day * DAY)))
+        began = time.perf_counter()
+        rebuilt = TrendDetector(path='').rebuild(history)
+        rebuild = time.perf_counter() - began
+
+    print(f"{len(posts)} posts over {args.days} days, {len(detector)} series")
+    print(f"   update:  {update:.2f}s ({update / len(posts) * 1e6:.1f}µs per post)")
+    print(f"   detect:  {detect * 1000:.1f}ms, {len(trends)} trends")
+    print(f"   state:   {state_kb:.0f} KB")
+    print(f"   rebuild: {rebuild:.2f}s for {rebuilt} posts from the history dataset")
+
+
+def simulate(rate: float, checks: int, shape, days: int = 600, seed: int = 0):
+    """Yield (day, spike flagged, rising flagged) for one series at the last check of each day"""
+    rng = random.Random(seed)
+    start = (time.time() // DAY - days - 1) * DAY
+    detector = TrendDetector(path='')
+    pending = []
+    for day in range(days):
+        expected = shape(day, rate)
+        # Poisson arrivals: exponential gaps over the day
+        t = rng.expovariate(expected / DAY)
+        while t < DAY:
+            pending.append({'subreddit': 's', 'created_utc': start + day * DAY + t})
+            t += rng.expovariate(expected / DAY)
+        flagged = (False, False)
+        for check in range(1, checks + 1):
+            now = start + day * DAY + DAY * check / (checks + 1)
+            detector.update([post for post in pending if post['created_utc'] <= now])
+            pending = [post for post in pending if post['created_utc'] > now]
+            trends = detector.detect(now)
+            flagged = (flagged[0] or any(trend['spike'] for trend in trends),
+                       flagged[1] or any(trend['rising'] for trend in trends))
+        yield day, flagged[0], flagged[1]
+
+
+def bench_detection(args):
+    print(f"\nDetection, {args.checks} runs a day")
+    print(f"{'posts/day':>9} {'false spike':>11} {'false rise':>10} {'3x day':>7} {'1.6x rise':>9}")
+    for rate in (float(r) for r in args.rates.split(',')):
+        normal = [r for r in simulate(rate, args.checks, lambda d, r: r) if r[0] > 20]
+        spikes = [r for r in simulate(rate, args.checks,
+                                      lambda d, r: r * 3 if d > 20 and d % 25 == 0 else r)
+                  if r[0] > 20 and r[0] % 25 == 0]
+        rises = [r for r in simulate(rate, args.checks,
+                                     lambda d, r: r * 1.6 if d > 20 and d % 50 < 5 else r)
+                 if r[0] > 20 and 3 <= r[0] % 50 <= 6]
+        print(f"{rate:>9g} {sum(r[1] for r in normal) / len(normal):>11.1%} "
+              f"{sum(r[2] for r in normal) / len(normal):>10.1%} "
+              f"{sum(r[1] for r in spikes) / len(spikes):>7.1%} "
+              f"{sum(r[1] or r[2] for r in rises) / len(rises):>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--posts-per-day', type=int, default=2000)
+    parser.add_argument('--rates', default='3,8,20,60', help='posts per day of the detection series')
+    parser.add_argument('--checks', type=int, default=4, help='detection runs per day')
+    args = parser.parse_args()
+    bench_speed(args)
+    bench_detection(args)
+
+
+if __name__ == '__main__':
+    main()
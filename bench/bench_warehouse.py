@@ -0,0 +1,138 @@
+"""Benchmark the SQLite warehouse against per-day posts_*.json files
+
+Writes N days of synthetic analyzed posts both ways, then times filtered
+queries such as "High-priority posts in r/techsupport over the last 30 days".
+
+Usage: python bench/bench_warehouse.py [--days 90] [--per-day 500]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from warehouse import PostWarehouse  # noqa: E402
+
+SUBREDDITS = ['complaints', 'techsupport', 'ProductComplaints', 'sysadmin', 'pcmasterrace']
+CATEGORIES = ['Bug/Technical Issue', 'Feature Request', 'Complaint', 'Question', 'Performance',
+              'General']
+WORDS = ('the app keeps crashing after update broken login slow please add dark mode '
+         'feature terrible support refund why does my laptop not working great love').split()
+START = datetime(2024, 1, 1)
+
+
+def analyzed_posts(days, per_day, seed=3):
+    """{date_str: [post, ...]} shaped like PostAnalyzer.analyze_posts output"""
+    rng = random.Random(seed)
+    by_day = {}
+    serial = 0
+    for day in range(days):
+        date = START + timedelta(days=day)
+        posts = []
+        for _ in range(per_day):
+            serial += 1
+            created = date.timestamp() + rng.uniform(0, 86400)
+            polarity = rng.uniform(-1, 1)
+            posts.append({
+                'id': f"{serial:x}",
+                'title': ' '.join(rng.choice(WORDS) for _ in range(8)),
+                'author': f"user{rng.randint(1, 5000)}",
+                'subreddit': rng.choice(SUBREDDITS),
+                'created_utc': created,
+                'created_date': datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S'),
+                'score': rng.randint(0, 300),
+                'num_comments': rng.randint(0, 120),
+                'url': f"https://reddit.com/r/x/comments/{serial:x}/",
+                'selftext': ' '.join(rng.choice(WORDS) for _ in range(60)),
+                'upvote_ratio': round(rng.uniform(0.5, 1.0), 2),
+                'is_self': True,
+                'sentiment': 'positive' if polarity > 0.1 else 'negative' if polarity < -0.1 else 'neutral',
+                'polarity': polarity,
+                'subjectivity': rng.uniform(0, 1),
+                'categories': rng.sample(CATEGORIES, rng.randint(1, 2)),
+                'priority': rng.choice(['High', 'Medium', 'Medium', 'Low', 'Low', 'Low']),
+            })
+        by_day[date.strftime('%Y-%m-%d')] = posts
+    return by_day
+
+
+def write_json(tmp, by_day):
+    for date_str, posts in by_day.items():
+        with open(os.path.join(tmp, f'posts_{date_str}.json'), 'w') as f:
+            json.dump({'date': date_str, 'total_posts': len(posts), 'posts': posts}, f, indent=2)
+
+
+def scan_json(tmp, predicate):
+    """What answering a question takes today: parse every daily file"""
+    hits = []
+    for path in sorted(glob.glob(os.path.join(tmp, 'posts_*.json'))):
+        with open(path) as f:
+            hits.extend(post for post in json.load(f)['posts'] if predicate(post))
+    return hits
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--per-day', type=int, default=500)
+    args = parser.parse_args()
+
+    by_day = analyzed_posts(args.days, args.per_day)
+    total = args.days * args.per_day
+    last_day = START + timedelta(days=args.days)
+    month_ago = (last_day - timedelta(days=30)).timestamp()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_write, _ = timed(lambda: write_json(tmp, by_day))
+        warehouse = PostWarehouse(os.path.join(tmp, 'posts.sqlite3'))
+        sql_write, _ = timed(lambda: [warehouse.upsert_posts(posts, date_str)
+                                      for date_str, posts in by_day.items()])
+        # A second same-day run re-saving its posts
+        first_day, first_posts = next(iter(by_day.items()))
+        rerun, _ = timed(lambda: warehouse.upsert_posts(first_posts, first_day))
+
+        print(f"{total} posts over {args.days} days")
+        print(f"  write   json files {json_write:6.2f}s ({total / json_write:8.0f} posts/s)   "
+              f"sqlite {sql_write:6.2f}s ({total / sql_write:8.0f} posts/s)")
+        print(f"  re-save {len(first_posts)} posts of one day in sqlite: {rerun * 1000:.1f}ms")
+        print()
+
+        queries = [
+            ("High priority in r/techsupport, last 30 days",
+             lambda p: p['subreddit'] == 'techsupport' and p['priority'] == 'High'
+             and p['created_utc'] >= month_ago,
+             dict(subreddit='techsupport', priority='High', since=month_ago)),
+            ("Negative 'Performance' posts, all time",
+             lambda p: p['sentiment'] == 'negative' and 'Performance' in p['categories'],
+             dict(sentiment='negative', category='Performance')),
+            ("Everything from one run date",
+             None, dict(run_date=first_day)),
+        ]
+        print(f"  {'query':<46} {'json scan':>10} {'sqlite':>10} {'rows':>7}")
+        for label, predicate, filters in queries:
+            if predicate is None:
+                json_time, json_rows = timed(lambda: json.load(
+                    open(os.path.join(tmp, f'posts_{first_day}.json')))['posts'])
+            else:
+                json_time, json_rows = timed(lambda: scan_json(tmp, predicate))
+            sql_time, sql_rows = timed(lambda: warehouse.query_posts(**filters))
+            assert len(json_rows) == len(sql_rows), (label, len(json_rows), len(sql_rows))
+            print(f"  {label:<46} {json_time * 1000:>8.1f}ms {sql_time * 1000:>8.1f}ms "
+                  f"{len(sql_rows):>7}")
+        warehouse.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Comment threads of a run's new posts, read under the shared rate limit and analyzed in one batch"""
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import config
+import metrics
+from keyword_matcher import KEYWORD_LABEL
+
+if TYPE_CHECKING:
+    from analyzer import PostAnalyzer
+    from reddit_fetcher import RedditFetcher
+
+# Characters of a comment body kept (the same cut as a post's selftext)
+BODY_CHARS = 500
+# Keyword-matching comments kept on each post for the report
+TOP_COMMENTS = 3
+
+
+def _is_more(item) -> bool:
+    """MoreComments placeholders (PRAW's or the replay source's) have no body"""
+    return not hasattr(item, 'body')
+
+
+class CommentHarvester:
+    """
+    Reads the comment threads of a run's busiest new posts
+
+    A thread costs one request for its first ``COMMENT_LIMIT`` comments plus
+    at most ``COMMENT_MORE_LIMIT`` "load more comments" requests, biggest
+    placeholders first. Replies deeper than ``COMMENT_MAX_DEPTH`` levels are
+    dropped and placeholders that would only hold such replies are never
+    expanded. Threads are read by a few worker threads with the fetcher's
+    pooled clients and rate limiter, so comments share the run's API budget.
+    """
+
+    def __init__(self, fetcher: 'RedditFetcher', analyzer: 'PostAnalyzer',
+                 max_posts: int = None, more_limit: int = None, max_depth: int = None,
+                 workers: int = None):
+        """
+        Args:
+            fetcher: Fetcher whose clients, rate limiter and keyword matcher are used
+            analyzer: Analyzer scoring the comments' sentiment (and its cache)
+            max_posts: Threads read per run (defaults to ``config.COMMENT_MAX_POSTS``)
+            more_limit: "Load more" requests per thread (``config.COMMENT_MORE_LIMIT``)
+            max_depth: Reply levels kept (``config.COMMENT_MAX_DEPTH``)
+            workers: Threads read at once (``config.COMMENT_WORKERS``)
+        """
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.max_posts = config.COMMENT_MAX_POSTS if max_posts is None else max_posts
+        self.more_limit = config.COMMENT_MORE_LIMIT if more_limit is None else more_limit
+        self.max_depth = config.COMMENT_MAX_DEPTH if max_depth is None else max_depth
+        self.workers = config.COMMENT_WORKERS if workers is None else workers
+
+    def select(self, posts: List[Dict]) -> List[Dict]:
+        """The posts whose threads are read: those with the most comments"""
+        candidates = [post for post in posts if post.get('num_comments', 0) > 0]
+        candidates.sort(key=lambda post: post['num_comments'], reverse=True)
+        return candidates[:self.max_posts]
+
+    def _collect(self, items, thread, depths: Dict[str, int], comments: List[Dict], pending: List,
+                 order, stats: Dict):
+        """Keep the comments in ``items`` and queue their placeholders by size"""
+        for item in items:
+            if _is_more(item):
+                # Its comments start one level below the parent they hang under
+                if depths.get(item.parent_id, -1) + 1 >= self.max_depth:
+                    stats['more_skipped'] += 1
+                else:
+                    # PRAW leaves it unset on placeholders inside a "load more"
+                    # answer, and expanding one needs the thread's fullname
+                    item.submission = thread
+                    heapq.heappush(pending, (-item.count, next(order), item))
+                continue
+            depth = getattr(item, 'depth', None)
+            if depth is None:
+                depth = depths.get(item.parent_id, -1) + 1
+            depths[item.name] = depth
+            if depth >= self.max_depth:
+                continue
+            comments.append({
+                'id': item.id,
+                'author': str(item.author) if item.author else '[deleted]',
+                'body': item.body[:BODY_CHARS] if item.body else '',
+                'score': item.score,
+                'depth': depth,
+            })
+
+    def harvest_thread(self, post: Dict) -> Tuple[List[Dict], Dict]:
+        """
+        Read one post's comment thread within the request and depth caps
+
+        Returns:
+            (comments, {'requests', 'more_expanded', 'more_skipped', 'seconds'})
+        """
+        started = time.perf_counter()
+        stats = {'requests': 0, 'more_expanded': 0, 'more_skipped': 0, 'seconds': 0.0}
+        comments = []
+        try:
+            with self.fetcher.borrowed_client() as reddit:
+                thread = reddit.submission(id=post['id'])
+                thread.comment_sort = config.COMMENT_SORT
+                thread.comment_limit = config.COMMENT_LIMIT
+                # The first access to `comments` sends the thread request
+                stats['requests'] += 1
+                items = self.fetcher.call_api(lambda: thread.comments.list())
+                depths = {f"t3_{post['id']}": -1}
+                pending = []
+                order = itertools.count()
+                self._collect(items, thread, depths, comments, pending, order, stats)
+                while pending and stats['more_expanded'] < self.more_limit:
+                    _, _, more = heapq.heappop(pending)
+                    stats['requests'] += 1
+                    stats['more_expanded'] += 1
+                    items = self.fetcher.call_api(more.comments, update=False)
+                    self._collect(items, thread, depths, comments, pending, order, stats)
+                stats['more_skipped'] += len(pending)
+        except Exception as e:
+            print(f"  ⚠️  Error reading comments of post {post['id']}: {e}")
+        stats['seconds'] = time.perf_counter() - started
+        return comments, stats
+
+    def _analyze(self, threads: List[Tuple[Dict, List[Dict]]]) -> int:
+        """
+        Keyword-match and score every harvested comment in one batch
+
+        Each post gets ``comments_harvested``, ``comment_matches`` (comments
+        with a tracked keyword), ``comment_polarity`` (mean polarity) and
+        ``top_comments`` (its best-scored matching comments).
+
+        Returns:
+            Number of matching comments
+        """
+        texts = [comment['body'] for _, comments in threads for comment in comments]
+        sentiments = iter(self.analyzer.analyze_sentiments(texts))
+        total_matches = 0
+        for post, comments in threads:
+            matching = []
+            polarities = []
+            for comment in comments:
+                sentiment = next(sentiments)
+                polarities.append(sentiment['polarity'])
+                if self.fetcher.matcher.matches(comment['body'], KEYWORD_LABEL):
+                    matching.append(dict(comment, sentiment=sentiment['sentiment'],
+                                         polarity=sentiment['polarity']))
+            matching.sort(key=lambda comment: comment['score'], reverse=True)
+            total_matches += len(matching)
+            post['comments_harvested'] = len(comments)
+            post['comment_matches'] = len(matching)
+            post['comment_polarity'] = (round(sum(polarities) / len(polarities), 3)
+                                        if polarities else None)
+            post['top_comments'] = matching[:TOP_COMMENTS]
+        return total_matches
+
+    @metrics.timed('harvest_comments')
+    def harvest(self, posts: List[Dict]) -> Dict:
+        """
+        Read and analyze the comment threads of the busiest posts in place
+
+        Args:
+            posts: Analyzed posts of this run
+
+        Returns:
+            Cost summary: threads, comments, matches, requests, seconds
+            (total and per thread) and placeholders left by the caps
+        """
+        selected = self.select(posts)
+        summary = {'threads': len(selected), 'comments': 0, 'matches': 0, 'requests': 0,
+                   'more_skipped': 0, 'seconds': 0.0, 'max_requests': 0, 'max_seconds': 0.0}
+        if not selected:
+            return summary
+        started = time.perf_counter()
+        workers = max(1, min(self.workers, len(selected)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self.harvest_thread, selected))
+
+        for _, stats in results:
+            summary['requests'] += stats['requests']
+            summary['more_skipped'] += stats['more_skipped']
+            summary['max_requests'] = max(summary['max_requests'], stats['requests'])
+            summary['max_seconds'] = max(summary['max_seconds'], stats['seconds'])
+        threads = [(post, comments) for post, (comments, _) in zip(selected, results)]
+        summary['comments'] = sum(len(comments) for _, comments in threads)
+        summary['matches'] = self._analyze(threads)
+        summary['seconds'] = time.perf_counter() - started
+
+        metrics.count('comment_threads', summary['threads'])
+        metrics.count('comment_requests', summary['requests'])
+        metrics.count('comments_harvested', summary['comments'])
+        metrics.count('comment_more_skipped', summary['more_skipped'])
+        return summary
+
+    @staticmethod
+    def summary_lines(summary: Dict) -> List[str]:
+        """Human-readable cost of one harvest, for tuning the caps"""
+        threads = summary['threads']
+        if not threads:
+            return ["No new posts with comments"]
+        return [
+            f"{threads} threads, {summary['comments']} comments "
+            f"({summary['matches']} with keywords)",
+            f"{summary['requests']} API requests ({summary['requests'] / threads:.1f} per thread, "
+            f"max {summary['max_requests']}), {summary['seconds']:.2f}s "
+            f"({summary['seconds'] / threads:.2f}s per thread, max {summary['max_seconds']:.2f}s)",
+            f"{summary['more_skipped']} 'load more' placeholders left unread by the caps",
+        ]
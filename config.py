@@ -24,13 +24,126 @@ REDDIT_USER_AGENT = f"{random.choice(_platforms)}:{_base_user_agent}:v{random.ch
 # Monitoring Configuration
 SUBREDDITS = os.getenv('SUBREDDITS', 'complaints,techsupport,ProductComplaints').split(',')
 KEYWORDS = os.getenv('KEYWORDS', 'complaint,issue,problem,bug,demand,request,need,broken,not working').split(',')
+# Match keywords as whole words only ('bug' no longer matches 'debugging')
+KEYWORD_WORD_BOUNDARY = os.getenv('KEYWORD_WORD_BOUNDARY', 'false').lower() == 'true'
 POST_LIMIT = int(os.getenv('POST_LIMIT', '100'))
+# Where posts come from: 'reddit' (the API via PRAW) or 'replay' (offline,
+# see replay_source.py: recorded posts, or synthetic ones if REPLAY_FILES is empty)
+REDDIT_SOURCE = os.getenv('REDDIT_SOURCE', 'reddit').lower()
+REPLAY_FILES = os.getenv('REPLAY_FILES', '')  # Glob of posts_*.json / .jsonl files
+REPLAY_POSTS = int(os.getenv('REPLAY_POSTS', '150'))  # Synthetic posts per subreddit
+REPLAY_LATENCY = float(os.getenv('REPLAY_LATENCY', '0'))  # Seconds per API request
+REPLAY_THROTTLE_RATE = float(os.getenv('REPLAY_THROTTLE_RATE', '0'))  # Share answered with 429
+# Size of the first `new` page when a subreddit has a listing cursor
+CURSOR_PROBE_SIZE = int(os.getenv('CURSOR_PROBE_SIZE', '10'))
+# Fetch planning: 'fixed' (every subreddit, POST_LIMIT +/- 10 each run) or
+# 'velocity' (poll busy subreddits deeper and quiet ones less often)
+FETCH_PLANNER = os.getenv('FETCH_PLANNER', 'fixed').lower()
+# API requests a velocity-planned run may spend (0 = two per subreddit)
+FETCH_REQUEST_BUDGET = int(os.getenv('FETCH_REQUEST_BUDGET', '0'))
+# Poll even a quiet subreddit at least this often
+PLANNER_MAX_IDLE_HOURS = float(os.getenv('PLANNER_MAX_IDLE_HOURS', '24'))
+
+# Fetch Concurrency & Rate Limiting
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '8'))
+# Reddit's documented OAuth quota is 100 queries per minute per client
+API_REQUESTS_PER_MINUTE = int(os.getenv('API_REQUESTS_PER_MINUTE', '100'))
+API_BURST = int(os.getenv('API_BURST', '10'))
+# Retries for throttled (429) or failed (5xx) requests, with jittered backoff
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '5'))
+
+# Comment Harvesting: read the comment threads of the run's busiest new posts
+COMMENT_HARVEST = os.getenv('COMMENT_HARVEST', 'false').lower() == 'true'
+COMMENT_MAX_POSTS = int(os.getenv('COMMENT_MAX_POSTS', '25'))  # Threads per run, most comments first
+COMMENT_LIMIT = int(os.getenv('COMMENT_LIMIT', '100'))  # Comments in a thread's first request
+COMMENT_SORT = os.getenv('COMMENT_SORT', 'top').lower()
+# Extra "load more comments" requests per thread, and the deepest reply level kept
+COMMENT_MORE_LIMIT = int(os.getenv('COMMENT_MORE_LIMIT', '4'))
+COMMENT_MAX_DEPTH = int(os.getenv('COMMENT_MAX_DEPTH', '4'))
+COMMENT_WORKERS = int(os.getenv('COMMENT_WORKERS', '4'))
+
+# Near-duplicate Clustering: group reposts of the same story (MinHash + LSH)
+CLUSTER_POSTS = os.getenv('CLUSTER_POSTS', 'false').lower() == 'true'
+# Estimated share of word pairs two posts must have in common
+CLUSTER_THRESHOLD = float(os.getenv('CLUSTER_THRESHOLD', '0.5'))
+CLUSTER_NUM_PERM = int(os.getenv('CLUSTER_NUM_PERM', '128'))
+CLUSTER_BANDS = int(os.getenv('CLUSTER_BANDS', '32'))  # Must divide CLUSTER_NUM_PERM
+# Days new posts are matched against (0 = keep every signature)
+CLUSTER_MAX_AGE_DAYS = float(os.getenv('CLUSTER_MAX_AGE_DAYS', '7'))
+
+# Trend Detection: spikes in post counts per subreddit, category and keyword
+TREND_DETECTION = os.getenv('TREND_DETECTION', 'false').lower() == 'true'
+TREND_BUCKET_HOURS = float(os.getenv('TREND_BUCKET_HOURS', '24'))  # Counted per bucket, UTC-aligned
+# Weight of the newest completed bucket in the moving baselines
+TREND_SMOOTHING = float(os.getenv('TREND_SMOOTHING', '0.2'))
+# Flag the current bucket at this many standard deviations above its baseline
+TREND_Z_THRESHOLD = float(os.getenv('TREND_Z_THRESHOLD', '3'))
+TREND_MIN_COUNT = int(os.getenv('TREND_MIN_COUNT', '5'))  # Fewer posts are never a spike
+# Flag a sustained rise once the CUSUM of completed buckets passes this
+TREND_CUSUM_THRESHOLD = float(os.getenv('TREND_CUSUM_THRESHOLD', '4'))
+
+# Run Pipeline: 'batch' (each stage finishes before the next) or 'stream'
+# (posts are analyzed subreddit by subreddit while the rest are still fetching)
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'batch').lower()
+# Fetched subreddit batches allowed to wait for analysis in stream mode
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '4'))
+# Daemon mode (python3 scheduler.py --daemon): minutes between runs
+SCHEDULER_INTERVAL_MINUTES = int(os.getenv('SCHEDULER_INTERVAL_MINUTES', '60'))
 
 # Storage Configuration
 DATA_DIR = 'data'
 REPORT_DIR = os.getenv('REPORT_DIR', 'reports')
-SEEN_POSTS_FILE = os.path.join(DATA_DIR, 'seen_posts.json')
+# Report layout: 'single' (one self-contained HTML file) or 'paged'
+# (small page + post data shards, rendered one page at a time)
+REPORT_MODE = os.getenv('REPORT_MODE', 'single').lower()
+REPORT_PAGE_SIZE = int(os.getenv('REPORT_PAGE_SIZE', '50'))
+REPORT_SHARD_SIZE = int(os.getenv('REPORT_SHARD_SIZE', '500'))
+# Compiled Jinja2 report templates, reused across runs
+TEMPLATE_CACHE_DIR = os.path.join(DATA_DIR, 'template_cache')
+# Also build a report of the last N days after each run (0 = off)
+ROLLING_REPORT_DAYS = int(os.getenv('ROLLING_REPORT_DAYS', '0'))
+# Rendered post cards reused by the rolling report
+FRAGMENT_CACHE_FILE = os.path.join(DATA_DIR, 'report_fragments.sqlite3')
+SEEN_POSTS_FILE = os.path.join(DATA_DIR, 'seen_posts.json')  # Legacy, migrated on first run
+SEEN_SNAPSHOT_FILE = os.path.join(DATA_DIR, 'seen_posts.snapshot')
+SEEN_LOG_FILE = os.path.join(DATA_DIR, 'seen_posts.log')
+# Fold the append-only log into the snapshot after this many entries
+SEEN_COMPACT_EVERY = int(os.getenv('SEEN_COMPACT_EVERY', '50000'))
+# Forget IDs seen more than this many days ago (0 = keep forever)
+SEEN_MAX_AGE_DAYS = float(os.getenv('SEEN_MAX_AGE_DAYS', '0'))
+# Bloom filter in front of the seen-ID index for fast "not seen" answers
+SEEN_BLOOM_FILTER = os.getenv('SEEN_BLOOM_FILTER', 'false').lower() == 'true'
+LISTING_CURSORS_FILE = os.path.join(DATA_DIR, 'listing_cursors.json')
+SUBREDDIT_STATS_FILE = os.path.join(DATA_DIR, 'subreddit_stats.json')
+CLUSTER_INDEX_FILE = os.path.join(DATA_DIR, 'clusters.sqlite3')
+TRENDS_FILE = os.path.join(DATA_DIR, 'trends.json')
+# Where analyzed posts go: 'json' (one posts_YYYY-MM-DD.json per day) or 'sqlite'
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+WAREHOUSE_FILE = os.path.join(DATA_DIR, 'posts.sqlite3')
+# Also append analyzed posts to a date-partitioned columnar dataset for analysis
+HISTORY_DATASET = os.getenv('HISTORY_DATASET', 'true').lower() == 'true'
+HISTORY_DIR = os.path.join(DATA_DIR, 'history')
+
+# Sentiment Backend: 'textblob' (reference) or 'lexicon' (vectorized, batch)
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'textblob').lower()
+
+# Batch Analysis: worker processes (1 = serial) and posts per batch
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '1'))
+ANALYSIS_CHUNK_SIZE = int(os.getenv('ANALYSIS_CHUNK_SIZE', '200'))
+
+# Sentiment Cache: 'disk' (persisted under DATA_DIR), 'memory' or 'off'
+SENTIMENT_CACHE = os.getenv('SENTIMENT_CACHE', 'disk').lower()
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', '100000'))
+SENTIMENT_CACHE_FILE = os.path.join(DATA_DIR, 'sentiment_cache.json')
+
+# Run Metrics: per-stage timers and counters, one JSON line per run
+METRICS = os.getenv('METRICS', 'false').lower() == 'true'
+METRICS_FILE = os.path.join(DATA_DIR, 'metrics.jsonl')
+# Optional node_exporter textfile-collector output (e.g. .../textfile/reddit_tracker.prom)
+METRICS_PROMETHEUS_FILE = os.getenv('METRICS_PROMETHEUS_FILE', '')
+
 
-# Create directories if they don't exist
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(REPORT_DIR, exist_ok=True)
+def ensure_directories():
+    """Create the data and report directories if they don't exist"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(REPORT_DIR, exist_ok=True)
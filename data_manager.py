@@ -1,41 +1,58 @@
 """Data management for tracking seen posts and storing new ones"""
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Set
+from datetime import datetime, timedelta
+from typing import List, Dict
 import config
+import metrics
+from history import HistoryDataset
+from warehouse import PostWarehouse
 
 
 class DataManager:
     """Manages post data storage and tracking"""
     
     def __init__(self):
-        self.seen_posts_file = config.SEEN_POSTS_FILE
-        self.seen_posts = self._load_seen_posts()
+        config.ensure_directories()
+        self._seen_posts = None
+        self.warehouse = PostWarehouse() if config.STORAGE_BACKEND == 'sqlite' else None
+        self.history = HistoryDataset() if config.HISTORY_DATASET else None
     
-    def _load_seen_posts(self) -> Set[str]:
-        """Load the set of previously seen post IDs"""
-        if os.path.exists(self.seen_posts_file):
+    @property
+    def seen_posts(self):
+        """
+        Snapshot + append-only log of seen post IDs
+        
+        Loaded on first use (NumPy and the index aren't needed to rebuild a
+        report); migrates seen_posts.json the first time.
+        """
+        if self._seen_posts is None:
+            from seen_store import SeenStore
+            self._seen_posts = SeenStore()
+        return self._seen_posts
+    
+    def load_listing_cursors(self) -> Dict[str, Dict]:
+        """Load the per-subreddit `new` listing cursors from the last run"""
+        if os.path.exists(config.LISTING_CURSORS_FILE):
             try:
-                with open(self.seen_posts_file, 'r') as f:
-                    data = json.load(f)
-                    return set(data.get('seen_ids', []))
+                with open(config.LISTING_CURSORS_FILE, 'r') as f:
+                    return json.load(f).get('cursors', {})
             except Exception as e:
-                print(f"Error loading seen posts: {e}")
-                return set()
-        return set()
+                print(f"Error loading listing cursors: {e}")
+        return {}
     
-    def _save_seen_posts(self):
-        """Save the set of seen post IDs"""
+    def save_listing_cursors(self, cursors: Dict[str, Dict]):
+        """Save the per-subreddit `new` listing cursors"""
         try:
-            with open(self.seen_posts_file, 'w') as f:
+            with open(config.LISTING_CURSORS_FILE, 'w') as f:
                 json.dump({
-                    'seen_ids': list(self.seen_posts),
+                    'cursors': cursors,
                     'last_updated': datetime.now().isoformat()
                 }, f, indent=2)
         except Exception as e:
-            print(f"Error saving seen posts: {e}")
+            print(f"Error saving listing cursors: {e}")
     
+    @metrics.timed('filter_new_posts')
     def filter_new_posts(self, posts: List[Dict]) -> List[Dict]:
         """
         Filter out posts that have already been seen
@@ -46,18 +63,20 @@ class DataManager:
         Returns:
             List of new posts only
         """
-        new_posts = [post for post in posts if post['id'] not in self.seen_posts]
+        seen = self.seen_posts.contains_many([post['id'] for post in posts])
+        new_posts = [post for post, was_seen in zip(posts, seen) if not was_seen]
+        metrics.count('posts_checked', len(posts))
+        metrics.count('posts_new', len(new_posts))
         return new_posts
     
     def mark_as_seen(self, posts: List[Dict]):
-        """Mark posts as seen"""
-        for post in posts:
-            self.seen_posts.add(post['id'])
-        self._save_seen_posts()
+        """Mark posts as seen (only new IDs are written)"""
+        self.seen_posts.add_many(post['id'] for post in posts)
     
+    @metrics.timed('save_daily_data')
     def save_daily_data(self, posts: List[Dict], date_str: str = None):
         """
-        Save daily collected data to a JSON file
+        Save daily collected data to a JSON file (or the SQLite warehouse)
         
         Args:
             posts: List of post dictionaries
@@ -66,8 +85,32 @@ class DataManager:
         if date_str is None:
             date_str = datetime.now().strftime('%Y-%m-%d')
         
+        if self.history is not None:
+            try:
+                self.history.write(posts, date_str)
+            except Exception as e:
+                print(f"Error writing history dataset: {e}")
+        
+        if self.warehouse is not None:
+            try:
+                count = self.warehouse.upsert_posts(posts, date_str)
+                print(f"Saved {count} posts to {self.warehouse.path}")
+            except Exception as e:
+                print(f"Error saving daily data: {e}")
+            return
+        
         filename = os.path.join(config.DATA_DIR, f'posts_{date_str}.json')
         
+        # A later run on the same day adds to the day's file
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    earlier = json.load(f).get('posts', [])
+                ids = {post['id'] for post in posts}
+                posts = posts + [post for post in earlier if post['id'] not in ids]
+            except Exception as e:
+                print(f"Error loading earlier posts from {filename}: {e}")
+        
         try:
             with open(filename, 'w') as f:
                 json.dump({
@@ -75,6 +118,38 @@ class DataManager:
                     'total_posts': len(posts),
                     'posts': posts
                 }, f, indent=2)
+                metrics.count('data_bytes_written', f.tell())
             print(f"Saved {len(posts)} posts to {filename}")
         except Exception as e:
             print(f"Error saving daily data: {e}")
+    
+    def load_recent_posts(self, days: int, end_date: str = None) -> List[Dict]:
+        """
+        Load the posts saved over the last ``days`` run dates
+        
+        Args:
+            days: Number of days in the window, ending with ``end_date``
+            end_date: Last day of the window, YYYY-MM-DD (defaults to today)
+            
+        Returns:
+            Posts newest first, each post once (its most recent save wins)
+        """
+        end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
+        posts = {}
+        for offset in range(days):
+            date_str = (end - timedelta(days=offset)).strftime('%Y-%m-%d')
+            try:
+                if self.warehouse is not None:
+                    day_posts = self.warehouse.query_posts(run_date=date_str)
+                else:
+                    filename = os.path.join(config.DATA_DIR, f'posts_{date_str}.json')
+                    if not os.path.exists(filename):
+                        continue
+                    with open(filename, 'r') as f:
+                        day_posts = json.load(f).get('posts', [])
+            except Exception as e:
+                print(f"Error loading posts for {date_str}: {e}")
+                continue
+            for post in day_posts:
+                posts.setdefault(post['id'], post)
+        return sorted(posts.values(), key=lambda x: x['created_utc'], reverse=True)
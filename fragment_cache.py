@@ -0,0 +1,139 @@
+"""Cache of rendered post cards for the rolling multi-day report"""
+import hashlib
+import sqlite3
+from typing import Dict, List, Optional
+
+# Rendered cards are written in batches of this size
+WRITE_BATCH_SIZE = 500
+# Post fields the card template shows; a change to any of them re-renders the card
+CARD_FIELDS = ('title', 'url', 'subreddit', 'author', 'created_date', 'score', 'num_comments',
+               'selftext', 'sentiment', 'priority', 'categories', 'comment_matches',
+               'comments_harvested', 'top_comments', 'cluster', 'cluster_total')
+
+
+class FragmentCache:
+    """
+    Rendered post card HTML keyed by post ID and a hash of its card fields
+
+    A cached card is reused only while the post's fields hash the same, so a
+    post whose score, comments or analysis changed is rendered again. The
+    ``template`` fingerprint is stored with the cache and a different one
+    (the card template was edited) discards every entry.
+
+    Fragments live in a small SQLite file, so a run only writes the cards it
+    rendered. ``save`` also drops the cards not used since opening: the
+    rolling window moves forward each day and posts that fell out of it go.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS fragments (
+            post_id TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            html TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None, template: str = ''):
+        """
+        Args:
+            path: SQLite file to keep the fragments in (None keeps them in memory)
+            template: Fingerprint of the card template the fragments came from
+        """
+        self.path = path
+        self.template = template
+        self.hits = 0
+        self.misses = 0
+        self._rendered = []
+        self._used = set()
+        try:
+            self.conn = sqlite3.connect(path or ':memory:')
+            self.conn.executescript(self.SCHEMA)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'template'").fetchone()
+            if row is None or row[0] != template:
+                with self.conn:
+                    self.conn.execute('DELETE FROM fragments')
+                    self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('template', ?)",
+                                      (template,))
+        except Exception as e:
+            print(f"Error loading fragment cache: {e}")
+            self.conn = sqlite3.connect(':memory:')
+            self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def digest(post: Dict) -> str:
+        """Hash of the fields a post card displays"""
+        encoded = '\x1f'.join(str(post.get(name)) for name in CARD_FIELDS)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many(self, posts: List[Dict]) -> List[Optional[str]]:
+        """
+        Cached card HTML for each post (one query for the whole batch)
+
+        Returns:
+            HTML per post, None where missing or out of date
+        """
+        ids = [post['id'] for post in posts]
+        placeholders = ','.join('?' * len(ids))
+        cached = {post_id: (digest, html) for post_id, digest, html in self.conn.execute(
+            f'SELECT post_id, digest, html FROM fragments WHERE post_id IN ({placeholders})', ids)}
+
+        results = []
+        for post in posts:
+            entry = cached.get(post['id'])
+            if entry is None or entry[0] != self.digest(post):
+                self.misses += 1
+                results.append(None)
+                continue
+            self._used.add(post['id'])
+            self.hits += 1
+            results.append(entry[1])
+        return results
+
+    def get(self, post: Dict) -> Optional[str]:
+        """Cached card HTML for ``post``, or None if missing or out of date"""
+        return self.get_many([post])[0]
+
+    def put(self, post: Dict, html: str):
+        """Store the freshly rendered card for ``post``"""
+        self._rendered.append((post['id'], self.digest(post), html))
+        self._used.add(post['id'])
+        if len(self._rendered) >= WRITE_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO fragments VALUES (?, ?, ?)', self._rendered)
+        self._rendered = []
+
+    def save(self):
+        """Write the remaining new cards and drop the ones not used since opening"""
+        try:
+            self._flush()
+            with self.conn:
+                self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS used (post_id TEXT PRIMARY KEY)')
+                self.conn.execute('DELETE FROM used')
+                self.conn.executemany('INSERT OR IGNORE INTO used VALUES (?)',
+                                      ((post_id,) for post_id in self._used))
+                self.conn.execute('DELETE FROM fragments WHERE post_id NOT IN (SELECT post_id FROM used)')
+        except Exception as e:
+            print(f"Error saving fragment cache: {e}")
+
+    def close(self):
+        self.conn.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self),
+        }
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM fragments').fetchone()[0]
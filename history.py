@@ -0,0 +1,191 @@
+"""Date-partitioned columnar history of analyzed posts (pandas + Parquet)"""
+import glob
+import importlib.util
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Sequence
+import config
+import metrics
+
+# Long text lives in its own files so trend queries never read it
+TEXT_COLUMNS = ['id', 'title', 'selftext', 'author', 'url']
+# Low-cardinality strings stored as pandas categoricals (Parquet dictionaries)
+CATEGORICAL_COLUMNS = ['subreddit', 'sentiment', 'priority', 'categories', 'keywords']
+POST_COLUMNS = ['id', 'subreddit', 'created_utc', 'score', 'num_comments', 'upvote_ratio',
+                'is_self', 'sentiment', 'polarity', 'subjectivity', 'priority', 'categories',
+                'keywords']
+# Stored joined with CATEGORY_SEPARATOR
+LIST_COLUMNS = ['categories', 'keywords']
+CATEGORY_SEPARATOR = '|'
+
+
+def _parquet_available() -> bool:
+    # Checks pyarrow is installed without importing it (and NumPy with it)
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class HistoryDataset:
+    """
+    Analyzed posts as a columnar dataset, one directory per collection date
+
+    Layout: ``<root>/date=YYYY-MM-DD/posts-<run>.parquet`` holds the numeric
+    and categorical columns, ``text-<run>.parquet`` the title, body, author
+    and URL. Each run adds its own part files, so a second run on the same
+    day never rewrites the first. A post's categories are stored joined with
+    ``|`` as one dictionary-encoded column (the set of combinations is small),
+    and so are its matched keywords. Columns added after a part was written
+    read back as missing values.
+
+    Parquet needs pyarrow; without it each part is a pickled DataFrame, which
+    keeps the same layout and the date and text pruning but reads all of its
+    columns.
+    """
+
+    def __init__(self, root: str = None, use_parquet: bool = None):
+        """
+        Args:
+            root: Dataset directory (defaults to config.HISTORY_DIR)
+            use_parquet: Force Parquet on/off (defaults to "if pyarrow is installed")
+        """
+        self.root = root or config.HISTORY_DIR
+        self.use_parquet = _parquet_available() if use_parquet is None else use_parquet
+        self.extension = 'parquet' if self.use_parquet else 'pkl'
+
+    def _partition(self, date_str: str) -> str:
+        return os.path.join(self.root, f'date={date_str}')
+
+    def _write_frame(self, frame, path: str):
+        tmp_path = f"{path}.tmp"
+        if self.use_parquet:
+            frame.to_parquet(tmp_path, index=False, compression='zstd')
+        else:
+            frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        metrics.count('history_bytes_written', os.path.getsize(path))
+
+    def _read_frame(self, path: str, columns: Sequence[str] = None):
+        import pandas as pd
+        if path.endswith('.parquet'):
+            if not columns:
+                return pd.read_parquet(path)
+            import pyarrow.parquet as pq
+            present = set(pq.read_schema(path).names)
+            frame = pd.read_parquet(path, columns=[c for c in columns if c in present])
+        else:
+            frame = pd.read_pickle(path)
+        return frame.reindex(columns=list(columns)) if columns else frame
+
+    @staticmethod
+    def _has_columns(path: str, columns: Sequence[str]) -> bool:
+        import pyarrow.parquet as pq
+        return set(columns) <= set(pq.read_schema(path).names)
+
+    def write(self, posts: List[Dict], date_str: str = None):
+        """
+        Append one run's analyzed posts to the date's partition
+
+        Args:
+            posts: Analyzed post dictionaries
+            date_str: Collection date (defaults to today)
+        """
+        if not posts:
+            return
+        import pandas as pd
+        if date_str is None:
+            date_str = datetime.now().strftime('%Y-%m-%d')
+
+        frame = pd.DataFrame.from_records(posts)
+        for column in LIST_COLUMNS:
+            if column in frame:
+                frame[column] = frame[column].map(
+                    lambda values: CATEGORY_SEPARATOR.join(values) if isinstance(values, list) else '')
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame:
+                frame[column] = frame[column].astype('category')
+
+        partition = self._partition(date_str)
+        os.makedirs(partition, exist_ok=True)
+        run = f"{int(time.time() * 1000)}"
+        self._write_frame(frame[[c for c in POST_COLUMNS if c in frame]],
+                          os.path.join(partition, f'posts-{run}.{self.extension}'))
+        self._write_frame(frame[[c for c in TEXT_COLUMNS if c in frame]],
+                          os.path.join(partition, f'text-{run}.{self.extension}'))
+
+    def dates(self) -> List[str]:
+        """Collection dates present in the dataset, oldest first"""
+        prefix = os.path.join(self.root, 'date=')
+        return sorted(path[len(prefix):] for path in glob.glob(f'{prefix}*'))
+
+    def load(self, columns: Sequence[str] = None, start: str = None, end: str = None,
+             text: bool = False):
+        """
+        Load part of the history as a DataFrame
+
+        Args:
+            columns: Post columns to read (default: all non-text columns)
+            start, end: Inclusive YYYY-MM-DD bounds on the collection date
+            text: Also join in the text columns
+
+        Returns:
+            DataFrame with a ``date`` column plus the requested columns
+        """
+        import pandas as pd
+        columns = list(columns) if columns else list(POST_COLUMNS)
+        text_wanted = [c for c in columns if c in TEXT_COLUMNS and c != 'id']
+        if text:
+            text_wanted = [c for c in TEXT_COLUMNS if c != 'id']
+        post_columns = [c for c in columns if c not in text_wanted]
+        if text_wanted and 'id' not in post_columns:
+            post_columns.append('id')
+
+        parts = []
+        for date_str in self.dates():
+            if (start and date_str < start) or (end and date_str > end):
+                continue
+            for path in sorted(glob.glob(os.path.join(self._partition(date_str), 'posts-*'))):
+                if not path.endswith('.tmp'):
+                    parts.append((date_str, path))
+        if not parts:
+            return pd.DataFrame(columns=['date'] + post_columns + text_wanted)
+
+        history = self._concat(parts, post_columns)
+        if text_wanted:
+            texts = self._concat([(date_str, path.replace(f'{os.sep}posts-', f'{os.sep}text-'))
+                                  for date_str, path in parts], ['id'] + text_wanted)
+            history = history.merge(texts.drop(columns='date'), on='id', how='left')
+        return history
+
+    def _concat(self, parts, columns: Sequence[str]):
+        """Read (date, path) parts into one frame with a categorical ``date`` column"""
+        import pandas as pd
+        if self.use_parquet and all(path.endswith('.parquet') and self._has_columns(path, columns)
+                                    for _, path in parts):
+            # One Arrow concat keeps every categorical as a dictionary column
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tables = []
+            for date_str, path in parts:
+                table = pq.read_table(path, columns=list(columns))
+                dates = pa.DictionaryArray.from_arrays(
+                    pa.array([0] * table.num_rows, type=pa.int32()), pa.array([date_str]))
+                tables.append(table.add_column(0, 'date', dates))
+            return pa.concat_tables(tables).to_pandas()
+
+        frames = []
+        for date_str, path in parts:
+            frame = self._read_frame(path, columns)
+            frame.insert(0, 'date', date_str)
+            frames.append(frame)
+        # Parts have different category sets, so concat falls back to object; re-encode
+        history = pd.concat(frames, ignore_index=True)
+        for column in CATEGORICAL_COLUMNS + ['date']:
+            if column in history:
+                history[column] = history[column].astype('category')
+        return history
+
+
+def split_categories(history, column: str = 'categories') -> List[List[str]]:
+    """A list column (``categories`` or ``keywords``) back as lists, as in the analyzed posts"""
+    return [value.split(CATEGORY_SEPARATOR) if isinstance(value, str) and value else []
+            for value in history[column]]
@@ -0,0 +1,192 @@
+"""Single-pass multi-keyword matching (Aho-Corasick)"""
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Label attached to the tracker's own search keywords
+KEYWORD_LABEL = 'keyword'
+# Below this many keywords C-level substring checks beat the pure-Python automaton
+AUTOMATON_MIN_KEYWORDS = 150
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of labelled keywords
+
+    The automaton is compiled once; every lookup is then a single pass over
+    the text no matter how many keywords there are. Each keyword can carry
+    several labels (e.g. the tracker keyword set and any number of analyzer
+    categories), so one scan answers "which keywords and which categories".
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]], word_boundary: bool = False):
+        """
+        Args:
+            keywords: Mapping of keyword -> labels it belongs to
+            word_boundary: Only count hits that start and end on word boundaries
+                (so 'bug' no longer matches 'debugging')
+        """
+        self.word_boundary = word_boundary
+        self.keywords: List[str] = []
+        self.labels: List[Set[str]] = []
+        positions: Dict[str, int] = {}
+        for keyword, labels in keywords.items():
+            keyword = keyword.lower().strip()
+            if not keyword:
+                continue
+            if keyword in positions:
+                self.labels[positions[keyword]].update(labels)
+            else:
+                positions[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+                self.labels.append(set(labels))
+        self._build()
+
+    @classmethod
+    def for_tracker(cls, keywords: Iterable[str], categories: Dict[str, Iterable[str]],
+                    word_boundary: bool = False) -> 'KeywordMatcher':
+        """
+        Build the shared matcher for the fetcher and analyzer
+
+        Small keyword sets get a ``SubstringMatcher``: one ``in`` check per
+        keyword runs in C and beats walking the automaton character by
+        character in Python until there are ``AUTOMATON_MIN_KEYWORDS``.
+
+        Args:
+            keywords: Tracker search keywords (``config.KEYWORDS``)
+            categories: Category -> keywords (``PostAnalyzer.CATEGORIES``)
+        """
+        labelled: Dict[str, Set[str]] = {}
+        for keyword in keywords:
+            labelled.setdefault(keyword.lower().strip(), set()).add(KEYWORD_LABEL)
+        for category, category_keywords in categories.items():
+            for keyword in category_keywords:
+                labelled.setdefault(keyword.lower().strip(), set()).add(category)
+        labelled.pop('', None)
+        if cls is KeywordMatcher and len(labelled) < AUTOMATON_MIN_KEYWORDS:
+            cls = SubstringMatcher
+        return cls(labelled, word_boundary=word_boundary)
+
+    def _build(self):
+        """Compile the goto, failure and output tables"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (index,)
+
+        # Breadth-first pass to link each state to its longest proper suffix
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def _transition(self, node: int, char: str) -> int:
+        """
+        Follow failure links for a missing edge and cache the result
+
+        Caching turns the trie into a (lazily filled) DFA, so later scans take
+        exactly one dict lookup per character.
+        """
+        state = node
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(char, 0)
+        self._goto[node][char] = target
+        return target
+
+    def _iter_hits(self, text: str):
+        """Yield the index of every keyword occurrence in ``text``"""
+        goto, out, keywords = self._goto, self._out, self.keywords
+        word_boundary = self.word_boundary
+        node = 0
+        for position, char in enumerate(text):
+            target = goto[node].get(char)
+            node = self._transition(node, char) if target is None else target
+            if not out[node]:
+                continue
+            for index in out[node]:
+                if word_boundary:
+                    start = position - len(keywords[index]) + 1
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if position + 1 < len(text) and _is_word_char(text[position + 1]):
+                        continue
+                yield index
+
+    def find(self, text: str) -> Set[str]:
+        """All keywords that occur in ``text`` (case-insensitive)"""
+        return {self.keywords[index] for index in self._iter_hits(text.lower())}
+
+    def scan(self, text: str, label: str = None) -> Tuple[Set[str], Set[str]]:
+        """
+        Keyword and label hits in a single pass over ``text``
+
+        Args:
+            label: Only return keywords carrying this label (all labels are
+                still returned)
+
+        Returns:
+            (matched keywords, matched labels)
+        """
+        indexes = set(self._iter_hits(text.lower()))
+        labels = set()
+        for index in indexes:
+            labels.update(self.labels[index])
+        return {self.keywords[index] for index in indexes
+                if label is None or label in self.labels[index]}, labels
+
+    def matches(self, text: str, label: str = None) -> bool:
+        """True as soon as any keyword (optionally with ``label``) is found"""
+        for index in self._iter_hits(text.lower()):
+            if label is None or label in self.labels[index]:
+                return True
+        return False
+
+
+class SubstringMatcher(KeywordMatcher):
+    """
+    Same lookups as ``KeywordMatcher``, one substring check per keyword
+
+    Cost grows with the number of keywords, but each check is a single
+    C-level ``in``, so for small sets it is the faster of the two.
+    """
+
+    def _build(self):
+        pass
+
+    def _iter_hits(self, text: str):
+        """Yield the index of every keyword found in ``text`` (once each)"""
+        for index, keyword in enumerate(self.keywords):
+            if keyword not in text:
+                continue
+            if not self.word_boundary:
+                yield index
+                continue
+            start = text.find(keyword)
+            while start != -1:
+                end = start + len(keyword)
+                if ((start == 0 or not _is_word_char(text[start - 1])) and
+                        (end == len(text) or not _is_word_char(text[end]))):
+                    yield index
+                    break
+                start = text.find(keyword, start + 1)
@@ -1,69 +1,250 @@
 """Main script to run the Reddit tracker"""
+import argparse
 import sys
+import time
 from datetime import datetime
-from reddit_fetcher import RedditFetcher
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from data_manager import DataManager
-from analyzer import PostAnalyzer
-from report_generator import ReportGenerator
+from report_generator import ReportGenerator, template_environment
 import config
+import metrics
 
+if TYPE_CHECKING:
+    # Imported by Tracker only when a run fetches and analyzes: PRAW, NumPy
+    # and the sentiment backends stay out of --help and --report-only
+    from reddit_fetcher import RedditFetcher
+    from analyzer import PostAnalyzer
+    from comment_harvester import CommentHarvester
+    from post_clusters import ClusterIndex
+    from trend_detector import TrendDetector
 
-def main():
-    """Main execution function"""
-    print("=" * 60)
-    print("🎯 Reddit Tracker - Complaints & Demands Collector")
-    print("=" * 60)
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far (0 where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def collect_batch(fetcher: 'RedditFetcher', data_manager: DataManager, analyzer: 'PostAnalyzer',
+                  started: float, timings: Dict = None) -> Tuple[List[Dict], Optional[float]]:
+    """
+    Fetch every subreddit, then filter, then analyze
+    
+    Args:
+        timings: Optional dict that receives seconds per stage
+            ('fetch', 'filter', 'analyze')
+    
+    Returns:
+        (analyzed posts newest first, seconds until the first post was analyzed)
+    """
+    timings = {} if timings is None else timings
+    stage_start = time.perf_counter()
+    all_posts = fetcher.fetch_all_subreddits()
+    timings['fetch'] = time.perf_counter() - stage_start
     print()
+    print(f"✅ Fetched {len(all_posts)} posts matching keywords")
     
-    # Check if API credentials are set
-    if not config.REDDIT_CLIENT_ID or not config.REDDIT_CLIENT_SECRET:
-        print("❌ ERROR: Reddit API credentials not configured!")
-        print("Please set REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET in .env file")
-        print("Get credentials from: https://www.reddit.com/prefs/apps")
-        sys.exit(1)
+    # Filter for new posts only
+    print("🆕 Filtering for new posts...")
+    stage_start = time.perf_counter()
+    new_posts = data_manager.filter_new_posts(all_posts)
+    timings['filter'] = time.perf_counter() - stage_start
+    print(f"   Found {len(new_posts)} new posts")
+    if not new_posts:
+        return [], None
     
-    try:
-        # Initialize components
+    print()
+    print("🧠 Analyzing posts (sentiment & categorization)...")
+    stage_start = time.perf_counter()
+    analyzed_posts = analyzer.analyze_posts(new_posts)
+    timings['analyze'] = time.perf_counter() - stage_start
+    return analyzed_posts, time.perf_counter() - started
+
+
+def collect_streaming(fetcher: 'RedditFetcher', data_manager: DataManager,
+                      analyzer: 'PostAnalyzer', started: float,
+                      timings: Dict = None) -> Tuple[List[Dict], Optional[float]]:
+    """
+    Filter and analyze each subreddit's posts while the others are still fetching
+    
+    Args:
+        timings: Optional dict that receives seconds per stage. Fetching
+            overlaps the other stages, so 'fetch' is the whole collection
+            and 'filter'/'analyze' the time spent on them in between.
+    
+    Returns:
+        (analyzed posts newest first, seconds until the first post was analyzed)
+    """
+    timings = {} if timings is None else timings
+    timings['filter'] = timings['analyze'] = 0.0
+    analyzed_posts = []
+    first_analyzed = None
+    fetched = new = 0
+    stage_start = time.perf_counter()
+    for batch in fetcher.iter_all_subreddits():
+        fetched += len(batch)
+        filter_start = time.perf_counter()
+        new_posts = data_manager.filter_new_posts(batch)
+        timings['filter'] += time.perf_counter() - filter_start
+        new += len(new_posts)
+        if not new_posts:
+            continue
+        # In-process: the overlap comes from the fetch threads, not a process pool
+        analyze_start = time.perf_counter()
+        analyzed_posts.extend(analyzer.analyze_posts(new_posts, workers=1))
+        timings['analyze'] += time.perf_counter() - analyze_start
+        if first_analyzed is None:
+            first_analyzed = time.perf_counter() - started
+    timings['fetch'] = time.perf_counter() - stage_start
+    
+    print()
+    print(f"✅ Fetched {fetched} posts matching keywords")
+    print(f"🆕 Found {new} new posts (analyzed while fetching)")
+    # The report lists posts newest first; this is the only stage that needs them all
+    analyzed_posts.sort(key=lambda x: x['created_utc'], reverse=True)
+    return analyzed_posts, first_analyzed
+
+
+def generate_rolling_report(report_gen: ReportGenerator, data_manager: DataManager, date_str: str,
+                            trends: List[Dict] = None):
+    """Build the last-N-days report (config.ROLLING_REPORT_DAYS) from saved posts"""
+    days = config.ROLLING_REPORT_DAYS
+    print(f"📊 Generating {days}-day rolling report...")
+    posts = data_manager.load_recent_posts(days, date_str)
+    report_path = report_gen.generate_rolling_report(posts, days, date_str, trends)
+    print(f"📄 Generated rolling report: {report_path}")
+
+
+class Tracker:
+    """
+    The tracker's components, built once and reused for every run
+    
+    ``main`` makes one and runs it once. The scheduler's daemon mode keeps
+    one alive, so the Reddit clients (and their OAuth tokens), the seen-ID
+    index, the sentiment lexicon and cache and the compiled report templates
+    stay in memory between runs.
+    """
+    
+    # Stages reported per run, in pipeline order
+    STAGES = ('fetch', 'filter', 'analyze', 'trends', 'comments', 'cluster', 'save', 'report')
+    
+    def __init__(self, whole_day_report: bool = False):
+        """
+        Args:
+            whole_day_report: Report every post saved today instead of only
+                this run's (for several runs a day)
+        """
+        from reddit_fetcher import RedditFetcher
+        from analyzer import PostAnalyzer
+        from keyword_matcher import KeywordMatcher
+        
+        self.whole_day_report = whole_day_report
+        # One keyword automaton shared by the fetcher and the analyzer
+        matcher = KeywordMatcher.for_tracker(
+            config.KEYWORDS, PostAnalyzer.CATEGORIES, word_boundary=config.KEYWORD_WORD_BOUNDARY
+        )
+        
         print("📡 Initializing Reddit API client...")
-        fetcher = RedditFetcher()
+        self.fetcher = RedditFetcher(matcher=matcher)
         
         print("💾 Loading data manager...")
-        data_manager = DataManager()
+        self.data_manager = DataManager()
+        seen = self.data_manager.seen_posts
+        print(f"   Seen posts: {len(seen)} IDs ({seen.memory_bytes() / 1024:.0f} KB in memory)")
+        self.fetcher.cursors = self.data_manager.load_listing_cursors()
         
         print("🔍 Initializing analyzer...")
-        analyzer = PostAnalyzer()
+        self.analyzer = PostAnalyzer(matcher=matcher)
+        
+        self.harvester: Optional['CommentHarvester'] = None
+        if config.COMMENT_HARVEST:
+            from comment_harvester import CommentHarvester
+            self.harvester = CommentHarvester(self.fetcher, self.analyzer)
+        
+        self.clusters: Optional['ClusterIndex'] = None
+        if config.CLUSTER_POSTS:
+            from post_clusters import ClusterIndex
+            self.clusters = ClusterIndex()
+        
+        self.trends: Optional['TrendDetector'] = None
+        if config.TREND_DETECTION:
+            from trend_detector import TrendDetector
+            self.trends = TrendDetector()
         
         print("📊 Initializing report generator...")
-        report_gen = ReportGenerator()
+        self.report_gen = ReportGenerator()
+        # Whether the last run() stored everything its cursors cover
+        self.run_succeeded = False
+    
+    def warm_up(self):
+        """Load the sentiment lexicon and report templates before the first run"""
+        self.analyzer.backend.warm_up()
+        # Workers start with the first batch that needs them, then stay up
+        self.analyzer.open_pool()
+        for name in ('report.html', '_post.html'):
+            template_environment().get_template(name)
+    
+    def run(self) -> Dict:
+        """
+        One fetch -> filter -> analyze -> save -> report run
         
-        print()
+        If the run fails the listing cursors go back to where they were, so
+        the next run fetches the posts this one never stored.
+        
+        Returns:
+            {'posts': new posts, 'report': report path, 'timings': seconds per stage}
+        """
+        cursors = {name: dict(cursor) for name, cursor in self.fetcher.cursors.items()}
+        self.run_succeeded = False
+        try:
+            result = self._run()
+        except BaseException:
+            self.fetcher.cursors = cursors
+            raise
+        self.run_succeeded = True
+        return result
+    
+    def _run(self) -> Dict:
         print(f"📥 Fetching posts from {len(config.SUBREDDITS)} subreddit(s)...")
         print(f"   Subreddits: {', '.join(config.SUBREDDITS)}")
         print()
         
-        # Fetch all posts
-        all_posts = fetcher.fetch_all_subreddits()
-        print()
-        print(f"✅ Fetched {len(all_posts)} posts matching keywords")
-        
-        # Filter for new posts only
-        print("🆕 Filtering for new posts...")
-        new_posts = data_manager.filter_new_posts(all_posts)
-        print(f"   Found {len(new_posts)} new posts")
+        metrics.start_run()
+        timings = {}
+        collect = collect_streaming if config.PIPELINE_MODE == 'stream' else collect_batch
+        started = time.perf_counter()
+        analyzed_posts, first_analyzed = collect(self.fetcher, self.data_manager, self.analyzer,
+                                                 started, timings)
+        date_str = datetime.now().strftime('%Y-%m-%d')
         
-        if len(new_posts) == 0:
+        if len(analyzed_posts) == 0:
             print()
             print("✨ No new posts found! You're all caught up.")
-            # Still generate a report with empty data
-            date_str = datetime.now().strftime('%Y-%m-%d')
-            report_path = report_gen.generate_report([], date_str)
+            # Detection closes buckets and prunes series, so the state is saved too
+            trends = self._detect_trends([], timings)
+            stage_start = time.perf_counter()
+            self.data_manager.save_listing_cursors(self.fetcher.cursors)
+            if self.trends is not None:
+                self.trends.save()
+            timings['save'] = time.perf_counter() - stage_start
+            # Still generate a report (with empty data, or today's earlier posts)
+            stage_start = time.perf_counter()
+            report_path = self._generate_reports([], date_str, trends)
+            timings['report'] = time.perf_counter() - stage_start
             print(f"📄 Generated report: {report_path}")
-            return
+            return self._finish(0, report_path, timings, started)
         
-        # Analyze posts
-        print()
-        print("🧠 Analyzing posts (sentiment & categorization)...")
-        analyzed_posts = analyzer.analyze_posts(new_posts)
+        if self.analyzer.cache is not None:
+            cache_stats = self.analyzer.cache.stats()
+            print(f"   Sentiment cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        print(f"   ⏱️  {config.PIPELINE_MODE.capitalize()} pipeline: first post analyzed after "
+              f"{first_analyzed:.2f}s, all {len(analyzed_posts)} after "
+              f"{time.perf_counter() - started:.2f}s (peak RSS {peak_rss_mb():.0f} MB)")
         
         # Show summary
         high_priority = sum(1 for p in analyzed_posts if p.get('priority') == 'High')
@@ -72,21 +253,213 @@ def main():
         print(f"   High Priority: {high_priority}")
         print(f"   Negative Sentiment: {negative}")
         
+        trends = self._detect_trends(analyzed_posts, timings)
+        if self.harvester is not None:
+            self._harvest_comments(analyzed_posts, timings)
+        if self.clusters is not None:
+            self._cluster_posts(analyzed_posts, timings)
+        
         # Save data
         print()
         print("💾 Saving data...")
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        data_manager.save_daily_data(analyzed_posts, date_str)
-        data_manager.mark_as_seen(analyzed_posts)
+        stage_start = time.perf_counter()
+        self.data_manager.save_daily_data(analyzed_posts, date_str)
+        self.data_manager.mark_as_seen(analyzed_posts)
+        self.analyzer.save_cache()
+        if self.trends is not None:
+            self.trends.save()
+        # Advance cursors only once the posts they cover are safely stored
+        self.data_manager.save_listing_cursors(self.fetcher.cursors)
+        timings['save'] = time.perf_counter() - stage_start
         
         # Generate report
         print("📊 Generating HTML report...")
-        report_path = report_gen.generate_report(analyzed_posts, date_str)
+        stage_start = time.perf_counter()
+        report_path = self._generate_reports(analyzed_posts, date_str, trends)
+        timings['report'] = time.perf_counter() - stage_start
+        return self._finish(len(analyzed_posts), report_path, timings, started)
+    
+    def _detect_trends(self, analyzed_posts: List[Dict], timings: Dict) -> Optional[List[Dict]]:
+        """Count the run's posts into the trend series and flag spikes"""
+        if self.trends is None:
+            return None
+        print()
+        print("📈 Detecting trends...")
+        stage_start = time.perf_counter()
+        self.trends.update(analyzed_posts)
+        trends = self.trends.detect()
+        timings['trends'] = time.perf_counter() - stage_start
+        if not trends:
+            print(f"   No spikes across {len(self.trends)} series")
+        for trend in trends:
+            print(f"   📈 {self.trends.describe(trend)}")
+        return trends
+    
+    def _harvest_comments(self, analyzed_posts: List[Dict], timings: Dict):
+        """Read and analyze the comment threads of the run's busiest posts"""
+        print()
+        print(f"💬 Reading comments of up to {self.harvester.max_posts} posts...")
+        stage_start = time.perf_counter()
+        summary = self.harvester.harvest(analyzed_posts)
+        timings['comments'] = time.perf_counter() - stage_start
+        for line in self.harvester.summary_lines(summary):
+            print(f"   {line}")
+    
+    def _cluster_posts(self, analyzed_posts: List[Dict], timings: Dict):
+        """Group near-duplicates with each other and with earlier days' clusters"""
+        print()
+        print("🔁 Clustering near-duplicate posts...")
+        stage_start = time.perf_counter()
+        self.clusters.prune()
+        summary = self.clusters.assign(analyzed_posts)
+        timings['cluster'] = time.perf_counter() - stage_start
+        print(f"   {summary['duplicates']} of {summary['posts']} posts are near-duplicates "
+              f"({summary['clusters']} clusters this run, {summary['joined_earlier']} matched "
+              f"earlier posts) in {summary['seconds']:.2f}s")
+    
+    def _generate_reports(self, analyzed_posts: List[Dict], date_str: str,
+                          trends: List[Dict] = None) -> str:
+        """Write the day's report (and the rolling one, if enabled)"""
+        if self.whole_day_report:
+            analyzed_posts = self.data_manager.load_recent_posts(1, date_str)
+        report_path = self.report_gen.generate_report(analyzed_posts, date_str, trends)
+        if config.ROLLING_REPORT_DAYS > 0:
+            generate_rolling_report(self.report_gen, self.data_manager, date_str, trends)
+        return report_path
+    
+    def _finish(self, posts: int, report_path: str, timings: Dict, started: float) -> Dict:
+        timings['total'] = time.perf_counter() - started
+        stages = ' · '.join(f"{stage} {timings[stage]:.2f}s" for stage in self.STAGES
+                            if stage in timings)
+        print(f"   ⏱️  Run latency: {stages} · total {timings['total']:.2f}s")
+        record = metrics.write_run({
+            'posts': posts,
+            'pipeline': config.PIPELINE_MODE,
+            'stages': {stage: round(seconds, 4) for stage, seconds in timings.items()},
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        })
+        if record is not None:
+            counters = record['counters']
+            print(f"   📏 Metrics: {counters.get('api_requests', 0)} API requests, "
+                  f"{counters.get('sleep_seconds', 0):.2f}s slept, "
+                  f"{counters.get('sentiment_scored', 0)} posts scored -> {config.METRICS_FILE}")
+        return {'posts': posts, 'report': report_path, 'timings': timings}
+    
+    def close(self, compact_seen: bool = False):
+        """
+        Flush state to disk: sentiment cache, trends, listing cursors, databases
+        
+        Args:
+            compact_seen: Also fold the seen-ID log into the snapshot (on
+                daemon shutdown; one-shot runs leave that to ``SeenStore``)
+        """
+        self.analyzer.close_pool()
+        self.analyzer.save_cache()
+        if self.trends is not None:
+            self.trends.save()
+        if self.run_succeeded:
+            # After a failed run the cursors may cover posts that were never stored
+            self.data_manager.save_listing_cursors(self.fetcher.cursors)
+        if compact_seen:
+            try:
+                # Fold the run logs into one snapshot so the next start loads fast
+                self.data_manager.seen_posts.compact()
+            except Exception as e:
+                print(f"Error saving seen posts: {e}")
+        if self.data_manager.warehouse is not None:
+            self.data_manager.warehouse.close()
+        if self.clusters is not None:
+            self.clusters.close()
+
+
+def report_only(date_str: str = None) -> str:
+    """
+    Rebuild a day's report (and the rolling one, if enabled) from saved posts
+    
+    Nothing is fetched or analyzed, so no API credentials are needed and
+    PRAW, NumPy and the sentiment backends are never imported. Trends (with
+    TREND_DETECTION on) are the saved ones, so only today's report shows them.
+    
+    Args:
+        date_str: Day to rebuild (YYYY-MM-DD, defaults to today)
+        
+    Returns:
+        Path to the generated HTML file
+    """
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    data_manager = DataManager()
+    report_gen = ReportGenerator()
+    posts = data_manager.load_recent_posts(1, date_str)
+    trends = None
+    if config.TREND_DETECTION and date_str == datetime.now().strftime('%Y-%m-%d'):
+        from trend_detector import TrendDetector
+        trends = TrendDetector().detect()
+    print(f"📊 Rebuilding the {date_str} report from {len(posts)} saved posts...")
+    report_path = report_gen.generate_report(posts, date_str, trends)
+    if config.ROLLING_REPORT_DAYS > 0:
+        generate_rolling_report(report_gen, data_manager, date_str, trends)
+    if data_manager.warehouse is not None:
+        data_manager.warehouse.close()
+    return report_path
+
+
+def require_credentials():
+    """Exit with instructions unless Reddit API credentials are set (replay needs none)"""
+    if config.REDDIT_SOURCE != 'replay' and (
+            not config.REDDIT_CLIENT_ID or not config.REDDIT_CLIENT_SECRET):
+        print("❌ ERROR: Reddit API credentials not configured!")
+        print("Please set REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET in .env file")
+        print("Get credentials from: https://www.reddit.com/prefs/apps")
+        sys.exit(1)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Command line options (``argv`` defaults to sys.argv[1:])"""
+    parser = argparse.ArgumentParser(
+        description="Collect complaint and demand posts from Reddit and build an HTML report"
+    )
+    parser.add_argument('--report-only', action='store_true',
+                        help="rebuild the report from posts saved earlier, without fetching")
+    parser.add_argument('--date', metavar='YYYY-MM-DD',
+                        help="day to rebuild with --report-only (default: today)")
+    args = parser.parse_args(argv)
+    if args.date:
+        try:
+            datetime.strptime(args.date, '%Y-%m-%d')
+        except ValueError:
+            parser.error(f"invalid --date {args.date!r}, expected YYYY-MM-DD")
+    return args
+
+
+def main(argv: List[str] = None):
+    """Main execution function"""
+    args = parse_args(argv)
+    print("=" * 60)
+    print("🎯 Reddit Tracker - Complaints & Demands Collector")
+    print("=" * 60)
+    print()
+    
+    if args.report_only:
+        print(f"📄 Generated report: {report_only(args.date)}")
+        return
+    
+    require_credentials()
+    
+    try:
+        tracker = Tracker()
+        print()
+        try:
+            result = tracker.run()
+        finally:
+            # Same flush as the daemon's, minus the seen-ID compaction
+            tracker.close()
+        if result['posts'] == 0:
+            return
         
         print()
         print("=" * 60)
         print("✅ SUCCESS! Report generated:")
-        print(f"📄 {report_path}")
+        print(f"📄 {result['report']}")
         print("=" * 60)
         print()
         print("💡 TIP: Open the HTML file in your browser to view the report")
@@ -0,0 +1,176 @@
+"""Per-run timers and counters, written as JSON lines or a Prometheus textfile"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import config
+
+# Prefix of every metric in the Prometheus output
+PROMETHEUS_PREFIX = 'reddit_tracker'
+
+_enabled = False
+_lock = threading.Lock()
+_timers: Dict[str, Dict] = {}
+_counters: Dict[str, float] = {}
+_run_started = None
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def start_run(enabled: bool = None):
+    """
+    Clear the recorded metrics and start recording a run
+
+    Until the first call (and when ``enabled`` is false) timers and counters
+    are no-ops, so instrumented code costs a function call and a flag check.
+
+    Args:
+        enabled: Record this run (defaults to ``config.METRICS``)
+    """
+    global _enabled, _run_started
+    with _lock:
+        _enabled = config.METRICS if enabled is None else enabled
+        _timers.clear()
+        _counters.clear()
+        _run_started = time.time()
+
+
+def stop():
+    """Stop recording without writing anything"""
+    global _enabled
+    _enabled = False
+
+
+def count(name: str, value: float = 1):
+    """Add ``value`` to the counter ``name`` (thread-safe)"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Timer:
+    """Adds the time spent in a ``with`` block to a named timer"""
+
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        with _lock:
+            timer = _timers.setdefault(self.name, {'seconds': 0.0, 'calls': 0})
+            timer['seconds'] += elapsed
+            timer['calls'] += 1
+        return False
+
+
+def timer(name: str):
+    """
+    Context manager timing a block into ``name``
+
+    Calls from several threads add up, so a stage run by the fetch workers
+    reports total worker time, which can exceed the run's wall time.
+    """
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function into ``name``"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Dict:
+    """The run's metrics so far as one JSON-ready record"""
+    with _lock:
+        return {
+            'run_started': datetime.fromtimestamp(_run_started).isoformat() if _run_started else None,
+            'run_seconds': round(time.time() - _run_started, 3) if _run_started else 0.0,
+            'timers': {name: {'seconds': round(timer['seconds'], 4), 'calls': timer['calls']}
+                       for name, timer in sorted(_timers.items())},
+            'counters': {name: round(value, 4) if isinstance(value, float) else value
+                         for name, value in sorted(_counters.items())},
+        }
+
+
+def render_prometheus(record: Dict) -> str:
+    """
+    Format a run record in the Prometheus text exposition format
+
+    Timers become ``<prefix>_timer_seconds``/``_timer_calls`` with a ``name``
+    label, the run's wall-clock ``stages`` (if given) ``<prefix>_stage_seconds``
+    with a ``stage`` label, and counters and other numeric fields one gauge each.
+    """
+    def family(name: str, help_text: str, samples):
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+        lines.extend(f"{PROMETHEUS_PREFIX}_{name}{labels} {value}" for labels, value in samples)
+
+    lines = []
+    timers = record['timers'].items()
+    family('timer_seconds', "Seconds spent in each instrumented call during the last run",
+           ((f'{{name="{name}"}}', timer['seconds']) for name, timer in timers))
+    family('timer_calls', "Instrumented calls during the last run",
+           ((f'{{name="{name}"}}', timer['calls']) for name, timer in timers))
+    if record.get('stages'):
+        family('stage_seconds', "Wall-clock seconds per pipeline stage in the last run",
+               ((f'{{stage="{stage}"}}', seconds) for stage, seconds in record['stages'].items()))
+    numbers = dict(record['counters'])
+    numbers.update((key, value) for key, value in record.items()
+                   if isinstance(value, (int, float)) and not isinstance(value, bool))
+    numbers['last_run_timestamp_seconds'] = int(time.time())
+    for name, value in numbers.items():
+        family(name, "Value from the last run", [('', value)])
+    return '\n'.join(lines) + '\n'
+
+
+def write_run(extra: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Write the run's metrics and stop recording
+
+    One JSON line per run is appended to ``config.METRICS_FILE``; when
+    ``config.METRICS_PROMETHEUS_FILE`` is set, the node_exporter textfile is
+    replaced atomically as well.
+
+    Args:
+        extra: Fields added to the JSON record (e.g. post counts)
+
+    Returns:
+        The record written, or None when the run wasn't recorded
+    """
+    global _enabled
+    if not _enabled:
+        return None
+    record = snapshot()
+    record.update(extra or {})
+    _enabled = False
+    try:
+        with open(config.METRICS_FILE, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+    except Exception as e:
+        print(f"Error writing metrics: {e}")
+    if config.METRICS_PROMETHEUS_FILE:
+        tmp_path = f"{config.METRICS_PROMETHEUS_FILE}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(render_prometheus(record))
+            os.replace(tmp_path, config.METRICS_PROMETHEUS_FILE)
+        except Exception as e:
+            print(f"Error writing Prometheus metrics: {e}")
+    return record
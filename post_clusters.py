@@ -0,0 +1,340 @@
+"""Near-duplicate post clustering: MinHash signatures and a persistent LSH index"""
+import re
+import sqlite3
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import config
+import metrics
+
+
+# MinHash permutations are h -> (a*h + b) mod this Mersenne prime
+_PRIME = np.uint64((1 << 31) - 1)
+# Any script's words; text without word characters (emoji only) has no shingles
+_WORD = re.compile(r"\w+")
+# Fixed seed: signatures are stored, so every process must draw the same permutations
+_SEED = 20240611
+# Bumped when shingling changes, so signatures made the old way are dropped
+_SHINGLE_VERSION = 2
+
+
+@lru_cache(maxsize=200_000)
+def _word_hash(word: str) -> int:
+    return zlib.crc32(word.encode('utf-8'))
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """
+    Hashes of the text's word pairs (its single word if it has only one)
+
+    Word pairs survive small edits like a changed or added word in a title,
+    while unrelated posts that share common words rarely share many pairs.
+    """
+    words = np.fromiter((_word_hash(word) for word in _WORD.findall(text.lower())),
+                        dtype=np.uint64)
+    if len(words) < 2:
+        return words
+    with np.errstate(over='ignore'):
+        return np.unique(words[:-1] * np.uint64(0x9E3779B1) + words[1:])
+
+
+class ClusterIndex:
+    """
+    Groups near-duplicate posts into clusters that persist across runs
+
+    Each post gets a MinHash signature over the word pairs of its title and
+    text. Signatures are cut into LSH bands, so only posts sharing a band are
+    compared, keeping a run roughly linear in its number of posts. Pairs whose
+    estimated similarity reaches the threshold are joined with union-find.
+    Signatures and bands of the last ``CLUSTER_MAX_AGE_DAYS`` days are kept
+    in SQLite (``config.CLUSTER_INDEX_FILE``), so a new post joins a cluster
+    from an earlier day; the cluster keeps the ID of its oldest post.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS signatures (
+            post_id TEXT PRIMARY KEY,
+            cluster_id TEXT NOT NULL,
+            created_utc REAL NOT NULL,
+            signature BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS bands (
+            key INTEGER NOT NULL,
+            post_id TEXT NOT NULL,
+            PRIMARY KEY (key, post_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_signatures_cluster ON signatures(cluster_id);
+        CREATE INDEX IF NOT EXISTS idx_signatures_created ON signatures(created_utc);
+    """
+
+    def __init__(self, path: str = None, threshold: float = None, num_perm: int = None,
+                 bands: int = None):
+        """
+        Args:
+            path: Index database (defaults to config.CLUSTER_INDEX_FILE; ':memory:' for none)
+            threshold: Estimated Jaccard similarity that makes two posts duplicates
+            num_perm: MinHash permutations per signature
+            bands: LSH bands (must divide ``num_perm``); more bands find
+                less similar candidate pairs at the cost of more comparisons
+        """
+        self.path = path or config.CLUSTER_INDEX_FILE
+        if path is None:
+            config.ensure_directories()
+        self.threshold = config.CLUSTER_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm or config.CLUSTER_NUM_PERM
+        self.bands = bands or config.CLUSTER_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"CLUSTER_BANDS ({self.bands}) must divide "
+                             f"CLUSTER_NUM_PERM ({self.num_perm})")
+        self.rows = self.num_perm // self.bands
+
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, int(_PRIME), self.num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, int(_PRIME), self.num_perm, dtype=np.uint64)[:, None]
+        # One odd 64-bit multiplier per row and one salt per band to key the band buckets
+        self._row_mix = rng.integers(1, 1 << 63, self.rows, dtype=np.uint64) | np.uint64(1)
+        self._band_salt = rng.integers(0, 1 << 63, self.bands, dtype=np.uint64)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+        self._check_layout()
+
+    def _check_layout(self):
+        """Start over if the stored signatures were made with other settings"""
+        layout = f"{self.num_perm}x{self.bands}:{_SEED}:{_SHINGLE_VERSION}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        if row is not None and row[0] == layout:
+            return
+        with self.conn:
+            self.conn.execute('DELETE FROM signatures')
+            self.conn.execute('DELETE FROM bands')
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (layout,))
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM signatures').fetchone()[0]
+
+    @staticmethod
+    def post_text(post: Dict) -> str:
+        return f"{post['title']} {post.get('selftext') or ''}"
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 MinHash signatures"""
+        return self._minhash([shingle_hashes(text) for text in texts])
+
+    def _minhash(self, shingles: Sequence[np.ndarray]) -> np.ndarray:
+        """Signatures of shingle sets (an empty set gets the all-max signature)"""
+        out = np.full((len(shingles), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for row, hashes in enumerate(shingles):
+            if len(hashes):
+                out[row] = ((self._a * (hashes % _PRIME) + self._b) % _PRIME).min(axis=1)
+        return out
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(len(signatures), bands) int64 bucket keys, one per band"""
+        bands = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        with np.errstate(over='ignore'):
+            keys = (bands * self._row_mix).sum(axis=2, dtype=np.uint64) + self._band_salt
+        return keys.view(np.int64)
+
+    def _similar(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Which signature pairs reach the threshold (estimated Jaccard similarity)"""
+        return (left == right).mean(axis=1) >= self.threshold
+
+    def _pairs_within(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Post index pairs sharing a band bucket, each paired with the bucket's first post"""
+        flat = keys.ravel()
+        posts = np.repeat(np.arange(len(keys)), self.bands)
+        order = np.argsort(flat, kind='stable')
+        flat, posts = flat[order], posts[order]
+        starts = np.ones(len(flat), dtype=bool)
+        starts[1:] = flat[1:] != flat[:-1]
+        anchors = posts[np.maximum.accumulate(np.where(starts, np.arange(len(flat)), 0))]
+        pairs = np.unique(np.stack([anchors, posts], axis=1)[anchors != posts], axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    def _matches_stored(self, keys: np.ndarray, signatures: np.ndarray) -> List[Tuple[int, str, str, float]]:
+        """
+        Stored posts similar to the new ones
+
+        Returns:
+            (new post index, stored cluster ID, stored post ID, stored created_utc)
+        """
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS probe (key INTEGER PRIMARY KEY)')
+        self.conn.execute('DELETE FROM probe')
+        self.conn.executemany('INSERT OR IGNORE INTO probe VALUES (?)',
+                              ((key,) for key in np.unique(keys).tolist()))
+        hits = self.conn.execute(
+            'SELECT b.key, b.post_id FROM probe JOIN bands b ON b.key = probe.key'
+        ).fetchall()
+        self.conn.execute('DELETE FROM probe')
+        if not hits:
+            return []
+        stored_ids = sorted({post_id for _, post_id in hits})
+        stored = {}
+        for start in range(0, len(stored_ids), 500):
+            chunk = stored_ids[start:start + 500]
+            stored.update((row[0], row[1:]) for row in self.conn.execute(
+                'SELECT post_id, cluster_id, created_utc, signature FROM signatures '
+                f'WHERE post_id IN ({",".join("?" * len(chunk))})', chunk))
+        stored_ids = [post_id for post_id in stored_ids if post_id in stored]
+        codes = {post_id: code for code, post_id in enumerate(stored_ids)}
+        hits = [(key, codes[post_id]) for key, post_id in hits if post_id in codes]
+        if not hits:
+            return []
+
+        # Join every new post's band keys with the stored posts holding the same keys
+        hits.sort()
+        hit_keys = np.array([key for key, _ in hits], dtype=np.int64)
+        hit_posts = np.array([code for _, code in hits], dtype=np.int64)
+        flat = keys.ravel()
+        first = np.searchsorted(hit_keys, flat, side='left')
+        counts = np.searchsorted(hit_keys, flat, side='right') - first
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        new_idx = np.repeat(np.arange(len(flat)) // self.bands, counts)
+        old_idx = hit_posts[np.repeat(first, counts) + offsets]
+        pairs = np.unique(new_idx * len(stored_ids) + old_idx)
+        new_idx, old_idx = pairs // len(stored_ids), pairs % len(stored_ids)
+
+        stored_signatures = np.frombuffer(b''.join(stored[post_id][2] for post_id in stored_ids),
+                                          dtype=np.uint32).reshape(len(stored_ids), self.num_perm)
+        similar = self._similar(signatures[new_idx], stored_signatures[old_idx])
+        matches = []
+        for idx, code in zip(new_idx[similar].tolist(), old_idx[similar].tolist()):
+            cluster_id, created_utc, _ = stored[stored_ids[code]]
+            matches.append((idx, cluster_id, stored_ids[code], created_utc))
+        return matches
+
+    @metrics.timed('cluster_posts')
+    def assign(self, posts: List[Dict]) -> Dict:
+        """
+        Set ``cluster_id`` (and ``cluster_total``, the cluster's size across
+        the indexed days) on each post, and add the posts to the index
+
+        Posts without any words (e.g. emoji only) are left out: their empty
+        signatures would all match each other.
+
+        Returns:
+            {'posts', 'duplicates' (posts that joined another post's cluster),
+             'clusters' (clusters with more than one of these posts),
+             'joined_earlier' (posts matched to an earlier run's cluster),
+             'skipped' (posts without words), 'seconds'}
+        """
+        started = time.perf_counter()
+        summary = {'posts': len(posts), 'duplicates': 0, 'clusters': 0, 'joined_earlier': 0}
+        shingles = [shingle_hashes(self.post_text(post)) for post in posts]
+        posts = [post for post, hashes in zip(posts, shingles) if len(hashes)]
+        summary['skipped'] = summary['posts'] - len(posts)
+        if not posts:
+            summary['seconds'] = time.perf_counter() - started
+            return summary
+        signatures = self._minhash([hashes for hashes in shingles if len(hashes)])
+        keys = self.band_keys(signatures)
+
+        # Union-find over new post indices and stored cluster IDs
+        parent: Dict = {}
+
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(left, right):
+            parent[find(left)] = find(right)
+
+        left, right = self._pairs_within(keys)
+        for a, b, similar in zip(left, right, self._similar(signatures[left], signatures[right])):
+            if similar:
+                union(int(a), int(b))
+        # A stored cluster is as old as its oldest post seen here
+        cluster_age: Dict[str, float] = {}
+        matched_earlier = set()
+        for idx, cluster_id, _, created_utc in self._matches_stored(keys, signatures):
+            union(idx, ('stored', cluster_id))
+            matched_earlier.add(idx)
+            cluster_age[cluster_id] = min(created_utc, cluster_age.get(cluster_id, created_utc))
+
+        # Name each cluster after its oldest stored cluster, else its oldest new post
+        members: Dict = {}
+        for idx in range(len(posts)):
+            members.setdefault(find(idx), []).append(idx)
+        for node in list(parent):
+            if isinstance(node, tuple):
+                members.setdefault(find(node), []).append(node)
+        renames = []
+        for group in members.values():
+            stored = sorted((cluster_age[node[1]], node[1]) for node in group if isinstance(node, tuple))
+            new = [idx for idx in group if not isinstance(idx, tuple)]
+            if stored:
+                cluster_id = stored[0][1]
+                # Two stored clusters bridged by a new post become one
+                renames.extend((cluster_id, old_id) for _, old_id in stored[1:])
+            else:
+                cluster_id = posts[min(new, key=lambda idx: posts[idx]['created_utc'])]['id']
+            for idx in new:
+                posts[idx]['cluster_id'] = cluster_id
+            summary['clusters'] += len(new) > 1
+            summary['duplicates'] += len(new) - (0 if stored else 1)
+        summary['joined_earlier'] = len(matched_earlier)
+
+        with self.conn:
+            self.conn.executemany('UPDATE signatures SET cluster_id = ? WHERE cluster_id = ?', renames)
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO signatures (post_id, cluster_id, created_utc, signature) '
+                'VALUES (?, ?, ?, ?)',
+                ((post['id'], post['cluster_id'], post['created_utc'], signatures[idx].tobytes())
+                 for idx, post in enumerate(posts))
+            )
+            # Inserted in key order, which is much faster into the clustered index
+            self.conn.executemany('INSERT OR IGNORE INTO bands (key, post_id) VALUES (?, ?)',
+                                  sorted((key, post['id']) for post, row in zip(posts, keys.tolist())
+                                         for key in row))
+        self._set_totals(posts)
+        metrics.count('near_duplicates', summary['duplicates'])
+        summary['seconds'] = time.perf_counter() - started
+        return summary
+
+    def _set_totals(self, posts: List[Dict]):
+        """Each post's cluster size over every indexed day"""
+        cluster_ids = {post['cluster_id'] for post in posts}
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (cluster_id TEXT)')
+        self.conn.execute('DELETE FROM wanted')
+        self.conn.executemany('INSERT INTO wanted VALUES (?)', ((c,) for c in cluster_ids))
+        totals = dict(self.conn.execute("""
+            SELECT s.cluster_id, COUNT(*) FROM signatures s
+            WHERE s.cluster_id IN (SELECT cluster_id FROM wanted) GROUP BY s.cluster_id
+        """).fetchall())
+        self.conn.execute('DELETE FROM wanted')
+        for post in posts:
+            post['cluster_total'] = totals.get(post['cluster_id'], 1)
+
+    def prune(self, max_age_days: float = None) -> int:
+        """
+        Forget posts older than ``max_age_days`` (config.CLUSTER_MAX_AGE_DAYS)
+
+        Returns:
+            Number of signatures removed
+        """
+        max_age_days = config.CLUSTER_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        if max_age_days <= 0:
+            return 0
+        cutoff = time.time() - max_age_days * 86400
+        with self.conn:
+            self.conn.execute('DELETE FROM bands WHERE post_id IN '
+                              '(SELECT post_id FROM signatures WHERE created_utc < ?)', (cutoff,))
+            removed = self.conn.execute('DELETE FROM signatures WHERE created_utc < ?',
+                                        (cutoff,)).rowcount
+        return removed
@@ -0,0 +1,187 @@
+"""Shared request pacing for the Reddit API"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+import metrics
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all fetch workers"""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        """
+        Args:
+            rate_per_second: Tokens added to the bucket every second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate_per_second
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Top the bucket up for the time elapsed since the last refill"""
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available
+
+        Tokens are reserved under the lock and the wait happens outside it,
+        so concurrent callers queue up in arrival order.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimitController:
+    """
+    Paces API calls from Reddit's ``X-Ratelimit-*`` headers
+
+    While the headers are known, requests go out immediately as long as the
+    window has budget left and wait for the reset once it is spent, so the
+    budget is used exactly and no time is wasted while quota remains. Before
+    the first response (or if the headers go missing) the token bucket applies.
+    Throttled (429) and server (5xx) errors are retried with jittered
+    exponential backoff.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 5,
+                 base_backoff: float = 2.0, max_backoff: float = 120.0):
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.remaining = None
+        self.reset_timestamp = None
+
+        # Counters
+        self.requests_sent = 0
+        self.requests_throttled = 0
+        self.seconds_waited = 0.0
+
+        self._lock = threading.Lock()
+
+    def update(self, limits: Dict):
+        """
+        Record the latest rate-limit state
+
+        Args:
+            limits: ``reddit.auth.limits`` style dict with ``remaining``
+                and ``reset_timestamp`` (unix time) keys
+        """
+        remaining = limits.get('remaining')
+        reset_timestamp = limits.get('reset_timestamp')
+        if remaining is None or reset_timestamp is None:
+            return
+        with self._lock:
+            self.remaining = float(remaining)
+            self.reset_timestamp = float(reset_timestamp)
+
+    def _header_delay(self, now: float) -> Optional[float]:
+        """Seconds to wait according to the headers, or None if unknown"""
+        if self.remaining is None or self.reset_timestamp is None:
+            return None
+        seconds_to_reset = self.reset_timestamp - now
+        if seconds_to_reset <= 0:
+            # Window has rolled over; fall back until the next response
+            self.remaining = self.reset_timestamp = None
+            return None
+        if self.remaining >= 1:
+            # Count this request against the budget until fresh headers arrive
+            self.remaining -= 1
+            return 0.0
+        return seconds_to_reset
+
+    def before_request(self) -> float:
+        """Wait until the next request may be sent; returns seconds waited"""
+        with self._lock:
+            wait = self._header_delay(time.time())
+        if wait is None:
+            wait = self.bucket.acquire()
+        elif wait > 0:
+            time.sleep(wait)
+
+        with self._lock:
+            self.requests_sent += 1
+            self.seconds_waited += wait
+        metrics.count('api_requests')
+        if wait > 0:
+            metrics.count('sleep_seconds', wait)
+        return wait
+
+    def backoff(self, attempt: int, error: Exception) -> bool:
+        """
+        Sleep after a failed request if it is worth retrying
+
+        Args:
+            attempt: Number of retries already made for this request
+            error: The exception raised by the request
+
+        Returns:
+            True if the caller should retry
+        """
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+        if status not in self.RETRY_STATUSES or attempt >= self.max_retries:
+            return False
+
+        # Full jitter, but never shorter than the server's Retry-After
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after:
+            delay = max(delay, float(retry_after))
+
+        with self._lock:
+            self.requests_throttled += 1
+            self.seconds_waited += delay
+        metrics.count('api_retries')
+        metrics.count('sleep_seconds', delay)
+        time.sleep(delay)
+        return True
+
+    def call(self, func: Callable, *args, limits: Callable[[], Dict] = None, **kwargs):
+        """
+        Run one API request under the controller
+
+        Args:
+            func: Callable that performs exactly one request
+            limits: Optional callable returning the client's current limits
+        """
+        attempt = 0
+        while True:
+            self.before_request()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self.backoff(attempt, e):
+                    raise
+                attempt += 1
+            finally:
+                if limits is not None:
+                    self.update(limits())
+
+    def stats(self) -> Dict:
+        """Snapshot of the request counters"""
+        with self._lock:
+            return {
+                'requests_sent': self.requests_sent,
+                'requests_throttled': self.requests_throttled,
+                'seconds_waited': round(self.seconds_waited, 2),
+            }
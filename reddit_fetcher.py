@@ -1,30 +1,191 @@
 """Reddit data fetcher for collecting complaints and demands"""
-import praw
+import contextlib
 import json
-import time
+import queue
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterator, List, Dict, Tuple
 import config
+import metrics
+from rate_limiter import TokenBucket, RateLimitController
+from keyword_matcher import KeywordMatcher, KEYWORD_LABEL
+from subreddit_planner import SubredditPlanner
+
+# Reddit returns at most this many items per listing request
+LISTING_PAGE_SIZE = 100
+# Fixed-plan runs read POST_LIMIT +/- this many posts per subreddit...
+POST_LIMIT_JITTER = 10
+# ...but never more than this
+MAX_POST_LIMIT = 150
 
 
 class RedditFetcher:
     """Fetches and filters Reddit posts based on keywords"""
     
-    def __init__(self):
-        """Initialize Reddit API client"""
-        self.reddit = praw.Reddit(
+    def __init__(self, reddit=None, matcher: KeywordMatcher = None,
+                 planner: SubredditPlanner = None):
+        """
+        Initialize Reddit API client
+        
+        Args:
+            reddit: Optional pre-built client shared by all workers. By default
+                each worker thread borrows its own ``praw.Reddit`` instance,
+                since PRAW is not thread-safe; the instances are kept between
+                runs, so their HTTP sessions and OAuth tokens are reused.
+                With ``config.REDDIT_SOURCE`` 'replay' they are clients of the
+                offline ``replay_source`` instead.
+            matcher: Optional shared keyword automaton (see
+                ``KeywordMatcher.for_tracker``); built from config if omitted
+            planner: Optional velocity planner choosing which subreddits to
+                poll and how deep; defaults to one when
+                ``config.FETCH_PLANNER`` is 'velocity'
+        """
+        self._shared_reddit = reddit
+        self._local = threading.local()
+        self._idle_clients = queue.LifoQueue()
+        self.keywords = [kw.lower().strip() for kw in config.KEYWORDS]
+        self.matcher = matcher or KeywordMatcher.for_tracker(
+            self.keywords, {}, word_boundary=config.KEYWORD_WORD_BOUNDARY
+        )
+        # Per-subreddit high-water marks for the `new` listing:
+        # {subreddit: {'fullname': ..., 'created_utc': ...}}
+        self.cursors = {}
+        if planner is None and config.FETCH_PLANNER == 'velocity':
+            planner = SubredditPlanner()
+        self.planner = planner
+        self.stage_stats = self._empty_stage_stats()
+        self._stats_lock = threading.Lock()
+        # One limiter for every worker: header-driven pacing, with a token
+        # bucket sized to the API's documented quota until headers arrive
+        self.limiter = RateLimitController(
+            TokenBucket(config.API_REQUESTS_PER_MINUTE / 60.0, config.API_BURST),
+            max_retries=config.API_MAX_RETRIES
+        )
+    
+    @staticmethod
+    def _empty_stage_stats() -> Dict:
+        """Per-stage counters for the listing -> pre-filter -> materialize pipeline"""
+        return {
+            'listing': {'items': 0, 'seconds': 0.0},
+            'prefilter': {'items': 0, 'dropped': 0, 'seconds': 0.0},
+            'materialize': {'items': 0, 'seconds': 0.0},
+        }
+    
+    def _record_stages(self, stats: Dict):
+        """Merge one listing's stage counters into the fetcher totals"""
+        with self._stats_lock:
+            for stage, counters in stats.items():
+                for key, value in counters.items():
+                    self.stage_stats[stage][key] += value
+        metrics.count('listing_items', stats['listing']['items'])
+        metrics.count('prefilter_dropped', stats['prefilter']['dropped'])
+        metrics.count('posts_matched', stats['materialize']['items'])
+    
+    @property
+    def reddit(self):
+        """Reddit client for the calling thread"""
+        if self._shared_reddit is not None:
+            return self._shared_reddit
+        client = getattr(self._local, 'reddit', None)
+        if client is None:
+            client = self._new_client()
+            self._local.reddit = client
+        return client
+    
+    @staticmethod
+    def _new_client():
+        if config.REDDIT_SOURCE == 'replay':
+            # Offline: recorded or synthetic posts, no credentials needed
+            from replay_source import default_source
+            return default_source().client()
+        # PRAW (and requests under it) only load once a client is needed
+        import praw
+        return praw.Reddit(
             client_id=config.REDDIT_CLIENT_ID,
             client_secret=config.REDDIT_CLIENT_SECRET,
             user_agent=config.REDDIT_USER_AGENT
         )
-        self.keywords = [kw.lower().strip() for kw in config.KEYWORDS]
+    
+    def _rate_limits(self) -> Dict:
+        """Rate-limit state PRAW parsed from the calling thread's last response"""
+        auth = getattr(self.reddit, 'auth', None)
+        return auth.limits if auth is not None else {}
+    
+    def call_api(self, func, *args, **kwargs):
+        """Run ``func`` (exactly one API request) under the shared rate limiter"""
+        return self.limiter.call(func, *args, limits=self._rate_limits, **kwargs)
+    
+    @contextlib.contextmanager
+    def borrowed_client(self):
+        """
+        Lend the calling thread a pooled Reddit client for the block
+        
+        Worker threads come and go with each pool; the clients (and their
+        OAuth tokens) stay for the next borrower.
+        """
+        if self._shared_reddit is not None:
+            yield self._shared_reddit
+            return
+        try:
+            self._local.reddit = self._idle_clients.get_nowait()
+        except queue.Empty:
+            self._local.reddit = self._new_client()
+        try:
+            yield self._local.reddit
+        finally:
+            self._idle_clients.put(self._local.reddit)
+            self._local.reddit = None
+    
+    def _fetch_page(self, subreddit, sort_method: str, limit: int, after: str = None) -> List:
+        """
+        Fetch a single listing page (exactly one API request) through the limiter
+        
+        Args:
+            subreddit: Subreddit object
+            sort_method: 'new', 'hot', or 'rising'
+            limit: Page size, at most LISTING_PAGE_SIZE
+            after: Fullname of the last item on the previous page
+        """
+        params = {'after': after} if after else None
+        listing = getattr(subreddit, sort_method)(limit=limit, params=params)
+        return self.call_api(list, listing)
+    
+    def _iter_listing(self, subreddit, sort_method: str, limit: int, cursor: Dict = None,
+                      progress: Dict = None):
+        """
+        Yield up to ``limit`` submissions, one rate-limited page at a time
+        
+        With a cursor the listing is read newest-first only until the cursor
+        post (or anything older) is reached; other posts from the cursor's
+        second are still yielded. The first page is a small probe,
+        so a quiet subreddit costs a single small request.
         
-    def _human_delay(self, min_seconds=2, max_seconds=5):
-        """Add random delay to simulate human browsing"""
-        delay = random.uniform(min_seconds, max_seconds)
-        time.sleep(delay)
+        ``progress`` (if given) gets 'caught_up' (the cursor was reached) and
+        'exhausted' (the listing ran out) set when the read stops early.
+        """
+        progress = {} if progress is None else progress
+        after = None
+        page_limit = config.CURSOR_PROBE_SIZE if cursor else LISTING_PAGE_SIZE
+        while limit > 0:
+            page_size = min(limit, page_limit)
+            page = self._fetch_page(subreddit, sort_method, page_size, after)
+            for submission in page:
+                if cursor and (submission.name == cursor['fullname']
+                               or submission.created_utc < cursor['created_utc']):
+                    progress['caught_up'] = True
+                    return  # Caught up with the last run
+                yield submission
+            if len(page) < page_size:
+                progress['exhausted'] = True
+                return  # Listing exhausted
+            limit -= len(page)
+            after = page[-1].name
+            page_limit = LISTING_PAGE_SIZE
         
+    @metrics.timed('fetch_posts')
     def fetch_posts(self, subreddit_name: str, limit: int = 100) -> List[Dict]:
         """
         Fetch recent posts from a subreddit (human-like behavior)
@@ -40,6 +201,11 @@ class RedditFetcher:
         try:
             subreddit = self.reddit.subreddit(subreddit_name)
             
+            if subreddit_name in self.cursors:
+                # Everything posted since the last run shows up in `new`
+                print(f"  Browsing r/{subreddit_name} (new since last run)...")
+                return self._fetch_from_listing(subreddit, 'new', limit)
+            
             # Simulate human browsing: mix different sorting methods
             sorting_methods = ['new', 'hot', 'rising']
             chosen_sort = random.choice(sorting_methods)
@@ -52,21 +218,20 @@ class RedditFetcher:
             # Fetch from primary sorting method
             posts.extend(self._fetch_from_listing(subreddit, chosen_sort, posts_per_method))
             
-            # Add small delay between different browsing patterns
-            self._human_delay(1, 3)
-            
-            # Fetch from secondary method (like a human might scroll through different tabs)
-            secondary_sort = random.choice([s for s in sorting_methods if s != chosen_sort])
+            # Fetch from secondary method (like a human might scroll through different tabs).
+            # `new` is always one of the two so the listing cursor gets established.
+            if chosen_sort == 'new':
+                secondary_sort = random.choice([s for s in sorting_methods if s != chosen_sort])
+            else:
+                secondary_sort = 'new'
             posts.extend(self._fetch_from_listing(subreddit, secondary_sort, posts_per_method))
             
         except Exception as e:
             print(f"  ⚠️  Error accessing r/{subreddit_name}: {str(e)}")
-            if "429" in str(e):
-                print(f"  Rate limited. Waiting 60 seconds...")
-                time.sleep(60)
             
         return posts
     
+    @metrics.timed('fetch_listing')
     def _fetch_from_listing(self, subreddit, sort_method: str, limit: int) -> List[Dict]:
         """
         Fetch posts from a specific sorting method
@@ -80,28 +245,62 @@ class RedditFetcher:
             List of filtered post dictionaries
         """
         posts = []
+        name = str(subreddit)
+        cursor = self.cursors.get(name) if sort_method == 'new' else None
+        newest = oldest = None
+        matched_count = 0
+        progress = {}
+        stats = self._empty_stage_stats()
         try:
-            # Get the appropriate listing
-            if sort_method == 'new':
-                listing = subreddit.new(limit=limit)
-            elif sort_method == 'hot':
-                listing = subreddit.hot(limit=limit)
-            else:  # rising
-                listing = subreddit.rising(limit=limit)
-            
-            # Process posts with random delays (simulate reading)
-            for idx, submission in enumerate(listing):
-                post_data = self._extract_post_data(submission)
-                if self._matches_keywords(post_data):
-                    posts.append(post_data)
+            # Pages are paced and retried by the rate-limit controller
+            listing = self._iter_listing(subreddit, sort_method, limit, cursor, progress)
+            while True:
+                started = time.perf_counter()
+                submission = next(listing, None)
+                stats['listing']['seconds'] += time.perf_counter() - started
+                if submission is None:
+                    break
+                stats['listing']['items'] += 1
+                if newest is None:
+                    newest = submission
+                oldest = submission
+                
+                # Stage 1: keyword match on the raw title/selftext only
+                started = time.perf_counter()
+                matched = self._matches_keywords(submission.title, submission.selftext)
+                stats['prefilter']['seconds'] += time.perf_counter() - started
+                stats['prefilter']['items'] += 1
+                if not matched:
+                    stats['prefilter']['dropped'] += 1
+                    continue
+                matched_count += 1
                 
-                # Add small random delay every few posts (like human scrolling/reading)
-                if idx > 0 and idx % 10 == 0:
-                    self._human_delay(0.5, 2)
+                # Stage 2: build the full record (author, permalink, ...) for matches
+                started = time.perf_counter()
+                posts.append(self._extract_post_data(submission))
+                stats['materialize']['seconds'] += time.perf_counter() - started
+                stats['materialize']['items'] += 1
+            
+            if sort_method == 'new' and self.planner is not None:
+                self.planner.observe(
+                    name, stats['listing']['items'], matched_count,
+                    newest.created_utc if newest is not None else None,
+                    oldest.created_utc if oldest is not None else None,
+                    cursor['created_utc'] if cursor else None,
+                    progress.get('caught_up', False), progress.get('exhausted', False)
+                )
+            
+            # Only advance the cursor once the listing was read without errors
+            if sort_method == 'new' and newest is not None:
+                self.cursors[name] = {
+                    'fullname': newest.name,
+                    'created_utc': newest.created_utc
+                }
                     
         except Exception as e:
             print(f"    Error fetching {sort_method} posts: {str(e)}")
-            
+        
+        self._record_stages(stats)
         return posts
     
     def _extract_post_data(self, submission) -> Dict:
@@ -121,35 +320,81 @@ class RedditFetcher:
             'is_self': submission.is_self
         }
     
-    def _matches_keywords(self, post_data: Dict) -> bool:
+    def _matches_keywords(self, title: str, selftext: str) -> bool:
         """Check if post contains any of the target keywords"""
-        text = f"{post_data['title']} {post_data['selftext']}".lower()
-        return any(keyword in text for keyword in self.keywords)
+        # Same 500-character cut as the stored selftext
+        text = f"{title} {selftext[:500] if selftext else ''}"
+        return self.matcher.matches(text, KEYWORD_LABEL)
     
-    def fetch_all_subreddits(self) -> List[Dict]:
-        """Fetch posts from all configured subreddits (human-like behavior)"""
-        all_posts = []
+    def _varied_limit(self) -> int:
+        """Vary the limit slightly for each subreddit (more natural)"""
+        varied_limit = config.POST_LIMIT + random.randint(-POST_LIMIT_JITTER, POST_LIMIT_JITTER)
+        return max(20, min(varied_limit, MAX_POST_LIMIT))  # Keep it reasonable
+    
+    def _fetch_subreddit(self, subreddit: str, limit: int) -> List[Dict]:
+        """Fetch one subreddit and report how many posts matched"""
+        with self.borrowed_client():
+            print(f"Fetching from r/{subreddit}...")
+            posts = self.fetch_posts(subreddit, limit)
+            print(f"  ✓ Found {len(posts)} relevant posts in r/{subreddit}")
+            return posts
+    
+    def _plan_fetch(self) -> Tuple[List[str], List[int], int]:
+        """Subreddit order, per-subreddit limits and worker count for one run"""
         subreddits = [s.strip() for s in config.SUBREDDITS]
+        self.stage_stats = self._empty_stage_stats()
         
-        # Randomize order (humans don't always check in the same order)
-        random.shuffle(subreddits)
+        if self.planner is not None:
+            # Busy subreddits get deeper reads, quiet ones wait for a later run
+            budget = config.FETCH_REQUEST_BUDGET or 2 * len(subreddits)
+            planned = self.planner.plan(subreddits, budget, lambda name: name in self.cursors,
+                                        self._varied_limit())
+            random.shuffle(planned)
+            subreddits = [name for name, _ in planned]
+            limits = [limit for _, limit in planned]
+            print(f"  📋 Polling {len(subreddits)} of {len(config.SUBREDDITS)} subreddits "
+                  f"(budget {budget} requests)")
+        else:
+            # Randomize order (humans don't always check in the same order)
+            random.shuffle(subreddits)
+            # Budgets are drawn up front so they don't depend on thread scheduling
+            limits = [self._varied_limit() for _ in subreddits]
         
-        for idx, subreddit in enumerate(subreddits):
-            print(f"Fetching from r/{subreddit}...")
-            
-            # Vary the limit slightly for each subreddit (more natural)
-            varied_limit = config.POST_LIMIT + random.randint(-10, 10)
-            varied_limit = max(20, min(varied_limit, 150))  # Keep it reasonable
-            
-            posts = self.fetch_posts(subreddit, varied_limit)
-            all_posts.extend(posts)
-            print(f"  ✓ Found {len(posts)} relevant posts")
-            
-            # Add delay between subreddits (like switching between tabs)
-            if idx < len(subreddits) - 1:  # Don't delay after the last one
-                delay = random.uniform(3, 8)
-                print(f"  Taking a {delay:.1f}s break before next subreddit...")
-                time.sleep(delay)
+        workers = max(1, min(config.FETCH_WORKERS, len(subreddits)))
+        return subreddits, limits, workers
+    
+    def _print_fetch_stats(self, fetched: int, unique: int):
+        if fetched != unique:
+            print(f"\n  🔍 Removed {fetched - unique} duplicate posts")
+        
+        stats = self.limiter.stats()
+        print(f"  📶 API requests: {stats['requests_sent']} sent, "
+              f"{stats['requests_throttled']} throttled, {stats['seconds_waited']}s waited")
+        self._print_stage_stats()
+        if self.planner is not None:
+            for line in self.planner.coverage_lines():
+                print(f"  📈 {line}")
+            self.planner.save()
+    
+    def fetch_all_subreddits(self) -> List[Dict]:
+        """
+        Fetch posts from all configured subreddits (human-like behavior)
+        
+        Subreddits are fetched concurrently by ``config.FETCH_WORKERS`` threads
+        that share one rate limiter. With a single worker they are walked one
+        at a time.
+        """
+        subreddits, limits, workers = self._plan_fetch()
+        if workers == 1:
+            results = [self._fetch_subreddit(subreddit, limit)
+                       for subreddit, limit in zip(subreddits, limits)]
+        else:
+            print(f"  Using {workers} concurrent workers")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() keeps results in subreddit order, so dedup is deterministic
+                results = list(pool.map(self._fetch_subreddit, subreddits, limits))
+        
+        all_posts = [post for posts in results for post in posts]
         
         # Remove duplicates (same post in multiple subreddits)
         seen_ids = set()
@@ -162,7 +407,70 @@ class RedditFetcher:
         # Sort by date (newest first)
         unique_posts.sort(key=lambda x: x['created_utc'], reverse=True)
         
-        if len(all_posts) != len(unique_posts):
-            print(f"\n  🔍 Removed {len(all_posts) - len(unique_posts)} duplicate posts")
-        
+        self._print_fetch_stats(len(all_posts), len(unique_posts))
         return unique_posts
+    
+    def iter_all_subreddits(self, max_pending: int = None) -> Iterator[List[Dict]]:
+        """
+        Yield each subreddit's posts as soon as its fetch finishes
+        
+        Same fetch as ``fetch_all_subreddits``, but batches arrive in
+        completion order (deduplicated on the fly, not sorted) and the caller
+        can work on one batch while the pool keeps fetching the rest. Workers
+        hand batches over through a bounded queue, so at most ``max_pending``
+        finished batches wait for the consumer.
+        
+        Args:
+            max_pending: Queue bound (defaults to config.PIPELINE_QUEUE_SIZE)
+        """
+        subreddits, limits, workers = self._plan_fetch()
+        batches = queue.Queue(maxsize=max(1, max_pending or config.PIPELINE_QUEUE_SIZE))
+        stopped = threading.Event()
+        
+        def fetch(subreddit: str, limit: int):
+            posts = []
+            try:
+                posts = self._fetch_subreddit(subreddit, limit)
+            finally:
+                # Wait for room unless the consumer has gone away
+                while not stopped.is_set():
+                    try:
+                        batches.put(posts, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        
+        if workers > 1:
+            print(f"  Using {workers} concurrent workers")
+        pool = ThreadPoolExecutor(max_workers=workers)
+        for subreddit, limit in zip(subreddits, limits):
+            pool.submit(fetch, subreddit, limit)
+        
+        seen_ids = set()
+        fetched = 0
+        try:
+            for _ in subreddits:
+                posts = batches.get()
+                fetched += len(posts)
+                unique = []
+                for post in posts:
+                    if post['id'] not in seen_ids:
+                        seen_ids.add(post['id'])
+                        unique.append(post)
+                yield unique
+        finally:
+            stopped.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+        
+        self._print_fetch_stats(fetched, len(seen_ids))
+    
+    def _print_stage_stats(self):
+        """Print per-stage timing and how many items each stage dropped"""
+        listing = self.stage_stats['listing']
+        prefilter = self.stage_stats['prefilter']
+        materialize = self.stage_stats['materialize']
+        print(f"  ⏱️  Listing: {listing['items']} items in {listing['seconds']:.2f}s")
+        print(f"  ⏱️  Pre-filter: {prefilter['items']} checked, {prefilter['dropped']} dropped "
+              f"in {prefilter['seconds']:.3f}s")
+        print(f"  ⏱️  Materialize: {materialize['items']} records built "
+              f"in {materialize['seconds']:.3f}s ({prefilter['dropped']} skipped)")
@@ -0,0 +1,430 @@
+"""Offline stand-in for the Reddit API: replays recorded or synthetic posts"""
+import glob
+import json
+import random
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List
+import config
+
+# Reddit returns at most this many items per listing request
+PAGE_SIZE = 100
+# Comments in a thread's first response; the rest sit behind MoreComments
+COMMENT_PAGE_SIZE = 100
+# Words synthetic posts are made of (several are default keywords)
+VOCABULARY = ['app', 'crash', 'bug', 'slow', 'login', 'update', 'support', 'refund',
+              'great', 'love', 'issue', 'problem', 'broken', 'request', 'need', 'phone',
+              'screen', 'battery', 'account', 'today', 'again', 'please', 'help', 'new']
+
+
+def base36(number: int) -> str:
+    """Encode like Reddit's post IDs"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while number:
+        number, rem = divmod(number, 36)
+        out = digits[rem] + out
+    return out or '0'
+
+
+class ReplaySubmission:
+    """Submission with the attributes RedditFetcher reads"""
+
+    __slots__ = ('id', 'name', 'title', 'selftext', 'author', 'subreddit', 'created_utc',
+                 'score', 'num_comments', 'permalink', 'upvote_ratio', 'is_self')
+
+    @classmethod
+    def from_post(cls, post: Dict) -> 'ReplaySubmission':
+        """Rebuild a submission from a post saved by the tracker"""
+        submission = cls()
+        submission.id = post['id']
+        submission.name = f"t3_{post['id']}"
+        submission.title = post.get('title', '')
+        submission.selftext = post.get('selftext', '')
+        submission.author = post.get('author') or None
+        submission.subreddit = post['subreddit']
+        submission.created_utc = post['created_utc']
+        submission.score = post.get('score', 0)
+        submission.num_comments = post.get('num_comments', 0)
+        submission.permalink = post.get('url', '').replace('https://reddit.com', '', 1)
+        submission.upvote_ratio = post.get('upvote_ratio', 1.0)
+        submission.is_self = post.get('is_self', True)
+        return submission
+
+    @classmethod
+    def synthetic(cls, subreddit: str, index: int, rng: random.Random) -> 'ReplaySubmission':
+        """Post number ``index`` of a subreddit (negative = newer than the first batch)"""
+        submission = cls()
+        submission.id = base36(zlib.crc32(subreddit.encode()) % 100_000 * 1_000_000 + 500_000 - index)
+        submission.name = f"t3_{submission.id}"
+        words = rng.sample(VOCABULARY, 8)
+        submission.title = ' '.join(words[:5])
+        submission.selftext = ' '.join(words)
+        submission.author = f"user{rng.randint(1, 5000)}"
+        submission.subreddit = subreddit
+        submission.created_utc = 1_700_000_000 - index * 60 - rng.randint(0, 59)
+        submission.score = rng.randint(0, 200)
+        submission.num_comments = rng.randint(0, 80)
+        submission.permalink = f"/r/{subreddit}/comments/{submission.id}/"
+        submission.upvote_ratio = round(rng.uniform(0.5, 1.0), 2)
+        submission.is_self = True
+        return submission
+
+
+class ReplayComment:
+    """Comment with the attributes CommentHarvester reads"""
+
+    __slots__ = ('id', 'name', 'body', 'author', 'score', 'depth', 'parent_id', 'created_utc')
+
+
+class ReplayMoreComments:
+    """
+    A "load more comments" placeholder: one request returns the hidden comments
+
+    Like PRAW's MoreComments it has no ``body``; ``count`` is the number of
+    comments behind it and ``parent_id`` the fullname they hang under.
+    """
+
+    def __init__(self, reddit: 'ReplayReddit', parent_id: str, comments: List[ReplayComment]):
+        self._reddit = reddit
+        self._comments = comments
+        self.parent_id = parent_id
+        self.count = len(comments)
+        self.children = [comment.id for comment in comments]
+
+    def comments(self, update: bool = False) -> List[ReplayComment]:
+        self._reddit.simulate_request(len(self._comments))
+        return list(self._comments)
+
+
+class ReplayCommentForest:
+    """The comments of one thread's first response (``submission.comments``)"""
+
+    def __init__(self, items: List):
+        self._items = items
+
+    def list(self) -> List:
+        """Comments and MoreComments placeholders, parents before children"""
+        return list(self._items)
+
+
+class ReplayThread:
+    """
+    ``reddit.submission(id=...)``: the thread is requested on first access
+    to ``comments``, honouring ``comment_limit`` like PRAW
+    """
+
+    def __init__(self, reddit: 'ReplayReddit', submission: ReplaySubmission):
+        self._reddit = reddit
+        self._submission = submission
+        self._forest = None
+        self.id = submission.id
+        self.comment_sort = 'confidence'
+        self.comment_limit = COMMENT_PAGE_SIZE
+
+    @property
+    def comments(self) -> ReplayCommentForest:
+        if self._forest is None:
+            self._forest = self._reddit.comment_forest(self._submission, self.comment_limit)
+        return self._forest
+
+
+class ThrottledError(Exception):
+    """Stand-in for prawcore's TooManyRequests (HTTP 429)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"received 429 HTTP response (retry after {retry_after}s)")
+        self.response = SimpleNamespace(status_code=429)
+        self.retry_after = retry_after
+
+
+class ReplayListing:
+    """
+    One listing request, sent when iterated (like PRAW's lazy listings)
+
+    Iterating again sends the request again, so the rate-limit controller
+    can retry a throttled page.
+    """
+
+    def __init__(self, reddit: 'ReplayReddit', subreddit: str, limit: int, params: Dict = None):
+        self._reddit = reddit
+        self._subreddit = subreddit
+        self._limit = min(limit, PAGE_SIZE)
+        self._after = (params or {}).get('after')
+
+    def __iter__(self):
+        posts = self._reddit.posts_for(self._subreddit)
+        start = 0
+        if self._after:
+            start = next((i + 1 for i, p in enumerate(posts) if p.name == self._after), len(posts))
+        page = posts[start:start + self._limit]
+        self._reddit.simulate_request(len(page))
+        return iter(page)
+
+
+class ReplaySubreddit:
+    """Serves the same newest-first posts for every sort, honouring ``after`` pagination"""
+
+    def __init__(self, reddit: 'ReplayReddit', name: str):
+        self._reddit = reddit
+        self._name = name
+
+    def _listing(self, limit: int = PAGE_SIZE, params: Dict = None) -> ReplayListing:
+        return ReplayListing(self._reddit, self._name, limit, params)
+
+    new = hot = rising = _listing
+
+    def __str__(self):
+        return self._name
+
+
+class ReplayAuth:
+    """Mimics ``reddit.auth.limits`` for a fixed-size rate-limit window"""
+
+    def __init__(self, reddit: 'ReplayReddit'):
+        self._reddit = reddit
+
+    @property
+    def limits(self) -> Dict:
+        return self._reddit.current_limits()
+
+
+class ReplayClient:
+    """
+    One ``praw.Reddit`` instance's view of a shared ReplayReddit
+
+    Its first request waits ``token_latency`` seconds, like PRAW fetching an
+    OAuth token for a new instance.
+    """
+
+    def __init__(self, reddit: 'ReplayReddit', token_latency: float = 0.0):
+        self._reddit = reddit
+        self._token_latency = token_latency
+        self._has_token = False
+        self.auth = reddit.auth
+
+    def _authenticate(self):
+        if not self._has_token:
+            time.sleep(self._token_latency)
+            self._has_token = True
+
+    def subreddit(self, name: str) -> ReplaySubreddit:
+        self._authenticate()
+        return self._reddit.subreddit(name)
+
+    def submission(self, id: str) -> ReplayThread:
+        self._authenticate()
+        return self._reddit.submission(id)
+
+
+class ReplayReddit:
+    """
+    Thread-safe replacement for the parts of ``praw.Reddit`` the fetcher uses
+
+    Posts come from recordings (the tracker's own ``posts_*.json`` files or
+    JSON lines of post dicts) or, without any, are generated per subreddit
+    from a fixed seed; a post's comment thread is generated from its ID.
+    Every listing page or comment request costs ``latency`` seconds; a share
+    ``throttle_rate`` of them fail with an HTTP 429 carrying ``retry_after``.
+    With a ``quota`` the ``X-Ratelimit-*`` state of a window of that many
+    requests is reported like Reddit's headers (0 = no headers, so the
+    fetcher paces itself with its token bucket).
+    """
+
+    def __init__(self, paths: List[str] = None, latency: float = 0.05,
+                 posts_per_subreddit: int = 150, throttle_rate: float = 0.0,
+                 retry_after: float = 1.0, quota: int = 1000, window: float = 600.0,
+                 seed: int = 0):
+        """
+        Args:
+            paths: Recorded post files (``.json`` daily files or ``.jsonl``);
+                none means synthetic posts
+            latency: Seconds per request (listing page or comments)
+            posts_per_subreddit: Synthetic posts generated per subreddit
+            throttle_rate: Share of requests answered with a 429
+            retry_after: Retry-After seconds sent with a 429
+            quota: Requests per rate-limit window (0 = no rate-limit headers)
+            window: Seconds per rate-limit window
+            seed: Seed for the throttling draws
+        """
+        self.latency = latency
+        self.posts_per_subreddit = posts_per_subreddit
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.quota = quota
+        self.window = window
+        self.requests = 0
+        self.throttled = 0
+        self.items_served = 0
+        self.auth = ReplayAuth(self)
+        self.recorded = bool(paths)
+        self._posts: Dict[str, List[ReplaySubmission]] = {}
+        self._recorded_ids = set()
+        self._window_start = time.time()
+        self._window_used = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        for path in paths or []:
+            self._load(path)
+        for posts in self._posts.values():
+            posts.sort(key=lambda p: p.created_utc, reverse=True)
+
+    @classmethod
+    def from_config(cls) -> 'ReplayReddit':
+        """Source configured by the REPLAY_* settings"""
+        paths = sorted(glob.glob(config.REPLAY_FILES)) if config.REPLAY_FILES else []
+        if config.REPLAY_FILES and not paths:
+            print(f"Error loading replay posts: nothing matches {config.REPLAY_FILES}")
+        return cls(paths, latency=config.REPLAY_LATENCY,
+                   posts_per_subreddit=config.REPLAY_POSTS,
+                   throttle_rate=config.REPLAY_THROTTLE_RATE, quota=0)
+
+    def _load(self, path: str):
+        """Add the posts recorded in one file"""
+        try:
+            with open(path, 'r') as f:
+                if path.endswith('.jsonl'):
+                    posts = [json.loads(line) for line in f if line.strip()]
+                else:
+                    posts = json.load(f).get('posts', [])
+        except Exception as e:
+            print(f"Error loading replay posts from {path}: {e}")
+            return
+        for post in posts:
+            if post['id'] not in self._recorded_ids:
+                self._recorded_ids.add(post['id'])
+                self._posts.setdefault(post['subreddit'], []).append(ReplaySubmission.from_post(post))
+
+    def posts_for(self, name: str) -> List[ReplaySubmission]:
+        """A subreddit's posts, newest first"""
+        with self._lock:
+            if name not in self._posts:
+                if self.recorded:
+                    return []
+                rng = random.Random(name)
+                self._posts[name] = [ReplaySubmission.synthetic(name, i, rng)
+                                     for i in range(self.posts_per_subreddit)]
+            return self._posts[name]
+
+    def add_new_posts(self, name: str, count: int):
+        """Publish ``count`` synthetic posts newer than everything served so far"""
+        posts = self.posts_for(name)
+        rng = random.Random(f"{name}:{len(posts)}")
+        newest = posts[0].created_utc if posts else 1_700_000_000
+        first = -(len(posts) - self.posts_per_subreddit) - count
+        new_posts = [ReplaySubmission.synthetic(name, i, rng) for i in range(first, first + count)]
+        for offset, post in enumerate(reversed(new_posts), 1):
+            post.created_utc = max(post.created_utc, newest + offset * 60)
+        with self._lock:
+            self._posts[name] = new_posts + posts
+
+    def simulate_request(self, items: int = 0):
+        """Account for one listing request: latency, quota and throttling"""
+        with self._lock:
+            self.requests += 1
+            self._roll_window()
+            self._window_used += 1
+            throttled = self.throttle_rate > 0 and self._rng.random() < self.throttle_rate
+            if throttled:
+                self.throttled += 1
+            else:
+                self.items_served += items
+        time.sleep(self.latency)
+        if throttled:
+            raise ThrottledError(self.retry_after)
+
+    def _roll_window(self):
+        if time.time() - self._window_start >= self.window:
+            self._window_start = time.time()
+            self._window_used = 0
+
+    def current_limits(self) -> Dict:
+        if not self.quota:
+            return {}
+        with self._lock:
+            self._roll_window()
+            return {
+                'remaining': max(0, self.quota - self._window_used),
+                'reset_timestamp': self._window_start + self.window,
+                'used': self._window_used,
+            }
+
+    def subreddit(self, name: str) -> ReplaySubreddit:
+        return ReplaySubreddit(self, name)
+
+    def submission(self, id: str) -> ReplayThread:
+        """A served post's comment thread"""
+        with self._lock:
+            found = next((post for posts in self._posts.values() for post in posts
+                          if post.id == id), None)
+        if found is None:
+            raise KeyError(f"no replayed post {id}")
+        return ReplayThread(self, found)
+
+    def thread_comments(self, submission: ReplaySubmission) -> List[ReplayComment]:
+        """
+        ``num_comments`` synthetic comments for a post, parents before children
+
+        Generated from the post ID, so every request for a thread sees the
+        same comments.
+        """
+        rng = random.Random(f"comments:{submission.id}")
+        comments = []
+        for index in range(submission.num_comments):
+            comment = ReplayComment()
+            comment.id = f"{submission.id}c{base36(index)}"
+            comment.name = f"t1_{comment.id}"
+            # Replies cluster under a few popular comments, a third start a new branch
+            parent = rng.choice(comments[-20:]) if comments and rng.random() > 0.33 else None
+            comment.parent_id = parent.name if parent else submission.name
+            comment.depth = parent.depth + 1 if parent else 0
+            words = rng.sample(VOCABULARY, 6)
+            if rng.random() < 0.2:
+                words[:3] = ['same', 'problem', 'here']
+            comment.body = ' '.join(words)
+            comment.author = f"user{rng.randint(1, 5000)}"
+            comment.score = rng.randint(-5, 100)
+            comment.created_utc = submission.created_utc + (index + 1) * 30
+            comments.append(comment)
+        return comments
+
+    def comment_forest(self, submission: ReplaySubmission, limit: int) -> ReplayCommentForest:
+        """
+        One thread request: the first ``limit`` comments, and the rest behind
+        MoreComments under the loaded comment they (transitively) reply to
+        """
+        comments = self.thread_comments(submission)
+        shown = comments[:limit]
+        self.simulate_request(len(shown))
+        loaded = {comment.name for comment in shown} | {submission.name}
+        parent_of = {comment.name: comment.parent_id for comment in comments}
+        hidden: Dict[str, List[ReplayComment]] = {}
+        for comment in comments[limit:]:
+            anchor = comment.parent_id
+            while anchor not in loaded:
+                anchor = parent_of[anchor]
+            hidden.setdefault(anchor, []).append(comment)
+        # Like Reddit's morechildren, one placeholder loads at most a page of comments
+        more = [ReplayMoreComments(self, anchor, group[start:start + COMMENT_PAGE_SIZE])
+                for anchor, group in hidden.items()
+                for start in range(0, len(group), COMMENT_PAGE_SIZE)]
+        return ReplayCommentForest(shown + more)
+
+    def client(self, token_latency: float = 0.0) -> ReplayClient:
+        """A new per-instance client sharing these posts"""
+        return ReplayClient(self, token_latency)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_source() -> ReplayReddit:
+    """The source built from config, shared by every fetch worker"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ReplayReddit.from_config()
+        return _default
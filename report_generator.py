@@ -1,448 +1,379 @@
 """HTML report generator for easy viewing of collected data"""
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+import hashlib
+import itertools
+import json
 import os
+import shutil
+import tempfile
+import time
 import config
+import metrics
+from fragment_cache import FragmentCache
+
+# Jinja2 templates for the report pages and post cards
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+# Size of the pieces the spooled post cards are streamed back in
+SPOOL_CHUNK_SIZE = 64 * 1024
+# Posts looked up in the fragment cache per query
+FRAGMENT_BATCH_SIZE = 500
+# Other posts of a near-duplicate cluster linked from its card
+CLUSTER_LINKS = 5
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+_environment = None
+
+
+def template_environment():
+    """
+    The shared Jinja2 environment (built on first use)
+    
+    Autoescaping is on for every ``.html`` template, so post titles, text and
+    authors can't inject markup. Compiled templates are kept in memory for the
+    life of the process and as bytecode in ``config.TEMPLATE_CACHE_DIR``, so
+    a fresh process (e.g. each scheduled run) skips parsing them again.
+    """
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+        os.makedirs(config.TEMPLATE_CACHE_DIR, exist_ok=True)
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            autoescape=select_autoescape(['html']),
+            bytecode_cache=FileSystemBytecodeCache(config.TEMPLATE_CACHE_DIR),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+        )
+    return _environment
+
+
+def card_fingerprint() -> str:
+    """Hash of the post card template, so cached cards expire when it is edited"""
+    env = template_environment()
+    source = env.loader.get_source(env, '_post.html')[0]
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def group_clusters(posts: Iterable[Dict]) -> List[Dict]:
+    """
+    One card per near-duplicate cluster (posts sharing a ``cluster_id``)
+    
+    The card shows the cluster's most urgent, then best-scored post, with the
+    cluster's totals under ``cluster``. Posts alone in their cluster (or never
+    clustered) are passed through unchanged. Cards keep the order of each
+    cluster's first post. Unlike the rest of the report this needs every post
+    at once.
+    
+    Args:
+        posts: Analyzed posts, in display order
+        
+    Returns:
+        Posts to render, one per cluster
+    """
+    groups: Dict[str, List[Dict]] = {}
+    order = []
+    for post in posts:
+        key = post.get('cluster_id') or post['id']
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(post)
+    
+    cards = []
+    for key in order:
+        members = groups[key]
+        if len(members) == 1:
+            cards.append(members[0])
+            continue
+        lead = min(members, key=lambda p: (PRIORITY_RANK.get(p.get('priority'), 3), -p['score']))
+        card = dict(lead)
+        card['cluster'] = {
+            'size': len(members),
+            'total': max(len(members), max(p.get('cluster_total', 0) for p in members)),
+            'score': sum(p['score'] for p in members),
+            'num_comments': sum(p['num_comments'] for p in members),
+            'subreddits': sorted({p['subreddit'] for p in members}),
+            'high_priority': sum(p.get('priority') == 'High' for p in members),
+            'negative': sum(p.get('sentiment') == 'negative' for p in members),
+            'others': [{'title': p['title'], 'url': p['url'], 'subreddit': p['subreddit']}
+                       for p in members if p is not lead][:CLUSTER_LINKS],
+        }
+        cards.append(card)
+    return cards
 
 
 class ReportGenerator:
     """Generates beautiful HTML reports from analyzed posts"""
     
-    HTML_TEMPLATE = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Reddit Complaints & Demands - {date}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 16px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        
-        .header .subtitle {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 30px;
-            background: #f8f9fa;
-            border-bottom: 2px solid #e9ecef;
-        }}
-        
-        .stat-card {{
-            background: white;
-            padding: 20px;
-            border-radius: 12px;
-            text-align: center;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        
-        .stat-card .number {{
-            font-size: 2.5em;
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 5px;
-        }}
-        
-        .stat-card .label {{
-            color: #6c757d;
-            font-size: 0.9em;
-        }}
-        
-        .filters {{
-            padding: 20px 30px;
-            background: #f8f9fa;
-            border-bottom: 1px solid #e9ecef;
-        }}
-        
-        .filter-buttons {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        
-        .filter-btn {{
-            padding: 8px 16px;
-            border: 2px solid #667eea;
-            background: white;
-            color: #667eea;
-            border-radius: 20px;
-            cursor: pointer;
-            transition: all 0.3s;
-            font-weight: 500;
-        }}
-        
-        .filter-btn:hover {{
-            background: #667eea;
-            color: white;
-        }}
-        
-        .filter-btn.active {{
-            background: #667eea;
-            color: white;
-        }}
-        
-        .content {{
-            padding: 30px;
-        }}
-        
-        .post {{
-            background: white;
-            border: 2px solid #e9ecef;
-            border-radius: 12px;
-            padding: 24px;
-            margin-bottom: 20px;
-            transition: all 0.3s;
-        }}
-        
-        .post:hover {{
-            border-color: #667eea;
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.2);
-        }}
-        
-        .post-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 16px;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        
-        .post-title {{
-            font-size: 1.4em;
-            font-weight: 600;
-            color: #212529;
-            flex: 1;
-            min-width: 300px;
-        }}
-        
-        .post-title a {{
-            color: #212529;
-            text-decoration: none;
-        }}
-        
-        .post-title a:hover {{
-            color: #667eea;
-        }}
-        
-        .priority {{
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 0.85em;
-            text-transform: uppercase;
-        }}
-        
-        .priority-high {{
-            background: #fee;
-            color: #dc3545;
-        }}
-        
-        .priority-medium {{
-            background: #fff3cd;
-            color: #856404;
-        }}
-        
-        .priority-low {{
-            background: #d1ecf1;
-            color: #0c5460;
-        }}
-        
-        .post-meta {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 16px;
-            margin-bottom: 12px;
-            font-size: 0.9em;
-            color: #6c757d;
-        }}
-        
-        .meta-item {{
-            display: flex;
-            align-items: center;
-            gap: 5px;
-        }}
-        
-        .post-text {{
-            color: #495057;
-            line-height: 1.6;
-            margin-bottom: 16px;
-        }}
-        
-        .tags {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 8px;
-        }}
-        
-        .tag {{
-            padding: 4px 12px;
-            background: #e7f3ff;
-            color: #0066cc;
-            border-radius: 12px;
-            font-size: 0.85em;
-        }}
-        
-        .sentiment {{
-            display: inline-flex;
-            align-items: center;
-            gap: 5px;
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: 500;
-        }}
-        
-        .sentiment-positive {{
-            background: #d4edda;
-            color: #155724;
-        }}
-        
-        .sentiment-negative {{
-            background: #f8d7da;
-            color: #721c24;
-        }}
-        
-        .sentiment-neutral {{
-            background: #e2e3e5;
-            color: #383d41;
-        }}
-        
-        .no-posts {{
-            text-align: center;
-            padding: 60px 20px;
-            color: #6c757d;
-        }}
-        
-        .no-posts h2 {{
-            font-size: 2em;
-            margin-bottom: 10px;
-        }}
-        
-        @media (max-width: 768px) {{
-            .header h1 {{
-                font-size: 1.8em;
-            }}
-            
-            .post-title {{
-                font-size: 1.2em;
-            }}
-            
-            .stats {{
-                grid-template-columns: 1fr 1fr;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎯 Reddit Tracker Report</h1>
-            <div class="subtitle">Complaints & Demands Analysis - {date}</div>
-        </div>
-        
-        <div class="stats">
-            {stats_html}
-        </div>
-        
-        <div class="filters">
-            <div class="filter-buttons">
-                <button class="filter-btn active" data-filter="all">All Posts</button>
-                <button class="filter-btn" data-filter="high">High Priority</button>
-                <button class="filter-btn" data-filter="medium">Medium Priority</button>
-                <button class="filter-btn" data-filter="negative">Negative Sentiment</button>
-            </div>
-        </div>
-        
-        <div class="content">
-            {posts_html}
-        </div>
-    </div>
+    def __init__(self):
+        config.ensure_directories()
     
-    <script>
-        // Filter functionality
-        const filterBtns = document.querySelectorAll('.filter-btn');
-        const posts = document.querySelectorAll('.post');
-        
-        filterBtns.forEach(btn => {{
-            btn.addEventListener('click', () => {{
-                // Update active button
-                filterBtns.forEach(b => b.classList.remove('active'));
-                btn.classList.add('active');
-                
-                const filter = btn.dataset.filter;
-                
-                posts.forEach(post => {{
-                    const priority = post.dataset.priority;
-                    const sentiment = post.dataset.sentiment;
-                    
-                    if (filter === 'all') {{
-                        post.style.display = 'block';
-                    }} else if (filter === 'high' && priority === 'High') {{
-                        post.style.display = 'block';
-                    }} else if (filter === 'medium' && priority === 'Medium') {{
-                        post.style.display = 'block';
-                    }} else if (filter === 'negative' && sentiment === 'negative') {{
-                        post.style.display = 'block';
-                    }} else {{
-                        post.style.display = 'none';
-                    }}
-                }});
-            }});
-        }});
-    </script>
-</body>
-</html>
-"""
-    
-    def generate_report(self, posts: List[Dict], date_str: str = None) -> str:
+    @metrics.timed('generate_report')
+    def generate_report(self, posts: Iterable[Dict], date_str: str = None,
+                        trends: List[Dict] = None) -> str:
         """
         Generate HTML report from posts
         
+        The report is streamed to disk: each post card is rendered and
+        spooled as soon as it is read, the stats are counted in the same pass,
+        and the page is then written with ``Template.generate``, so memory
+        stays flat however many posts there are. ``posts`` may be a generator.
+        
         Args:
-            posts: List of analyzed post dictionaries
+            posts: Analyzed post dictionaries, in display order
             date_str: Date string for the report
+            trends: Optional spikes shown with the stats (see TrendDetector.detect)
             
         Returns:
             Path to generated HTML file
         """
         if date_str is None:
             date_str = datetime.now().strftime('%Y-%m-%d')
+        if config.CLUSTER_POSTS:
+            posts = group_clusters(posts)
+        if config.REPORT_MODE == 'paged':
+            return self.generate_paged_report(posts, date_str, trends)
         
-        # Generate stats
-        stats_html = self._generate_stats_html(posts)
-        
-        # Generate posts HTML
-        posts_html = self._generate_posts_html(posts)
+        return self._render_single_file(posts, date_str, f'report_{date_str}', trends=trends)
+    
+    @metrics.timed('generate_rolling_report')
+    def generate_rolling_report(self, posts: Iterable[Dict], days: int, end_date: str = None,
+                                trends: List[Dict] = None) -> str:
+        """
+        Generate a single-file report covering the last ``days`` days
         
-        # Fill template
-        html = self.HTML_TEMPLATE.format(
-            date=date_str,
-            stats_html=stats_html,
-            posts_html=posts_html
-        )
+        Post cards are reused from the fragment cache
+        (``config.FRAGMENT_CACHE_FILE``); only posts that are new to the
+        window, or whose displayed fields changed, are rendered again.
         
-        # Save report
-        report_path = os.path.join(config.REPORT_DIR, f'report_{date_str}.html')
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        Args:
+            posts: The window's posts, in display order
+            days: Length of the window
+            end_date: Last day of the window (defaults to today)
+            trends: Optional spikes shown with the stats
+            
+        Returns:
+            Path to generated HTML file (report_<end_date>_last<days>d.html)
+        """
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        start_date = datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days - 1)
+        start_date = start_date.strftime('%Y-%m-%d')
+        
+        if config.CLUSTER_POSTS:
+            posts = group_clusters(posts)
+        started = time.perf_counter()
+        fragments = FragmentCache(config.FRAGMENT_CACHE_FILE, card_fingerprint())
+        report_path = self._render_single_file(posts, f"{start_date} to {end_date}",
+                                               f'report_{end_date}_last{days}d', fragments, trends)
+        fragments.save()
+        cache_stats = fragments.stats()
+        fragments.close()
+        elapsed = time.perf_counter() - started
+        
+        print(f"   Fragment cache: {cache_stats['hits']} reused, {cache_stats['misses']} rendered "
+              f"({cache_stats['hit_rate']:.0%} hit rate), report built in {elapsed:.2f}s")
+        return report_path
+    
+    def _render_single_file(self, posts: Iterable[Dict], title: str, name: str,
+                            fragments: FragmentCache = None, trends: List[Dict] = None) -> str:
+        """Spool the cards, then stream the page around them to ``<name>.html``"""
+        page = template_environment().get_template('report.html')
+        # Cards go to a spool file first because the stats come before them
+        with tempfile.TemporaryFile('w+', encoding='utf-8', dir=config.REPORT_DIR) as cards:
+            stats = self._write_posts_html(posts, cards, fragments)
+            stats['trends'] = trends or []
+            cards.seek(0)
+            return self._write_page(
+                page.generate(date=title, stats=stats, cards=self._read_spool(cards)), name
+            )
+    
+    def _write_page(self, chunks: Iterator[str], name: str) -> str:
+        """Write rendered chunks to the report file, replacing it atomically"""
+        report_path = os.path.join(config.REPORT_DIR, f'{name}.html')
+        tmp_path = f"{report_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+            metrics.count('report_bytes_written', f.tell())
+        os.replace(tmp_path, report_path)
         
         return report_path
     
-    def _generate_stats_html(self, posts: List[Dict]) -> str:
-        """Generate statistics cards HTML"""
-        total = len(posts)
-        high_priority = sum(1 for p in posts if p.get('priority') == 'High')
-        negative = sum(1 for p in posts if p.get('sentiment') == 'negative')
+    @staticmethod
+    def _read_spool(spool) -> Iterator:
+        """Stream already-rendered card HTML back without re-escaping it"""
+        from markupsafe import Markup
+        while True:
+            chunk = spool.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield Markup(chunk)
+    
+    def generate_paged_report(self, posts: Iterable[Dict], date_str: str = None,
+                              trends: List[Dict] = None) -> str:
+        """
+        Generate a lightweight report page plus JSON shards of post data
         
-        # Count unique subreddits
-        subreddits = len(set(p['subreddit'] for p in posts)) if posts else 0
+        The page only builds the cards of the page being viewed, loading
+        the shards it needs on demand, and the priority/sentiment filters
+        are precomputed lists of post positions instead of DOM scans.
+        Shards are written while iterating, like the single-file report.
         
-        return f"""
-            <div class="stat-card">
-                <div class="number">{total}</div>
-                <div class="label">Total Posts</div>
-            </div>
-            <div class="stat-card">
-                <div class="number">{high_priority}</div>
-                <div class="label">High Priority</div>
-            </div>
-            <div class="stat-card">
-                <div class="number">{negative}</div>
-                <div class="label">Negative Sentiment</div>
-            </div>
-            <div class="stat-card">
-                <div class="number">{subreddits}</div>
-                <div class="label">Subreddits</div>
-            </div>
+        Args:
+            posts: Analyzed post dictionaries, in display order
+            date_str: Date string for the report
+            trends: Optional spikes shown with the stats
+            
+        Returns:
+            Path to generated HTML file (shards go in report_<date>_posts/)
         """
-    
-    def _generate_posts_html(self, posts: List[Dict]) -> str:
-        """Generate posts HTML"""
-        if not posts:
-            return """
-                <div class="no-posts">
-                    <h2>🎉 No new posts found!</h2>
-                    <p>Either there are no new complaints/demands, or you've already seen them all.</p>
-                </div>
-            """
-        
-        posts_html = []
-        for post in posts:
-            posts_html.append(self._generate_post_html(post))
+        if date_str is None:
+            date_str = datetime.now().strftime('%Y-%m-%d')
         
-        return '\n'.join(posts_html)
+        shard_dir_name = f'report_{date_str}_posts'
+        shard_dir = os.path.join(config.REPORT_DIR, shard_dir_name)
+        # Leftover shards from an earlier, larger run would just be dead weight
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        
+        lookups = {'sentiments': {}, 'priorities': {}, 'subreddits': {}, 'categories': {}}
+        index = {'high': [], 'medium': [], 'negative': []}
+        stats = {'total': 0, 'high_priority': 0, 'negative': 0}
+        
+        def code(table: str, value: str) -> int:
+            return lookups[table].setdefault(value, len(lookups[table]))
+        
+        rows = []
+        cards = 0
+        subreddits = set()
+        for position, post in enumerate(posts):
+            priority = post.get('priority', 'Low')
+            sentiment = post.get('sentiment', 'neutral')
+            text = post['selftext'] if post['selftext'] else '[No text content]'
+            if len(text) > 300:
+                text = text[:300] + '...'
+            rows.append([
+                post['title'], post['url'], code('subreddits', post['subreddit']), post['author'],
+                post['created_date'], post['score'], post['num_comments'], text,
+                code('sentiments', sentiment), code('priorities', priority),
+                [code('categories', category) for category in post.get('categories', [])],
+                self._cluster_row(post),
+                self._comments_row(post),
+            ])
+            if priority == 'High':
+                index['high'].append(position)
+            elif priority == 'Medium':
+                index['medium'].append(position)
+            if sentiment == 'negative':
+                index['negative'].append(position)
+            self._count_card(post, stats, subreddits)
+            cards += 1
+            if len(rows) == config.REPORT_SHARD_SIZE:
+                self._write_shard(shard_dir, position // config.REPORT_SHARD_SIZE, rows)
+                rows = []
+        if rows:
+            self._write_shard(shard_dir, (cards - 1) // config.REPORT_SHARD_SIZE, rows)
+        
+        stats['subreddits'] = len(subreddits)
+        stats['trends'] = trends or []
+        report = {
+            'total': cards,
+            'pageSize': config.REPORT_PAGE_SIZE,
+            'shardSize': config.REPORT_SHARD_SIZE,
+            'dir': shard_dir_name,
+            'index': index,
+        }
+        report.update({table: list(values) for table, values in lookups.items()})
+        
+        page = template_environment().get_template('report_paged.html')
+        return self._write_page(page.generate(date=date_str, stats=stats, report=report),
+                                f'report_{date_str}')
     
-    def _generate_post_html(self, post: Dict) -> str:
-        """Generate HTML for a single post"""
-        priority = post.get('priority', 'Low')
-        sentiment = post.get('sentiment', 'neutral')
-        categories = post.get('categories', [])
-        
-        # Format text
-        text = post['selftext'] if post['selftext'] else '[No text content]'
-        if len(text) > 300:
-            text = text[:300] + '...'
-        
-        # Categories tags
-        tags_html = ''.join([f'<span class="tag">{cat}</span>' for cat in categories])
+    @staticmethod
+    def _cluster_row(post: Dict):
+        """Compact cluster summary of a paged report row (None for a lone post)"""
+        cluster = post.get('cluster')
+        if cluster is not None:
+            return [cluster['size'], cluster['total'], cluster['score'], cluster['num_comments'],
+                    cluster['subreddits']]
+        if post.get('cluster_total', 1) > 1:
+            return [1, post['cluster_total'], post['score'], post['num_comments'], [post['subreddit']]]
+        return None
+    
+    @staticmethod
+    def _comments_row(post: Dict):
+        """Harvested comments of a paged report row (None without keyword matches)"""
+        if not post.get('comment_matches'):
+            return None
+        return [post['comment_matches'], post.get('comments_harvested', 0),
+                [[comment['body'][:200], len(comment['body']) > 200, comment['author'], comment['score']]
+                 for comment in post.get('top_comments', [])]]
+    
+    def _write_shard(self, shard_dir: str, number: int, rows: List):
+        """Write one shard of compact post rows as a script the page can load"""
+        os.makedirs(shard_dir, exist_ok=True)
+        path = os.path.join(shard_dir, f'shard_{number:04d}.js')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"reportShard({number},")
+            json.dump(rows, f, ensure_ascii=False, separators=(',', ':'))
+            f.write(");\n")
+            metrics.count('report_bytes_written', f.tell())
+    
+    @staticmethod
+    def _count_card(post: Dict, stats: Dict, subreddits: set):
+        """Add a card's posts to the stats (a cluster card stands for all of its posts)"""
+        cluster = post.get('cluster')
+        if cluster is not None:
+            stats['total'] += cluster['size']
+            stats['high_priority'] += cluster['high_priority']
+            stats['negative'] += cluster['negative']
+            subreddits.update(cluster['subreddits'])
+            return
+        stats['total'] += 1
+        stats['high_priority'] += post.get('priority') == 'High'
+        stats['negative'] += post.get('sentiment') == 'negative'
+        subreddits.add(post['subreddit'])
+    
+    def _write_posts_html(self, posts: Iterable[Dict], out, fragments: FragmentCache = None) -> Dict:
+        """
+        Write every post card to ``out`` and count the stats along the way
         
-        return f"""
-            <div class="post" data-priority="{priority}" data-sentiment="{sentiment}">
-                <div class="post-header">
-                    <div class="post-title">
-                        <a href="{post['url']}" target="_blank">{post['title']}</a>
-                    </div>
-                    <span class="priority priority-{priority.lower()}">{priority}</span>
-                </div>
-                <div class="post-meta">
-                    <div class="meta-item">📍 r/{post['subreddit']}</div>
-                    <div class="meta-item">👤 {post['author']}</div>
-                    <div class="meta-item">📅 {post['created_date']}</div>
-                    <div class="meta-item">⬆️ {post['score']}</div>
-                    <div class="meta-item">💬 {post['num_comments']}</div>
-                </div>
-                <div class="post-text">{text}</div>
-                <div class="tags">
-                    <span class="sentiment sentiment-{sentiment}">
-                        {'😊' if sentiment == 'positive' else '😠' if sentiment == 'negative' else '😐'} {sentiment.title()}
-                    </span>
-                    {tags_html}
-                </div>
-            </div>
+        Args:
+            posts: Analyzed post dictionaries
+            out: File to write the card HTML to
+            fragments: Optional cache of already rendered cards
+            
+        Returns:
+            Totals for the stats cards
         """
+        card = template_environment().get_template('_post.html')
+        stats = {'total': 0, 'high_priority': 0, 'negative': 0}
+        subreddits = set()
+        posts = iter(posts)
+        while True:
+            batch = list(itertools.islice(posts, FRAGMENT_BATCH_SIZE))
+            if not batch:
+                break
+            cached = fragments.get_many(batch) if fragments is not None else [None] * len(batch)
+            for post, html in zip(batch, cached):
+                if html is None:
+                    html = card.render(post=post)
+                    if fragments is not None:
+                        fragments.put(post, html)
+                out.write(html)
+                self._count_card(post, stats, subreddits)
+        stats['subreddits'] = len(subreddits)
+        return stats
+
+
+if __name__ == "__main__":
+    # python3 report_generator.py [days] [YYYY-MM-DD]: rolling report from saved posts
+    import sys
+    from data_manager import DataManager
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else config.ROLLING_REPORT_DAYS or 7
+    end_date = sys.argv[2] if len(sys.argv) > 2 else None
+    posts = DataManager().load_recent_posts(days, end_date)
+    print(f"📊 Building {days}-day report from {len(posts)} posts...")
+    print(f"📄 {ReportGenerator().generate_rolling_report(posts, days, end_date)}")
@@ -17,7 +17,7 @@ mkdir -p logs
 echo "Starting Reddit Tracker Scheduler..."
 echo "Logs will be written to: logs/scheduler.log"
 
-nohup python3 scheduler.py >> logs/scheduler.log 2>&1 &
+nohup python3 scheduler.py "$@" >> logs/scheduler.log 2>&1 &
 
 # Save the PID
 echo $! > logs/scheduler.pid
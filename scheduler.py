@@ -1,9 +1,11 @@
 """Scheduler for automated daily runs"""
-import schedule
+import argparse
+import signal
+import threading
 import time
 from datetime import datetime
 import os
-import sys
+import config
 
 
 def run_tracker():
@@ -17,7 +19,7 @@ def run_tracker():
     from main import main
     
     try:
-        main()
+        main([])
     except Exception as e:
         print(f"❌ Error during scheduled run: {e}")
         import traceback
@@ -28,8 +30,120 @@ def run_tracker():
     print("=" * 70)
 
 
+class TrackerDaemon:
+    """
+    Runs the tracker every few minutes from one long-lived process
+    
+    The tracker's components are built and warmed up once; each cycle only
+    fetches, analyzes, saves and reports. SIGTERM or Ctrl+C lets the current
+    cycle finish, then flushes state to disk and exits.
+    """
+    
+    def __init__(self, interval_minutes: int = None):
+        """
+        Args:
+            interval_minutes: Minutes between cycles (defaults to
+                config.SCHEDULER_INTERVAL_MINUTES)
+        """
+        self.interval_minutes = interval_minutes or config.SCHEDULER_INTERVAL_MINUTES
+        self.stop_event = threading.Event()
+        self.tracker = None
+        self.cycles = 0
+        self.failures = 0
+        self.stage_totals = {}
+    
+    def request_stop(self, signum=None, frame=None):
+        """Signal handler: stop after the current cycle"""
+        if not self.stop_event.is_set():
+            print()
+            print("🛑 Stop requested, finishing the current cycle...")
+        self.stop_event.set()
+    
+    def run_cycle(self):
+        """One tracker run; errors are logged and the daemon carries on"""
+        self.cycles += 1
+        print()
+        print("=" * 70)
+        print(f"⏰ Cycle {self.cycles} started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 70)
+        try:
+            result = self.tracker.run()
+            for stage, seconds in result['timings'].items():
+                self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + seconds
+        except Exception as e:
+            self.failures += 1
+            print(f"❌ Error during cycle {self.cycles}: {e}")
+            import traceback
+            traceback.print_exc()
+        print(f"✅ Cycle {self.cycles} completed, next in {self.interval_minutes} min")
+    
+    def run(self, run_now: bool = True):
+        """Build the tracker, run cycles until asked to stop, then flush state"""
+        import schedule
+        from main import Tracker, require_credentials
+        
+        require_credentials()
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        
+        started = time.perf_counter()
+        self.tracker = Tracker(whole_day_report=True)
+        self.tracker.warm_up()
+        print(f"🔥 Components ready in {time.perf_counter() - started:.2f}s")
+        
+        schedule.every(self.interval_minutes).minutes.do(self.run_cycle)
+        if run_now:
+            self.run_cycle()
+        try:
+            while not self.stop_event.is_set():
+                schedule.run_pending()
+                idle = schedule.idle_seconds()
+                self.stop_event.wait(min(max(idle or 0, 0), 60))
+        finally:
+            schedule.clear()
+            print("💾 Flushing state...")
+            self.tracker.close(compact_seen=True)
+            self._print_summary()
+    
+    def _print_summary(self):
+        print()
+        print("=" * 70)
+        print(f"👋 Daemon stopped after {self.cycles} cycle(s) ({self.failures} failed)")
+        succeeded = self.cycles - self.failures
+        if succeeded:
+            averages = ' · '.join(f"{stage} {seconds / succeeded:.2f}s"
+                                  for stage, seconds in self.stage_totals.items())
+            print(f"   Average per cycle: {averages}")
+        print("=" * 70)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Command line options (``argv`` defaults to sys.argv[1:])"""
+    parser = argparse.ArgumentParser(description="Run the Reddit tracker on a schedule")
+    parser.add_argument('--now', action='store_true',
+                        help="run once immediately, then daily at 8:00 AM")
+    parser.add_argument('--daemon', action='store_true',
+                        help="keep the tracker warm and run every SCHEDULER_INTERVAL_MINUTES")
+    parser.add_argument('--later', action='store_true',
+                        help="with --daemon, wait one interval before the first run")
+    return parser.parse_args(argv)
+
+
 def main():
     """Main scheduler function"""
+    args = parse_args()
+    if args.daemon:
+        print("🤖 Reddit Tracker Daemon Started")
+        print("=" * 70)
+        print()
+        print(f"📅 Schedule: Every {config.SCHEDULER_INTERVAL_MINUTES} minutes (PID {os.getpid()})")
+        print()
+        print("💡 Press Ctrl+C or send SIGTERM to stop (state is flushed first)")
+        print("=" * 70)
+        print()
+        TrackerDaemon().run(run_now=not args.later)
+        return
+    
     print("🤖 Reddit Tracker Scheduler Started")
     print("=" * 70)
     print()
@@ -39,11 +153,13 @@ def main():
     print("=" * 70)
     print()
     
+    import schedule
+    
     # Schedule the job for 8:00 AM every day
     schedule.every().day.at("08:00").do(run_tracker)
     
     # Optionally run immediately on startup
-    if "--now" in sys.argv:
+    if args.now:
         print("🚀 Running immediately (--now flag detected)...")
         run_tracker()
     
@@ -0,0 +1,332 @@
+"""Persistent set of seen post IDs: sorted binary snapshot + append-only log"""
+import json
+import os
+import re
+import struct
+import time
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+import config
+
+
+# Canonical lowercase base36 that round-trips and fits a uint64 slot
+_BASE36_ID = re.compile(r'[1-9a-z][0-9a-z]{0,11}')
+
+
+def decode_id(post_id: str) -> Union[int, str]:
+    """Reddit's base36 post ID as an integer (other IDs are kept as strings)"""
+    if _BASE36_ID.fullmatch(post_id):
+        return int(post_id, 36)
+    return post_id
+
+
+def encode_id(value: Union[int, str]) -> str:
+    """Inverse of decode_id"""
+    if isinstance(value, str):
+        return value
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while value:
+        value, rem = divmod(value, 36)
+        out = digits[rem] + out
+    return out or '0'
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter over uint64 keys
+
+    Answers "definitely not seen" without touching the sorted index. Positions
+    come from double hashing two splitmix64-style mixes of the key.
+    """
+
+    MIX_1 = np.uint64(0x9E3779B97F4A7C15)
+    MIX_2 = np.uint64(0xC2B2AE3D27D4EB4F)
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false positive rate at that capacity
+        """
+        capacity = max(capacity, 1024)
+        self.size = int(-capacity * np.log(error_rate) / np.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * np.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """(hashes, len(keys)) array of bit positions"""
+        with np.errstate(over='ignore'):
+            h1 = keys * self.MIX_1
+            h1 ^= h1 >> np.uint64(31)
+            h2 = (keys ^ (keys >> np.uint64(29))) * self.MIX_2 | np.uint64(1)
+            steps = np.arange(self.hashes, dtype=np.uint64)[:, None]
+            return (h1 + steps * h2) % np.uint64(self.size)
+
+    def add(self, keys: np.ndarray):
+        positions = self._positions(keys).ravel()
+        masks = np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        positions = self._positions(keys)
+        bits = self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return np.all(bits & 1, axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class SeenStore:
+    """
+    Seen post IDs stored as a compact snapshot plus an append-only log
+
+    In memory the IDs are a sorted uint64 array with a parallel array of
+    "seen at" unix timestamps (12 bytes per post, versus ~65 for a set of
+    strings), and lookups are ``searchsorted`` calls over the whole batch.
+    An optional Bloom filter answers most lookups for new posts before the
+    index is searched. IDs seen longer ago than ``max_age_days`` are pruned.
+
+    New IDs are appended to a small text log (``id<TAB>timestamp`` per line),
+    so a run only writes what it added. Once the log grows past
+    ``compact_every`` entries it is folded into the snapshot: a header, the
+    sorted IDs as little-endian uint64 and their timestamps as uint32, which
+    loads with two ``np.frombuffer`` calls.
+    """
+
+    MAGIC = b'RTSEEN'
+    VERSION = 2
+    # magic, version, integer id count, byte length of the string-id block
+    HEADER = struct.Struct('<6sHQQ')
+    ID_DTYPE = np.dtype('<u8')
+    TIME_DTYPE = np.dtype('<u4')
+
+    def __init__(self, snapshot_file: str = None, log_file: str = None,
+                 legacy_file: str = None, compact_every: int = None,
+                 max_age_days: float = None, bloom: bool = None):
+        self.snapshot_file = snapshot_file or config.SEEN_SNAPSHOT_FILE
+        self.log_file = log_file or config.SEEN_LOG_FILE
+        self.legacy_file = legacy_file if legacy_file is not None else config.SEEN_POSTS_FILE
+        self.compact_every = compact_every or config.SEEN_COMPACT_EVERY
+        self.max_age_days = config.SEEN_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        self.use_bloom = config.SEEN_BLOOM_FILTER if bloom is None else bloom
+        self.load()
+
+    def load(self):
+        """Read the snapshot and replay the log (migrating the old JSON file once)"""
+        self._ids = np.empty(0, dtype=np.uint64)
+        self._seen = np.empty(0, dtype=np.uint32)
+        self._strings: Dict[str, int] = {}
+        self._bloom = None
+        self._log_entries = 0
+        if not os.path.exists(self.snapshot_file) and self.legacy_file \
+                and os.path.exists(self.legacy_file):
+            self._migrate_legacy()
+        try:
+            self._read_snapshot()
+            self._replay_log()
+        except Exception as e:
+            print(f"Error loading seen posts: {e}")
+        self.prune()
+        self._rebuild_bloom()
+
+    def _migrate_legacy(self):
+        """One-time import of the old seen_posts.json into a snapshot"""
+        try:
+            with open(self.legacy_file, 'r') as f:
+                ids = json.load(f).get('seen_ids', [])
+            # The old file has no per-ID times; start their age at migration
+            self._merge(ids, int(time.time()))
+            self._write_snapshot()
+            os.replace(self.legacy_file, f"{self.legacy_file}.migrated")
+            print(f"Migrated {len(ids)} seen post IDs from {self.legacy_file}")
+        except Exception as e:
+            print(f"Error migrating seen posts: {e}")
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_file):
+            return
+        with open(self.snapshot_file, 'rb') as f:
+            magic, version, count, extra = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC or version not in (1, self.VERSION):
+                raise ValueError(f"{self.snapshot_file} is not a seen-ID snapshot")
+            ids = np.frombuffer(f.read(count * 8), dtype=self.ID_DTYPE).astype(np.uint64)
+            if version == 1:
+                # v1 had no timestamps; treat everything as seen when it was written
+                stamp = int(os.path.getmtime(self.snapshot_file))
+                seen = np.full(count, stamp, dtype=np.uint32)
+                strings = {s: stamp for s in f.read(extra).decode('utf-8').split('\n') if s}
+            else:
+                seen = np.frombuffer(f.read(count * 4), dtype=self.TIME_DTYPE).astype(np.uint32)
+                strings = {}
+                for line in f.read(extra).decode('utf-8').split('\n'):
+                    if line:
+                        post_id, stamp = line.rsplit('\t', 1)
+                        strings[post_id] = int(stamp)
+        self._ids, self._seen, self._strings = ids, seen, strings
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_file):
+            return
+        default_stamp = int(os.path.getmtime(self.log_file))
+        ids: List[str] = []
+        stamps: List[int] = []
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                post_id, _, stamp = line.strip().partition('\t')
+                if post_id:
+                    ids.append(post_id)
+                    stamps.append(int(stamp) if stamp else default_stamp)
+        self._log_entries = len(ids)
+        self._merge(ids, stamps)
+
+    def _merge(self, post_ids: Sequence[str], stamps: Union[int, Sequence[int]]):
+        """Bulk-insert IDs, keeping the latest timestamp for duplicates"""
+        if isinstance(stamps, int):
+            stamps = [stamps] * len(post_ids)
+        numbers, times = [], []
+        for post_id, stamp in zip(post_ids, stamps):
+            value = decode_id(post_id)
+            if isinstance(value, str):
+                self._strings[value] = max(stamp, self._strings.get(value, 0))
+            else:
+                numbers.append(value)
+                times.append(stamp)
+        if not numbers:
+            return
+        ids = np.array(numbers, dtype=np.uint64)
+        seen = np.array(times, dtype=np.uint32)
+        order = np.lexsort((seen, ids))
+        ids, seen = ids[order], seen[order]
+        last = np.append(ids[1:] != ids[:-1], True)
+        ids, seen = ids[last], seen[last]
+
+        # Refresh IDs already indexed, then splice the rest in at their slots
+        slots, known = self._locate(ids)
+        self._seen[slots[known]] = np.maximum(self._seen[slots[known]], seen[known])
+        self._ids = np.insert(self._ids, slots[~known], ids[~known])
+        self._seen = np.insert(self._seen, slots[~known], seen[~known])
+
+    def _locate(self, keys: np.ndarray):
+        """Insertion slots of ``keys`` in the sorted index and whether each is present"""
+        slots = np.searchsorted(self._ids, keys)
+        if not len(self._ids):
+            return slots, np.zeros(len(keys), dtype=bool)
+        return slots, self._ids[np.minimum(slots, len(self._ids) - 1)] == keys
+
+    def _write_snapshot(self):
+        """Atomically replace the snapshot with the current index"""
+        others = '\n'.join(f"{post_id}\t{stamp}" for post_id, stamp
+                           in sorted(self._strings.items())).encode('utf-8')
+        tmp_path = f"{self.snapshot_file}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self._ids), len(others)))
+            f.write(self._ids.astype(self.ID_DTYPE).tobytes())
+            f.write(self._seen.astype(self.TIME_DTYPE).tobytes())
+            f.write(others)
+        os.replace(tmp_path, self.snapshot_file)
+
+    def _rebuild_bloom(self):
+        if not self.use_bloom:
+            self._bloom = None
+            return
+        # Headroom so a long-running process stays near the target error rate
+        self._bloom = BloomFilter(2 * len(self._ids) + 10000)
+        self._bloom.add(self._ids)
+
+    def contains_many(self, post_ids: Sequence[str]) -> List[bool]:
+        """Membership for a whole batch of IDs with one index search"""
+        decoded = [decode_id(post_id) for post_id in post_ids]
+        result = [False] * len(decoded)
+        positions, numbers = [], []
+        for position, value in enumerate(decoded):
+            if isinstance(value, str):
+                result[position] = value in self._strings
+            else:
+                positions.append(position)
+                numbers.append(value)
+        if not numbers:
+            return result
+
+        keys = np.array(numbers, dtype=np.uint64)
+        candidates = np.arange(len(keys))
+        if self._bloom is not None:
+            candidates = candidates[self._bloom.might_contain(keys)]
+        _, hits = self._locate(keys[candidates])
+        for index in candidates[hits]:
+            result[positions[index]] = True
+        return result
+
+    def __contains__(self, post_id: str) -> bool:
+        return self.contains_many([post_id])[0]
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._strings)
+
+    def add_many(self, post_ids: Iterable[str]) -> List[str]:
+        """
+        Record IDs as seen, appending only the new ones to the log
+
+        Returns:
+            The IDs that were not already stored
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        added = [post_id for post_id, seen in zip(post_ids, self.contains_many(post_ids))
+                 if not seen]
+        if not added:
+            return added
+
+        stamp = int(time.time())
+        self._merge(added, stamp)
+        if self._bloom is not None:
+            numbers = [value for value in map(decode_id, added) if not isinstance(value, str)]
+            self._bloom.add(np.array(numbers, dtype=np.uint64))
+        try:
+            with open(self.log_file, 'a') as f:
+                f.write(''.join(f"{post_id}\t{stamp}\n" for post_id in added))
+            self._log_entries += len(added)
+            if self._log_entries >= self.compact_every:
+                self.compact()
+        except Exception as e:
+            print(f"Error saving seen posts: {e}")
+        return added
+
+    def prune(self, now: float = None) -> int:
+        """
+        Drop IDs seen more than ``max_age_days`` ago (0 keeps everything)
+
+        Returns:
+            Number of IDs removed
+        """
+        if not self.max_age_days:
+            return 0
+        cutoff = (now or time.time()) - self.max_age_days * 86400
+        keep = self._seen >= cutoff
+        stale_strings = [post_id for post_id, stamp in self._strings.items() if stamp < cutoff]
+        for post_id in stale_strings:
+            del self._strings[post_id]
+        removed = int(len(keep) - keep.sum()) + len(stale_strings)
+        if removed:
+            self._ids, self._seen = self._ids[keep], self._seen[keep]
+            if self._bloom is not None:
+                self._rebuild_bloom()
+        return removed
+
+    def compact(self):
+        """Prune, fold the log into a fresh snapshot and start an empty log"""
+        self.prune()
+        self._write_snapshot()
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self._log_entries = 0
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the in-memory index"""
+        total = self._ids.nbytes + self._seen.nbytes
+        if self._bloom is not None:
+            total += self._bloom.nbytes
+        # Dict slot plus str and int objects for the rare non-base36 IDs
+        total += sum(100 + len(post_id) for post_id in self._strings)
+        return total
@@ -0,0 +1,182 @@
+"""Pluggable sentiment scoring backends for PostAnalyzer"""
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# (polarity, subjectivity)
+Score = Tuple[float, float]
+
+
+class TextBlobBackend:
+    """TextBlob's pattern analyzer, one post at a time (the reference scores)"""
+
+    name = 'textblob'
+
+    def warm_up(self):
+        """Load TextBlob's lexicon before the first real post"""
+        self.score_batch(['warm up'])
+
+    def score_batch(self, texts: Sequence[str]) -> List[Score]:
+        from textblob import TextBlob
+        scores = []
+        for text in texts:
+            sentiment = TextBlob(text).sentiment
+            scores.append((sentiment.polarity, sentiment.subjectivity))
+        return scores
+
+
+class LexiconBackend:
+    """
+    Vectorized scorer over TextBlob's polarity/subjectivity lexicon
+
+    The lexicon is loaded once into NumPy arrays. A batch is tokenized into one
+    flat array of word ids, and the pattern analyzer's rules are applied with
+    array operations instead of a per-word state machine:
+
+    - only words in the lexicon are assessed, and each document's score is the
+      mean over its assessed words
+    - a known adverb ("very") before a known word, with only words of up to
+      two letters in between, merges with it and scales its polarity and
+      subjectivity by the adverb's intensity
+    - a negation ("not", "never", ...) before the word or its adverb, with
+      only single-character tokens in between, halves and flips polarity
+    - every "!" boosts the polarity of the latest assessed word by 25%
+
+    Not modelled: emoticons, the "(!)" sarcasm marker and "really not good"
+    style negations after an adverb. On mixed complaint-style text, labels
+    (positive/negative/neutral, thresholds +/-0.1) agree with TextBlob for
+    at least 99% of posts; see bench/bench_sentiment_backends.py.
+    """
+
+    name = 'lexicon'
+
+    # Mirrors TextBlob's tokenizer, which splits "don't" into "do n ' t"
+    TOKEN_RE = re.compile(r"[a-z0-9]+(?=n't)|n(?='t)|[a-z0-9]+|[^\sa-z0-9]")
+    NEGATIONS = ('no', 'not', "n't", 'never')
+    EXCLAMATION_BOOST = 1.25
+
+    def __init__(self):
+        self._vocab: Dict[str, int] = None
+
+    def warm_up(self):
+        self._load()
+
+    def _load(self):
+        """Copy TextBlob's lexicon into lookup arrays (id 0 = unknown word)"""
+        if self._vocab is not None:
+            return
+        from textblob.en import sentiment as lexicon
+
+        unknown = (0.0, 0.0, 1.0, False, False)
+        rows = [unknown]  # (polarity, subjectivity, intensity, known, modifier)
+        vocab = {}
+        for word in sorted(lexicon.keys()):
+            polarity, subjectivity, intensity = lexicon[word][None]
+            modifier = any(pos in lexicon[word] for pos in lexicon.modifiers)
+            vocab[word] = len(rows)
+            rows.append((polarity, subjectivity, intensity, True, modifier))
+        # Tokens the rules need even when they carry no score of their own
+        for token in ('!',) + self.NEGATIONS:
+            if token not in vocab:
+                vocab[token] = len(rows)
+                rows.append(unknown)
+
+        columns = list(zip(*rows))
+        self._polarity = np.array(columns[0], dtype=float)
+        self._subjectivity = np.array(columns[1], dtype=float)
+        self._intensity = np.array(columns[2], dtype=float)
+        self._known = np.array(columns[3], dtype=bool)
+        self._modifier = np.array(columns[4], dtype=bool)
+        self._negation = np.zeros(len(rows), dtype=bool)
+        self._negation[[vocab[word] for word in self.NEGATIONS]] = True
+        self._exclamation = vocab['!']
+        self._vocab = vocab
+
+    def _tokenize(self, texts: Sequence[str]):
+        """Flatten a batch into word id, token length and document index arrays"""
+        vocab_get = self._vocab.get
+        findall = self.TOKEN_RE.findall
+        ids: List[int] = []
+        lengths: List[int] = []
+        counts: List[int] = []
+        for text in texts:
+            tokens = findall(text.lower())
+            ids.extend([vocab_get(token, 0) for token in tokens])
+            lengths.extend([len(token.strip("'")) for token in tokens])
+            counts.append(len(tokens))
+        docs = np.repeat(np.arange(len(texts)), counts)
+        return np.asarray(ids, dtype=np.int64), np.asarray(lengths, dtype=np.int64), docs
+
+    @staticmethod
+    def _last_before(mask: np.ndarray, docs: np.ndarray) -> np.ndarray:
+        """Index of the nearest earlier token in the same document where mask holds, else -1"""
+        positions = np.arange(len(mask))
+        latest = np.maximum.accumulate(np.where(mask, positions, -1))
+        before = np.full(len(mask), -1)
+        before[1:] = latest[:-1]
+        valid = before >= 0
+        before[valid & (docs[np.maximum(before, 0)] != docs)] = -1
+        return before
+
+    def score_batch(self, texts: Sequence[str]) -> List[Score]:
+        self._load()
+        if not texts:
+            return []
+        ids, lengths, docs = self._tokenize(texts)
+        if len(ids) == 0:
+            return [(0.0, 0.0)] * len(texts)
+        # Sentinel at index -1 so "no such token" lookups read as unknown
+        ids = np.append(ids, 0)
+        lengths = np.append(lengths, 0)
+        docs = np.append(docs, -1)
+
+        known = self._known[ids]
+        negation = self._negation[ids]
+
+        # "very good", "really is a good": an adverb carries over short words
+        blocker = self._last_before(known | (lengths > 2), docs)
+        modified = known & known[blocker] & self._modifier[ids[blocker]] & (blocker >= 0)
+        merged_away = np.zeros(len(ids), dtype=bool)
+        merged_away[blocker[modified]] = True
+        assessed = known & ~merged_away
+
+        # "not good", "not a good", "not very good": negation before the chunk
+        chunk_start = np.where(modified, blocker, np.arange(len(ids)))
+        negation_scope = self._last_before(known | negation | (lengths > 1), docs)
+        scope = negation_scope[chunk_start]
+        negated = (scope >= 0) & negation[scope]
+
+        intensity = np.where(modified, self._intensity[ids[blocker]], 1.0)
+        intensity = np.where(modified & negated, 1.0 / intensity, intensity)
+        polarity = np.clip(self._polarity[ids] * intensity, -1.0, 1.0)
+        subjectivity = np.clip(self._subjectivity[ids] * intensity, -1.0, 1.0)
+
+        # Each "!" boosts the latest assessed word in the same document
+        bangs = (ids == self._exclamation)
+        targets = self._last_before(assessed, docs)[bangs]
+        boosts = np.bincount(targets[targets >= 0], minlength=len(ids))
+        polarity = np.clip(polarity * self.EXCLAMATION_BOOST ** boosts, -1.0, 1.0)
+        polarity = np.where(negated, polarity * -0.5, polarity)
+
+        doc_count = len(texts)
+        assessed_docs = docs[assessed]
+        n = np.bincount(assessed_docs, minlength=doc_count)
+        p_sum = np.bincount(assessed_docs, weights=polarity[assessed], minlength=doc_count)
+        s_sum = np.bincount(assessed_docs, weights=subjectivity[assessed], minlength=doc_count)
+        denominator = np.maximum(n, 1)
+        return list(zip((p_sum / denominator).tolist(), (s_sum / denominator).tolist()))
+
+
+BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    LexiconBackend.name: LexiconBackend,
+}
+
+
+def get_backend(name: str):
+    """Instantiate the sentiment backend called ``name``"""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown sentiment backend '{name}' (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,109 @@
+"""Content-addressed cache for sentiment results"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+import config
+
+
+class SentimentCache:
+    """
+    LRU cache of sentiment results keyed by a hash of the analysed text
+
+    With a ``path`` the cache is loaded from and saved to disk (in LRU order),
+    otherwise it only lives in memory for the lifetime of the process.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if path:
+            self._load()
+
+    @classmethod
+    def from_config(cls) -> Optional['SentimentCache']:
+        """Build the cache selected by ``config.SENTIMENT_CACHE`` (None when off)"""
+        mode = config.SENTIMENT_CACHE
+        if mode == 'off':
+            return None
+        path = config.SENTIMENT_CACHE_FILE if mode == 'disk' else None
+        return cls(path, config.SENTIMENT_CACHE_SIZE)
+
+    @staticmethod
+    def key(text: str, namespace: str = '') -> str:
+        """
+        Stable content hash used as the cache key
+        
+        ``namespace`` separates results from different sentiment backends.
+        """
+        if namespace:
+            text = f"{namespace}\0{text}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _load(self):
+        """Load cached entries (oldest first) from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            for key, value in data.get('entries', []):
+                self._entries[key] = value
+            self._evict()
+        except Exception as e:
+            print(f"Error loading sentiment cache: {e}")
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, text: str, namespace: str = '') -> Optional[Dict]:
+        """Cached result for ``text``, or None"""
+        key = self.key(text, namespace)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, text: str, value: Dict, namespace: str = ''):
+        """Store the result for ``text``, evicting the least recently used"""
+        key = self.key(text, namespace)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def save(self):
+        """Write the cache to disk (no-op in memory-only mode)"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'entries': list(self._entries.items()),
+                    'last_updated': datetime.now().isoformat()
+                }, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving sentiment cache: {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,204 @@
+"""Velocity-based fetch planning: which subreddits to poll, and how deep"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import config
+
+# Reddit listings stop about this many items back
+MAX_LISTING_DEPTH = 1000
+# Weight of the newest observation in the moving averages
+RATE_SMOOTHING = 0.3
+# Keyword hit rate assumed for a subreddit with no history yet
+DEFAULT_HIT_RATE = 0.1
+# Shortest span a first read's rate is measured over, so a few posts from the
+# same minute don't read as a flood
+FIRST_READ_MIN_SECONDS = 3600
+
+
+class SubredditPlanner:
+    """
+    Plans each run's fetch from the post velocity observed in earlier runs
+
+    For every subreddit it keeps a moving average of new posts per hour and
+    of the share of them matching the keywords. A run polls the subreddits
+    whose expected new keyword matches are highest, each with a budget just
+    deep enough to reach the previous run's cursor, until the run's request
+    budget is spent. Quiet subreddits are skipped until enough posts should
+    have piled up (or ``max_idle_hours`` passed); their listing cursor keeps
+    their place, so nothing is lost unless a backlog outgrows the listing.
+
+    When a poll runs out of budget before reaching the cursor, the unread gap
+    is estimated from the rate seen on the pages that were read and reported
+    as missed posts.
+    """
+
+    def __init__(self, path: str = None, clock: Callable[[], float] = time.time,
+                 max_idle_hours: float = None):
+        """
+        Args:
+            path: JSON file the per-subreddit stats persist in
+                (defaults to config.SUBREDDIT_STATS_FILE; '' keeps them in memory)
+            clock: Source of the current time (seconds since the epoch)
+            max_idle_hours: Poll every subreddit at least this often
+                (defaults to config.PLANNER_MAX_IDLE_HOURS)
+        """
+        self.path = config.SUBREDDIT_STATS_FILE if path is None else path
+        self.clock = clock
+        self.max_idle_hours = (config.PLANNER_MAX_IDLE_HOURS if max_idle_hours is None
+                               else max_idle_hours)
+        self.stats: Dict[str, Dict] = {}
+        # This run's observations: {subreddit: {'fetched', 'missed', ...}}
+        self.run_coverage: Dict[str, Dict] = {}
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+        if self.path:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.stats = json.load(f).get('subreddits', {})
+        except Exception as e:
+            print(f"Error loading subreddit stats: {e}")
+
+    def save(self):
+        """Write the per-subreddit stats to disk (no-op in memory-only mode)"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'subreddits': self.stats,
+                    'last_updated': datetime.now().isoformat()
+                }, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving subreddit stats: {e}")
+
+    @staticmethod
+    def requests_for(limit: int, has_cursor: bool) -> int:
+        """API requests a fetch of ``limit`` posts costs (see RedditFetcher._iter_listing)"""
+        if has_cursor:
+            return 1 + math.ceil(max(0, limit - config.CURSOR_PROBE_SIZE) / 100)
+        # Without a cursor fetch_posts reads two sorts of limit // 3 posts each
+        return 2 * max(1, math.ceil((limit // 3) / 100))
+
+    def plan(self, subreddits: List[str], budget: int, has_cursor: Callable[[str], bool],
+             default_limit: int) -> List[Tuple[str, int]]:
+        """
+        Choose this run's subreddits and their post limits
+
+        Args:
+            subreddits: Configured subreddits
+            budget: API requests this run may spend
+            has_cursor: Whether a subreddit's `new` listing has a cursor
+            default_limit: Limit for subreddits without history
+
+        Returns:
+            [(subreddit, limit)] to fetch, most valuable first
+        """
+        now = self.clock()
+        self.run_coverage = {}
+        candidates = []
+        for name in subreddits:
+            stats = self.stats.get(name)
+            if stats is None or not has_cursor(name):
+                # New to the planner: a normal fetch establishes the rate and cursor
+                candidates.append((math.inf, name, default_limit))
+                continue
+            hours = (now - stats['last_polled']) / 3600
+            waiting = stats['rate'] * hours
+            if waiting < config.CURSOR_PROBE_SIZE / 2 and hours < self.max_idle_hours:
+                continue  # Quiet: not worth a request yet
+            # Deep enough for the expected backlog plus some slack
+            limit = int(min(MAX_LISTING_DEPTH, max(config.CURSOR_PROBE_SIZE, waiting * 1.25 + 10)))
+            expected_hits = waiting * stats.get('hit_rate', DEFAULT_HIT_RATE)
+            candidates.append((expected_hits, name, limit))
+
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        planned = []
+        for _, name, limit in candidates:
+            cursor = has_cursor(name)
+            cost = self.requests_for(limit, cursor)
+            if cost > budget:
+                if not cursor or budget < 1:
+                    continue
+                # Whatever pages are left: a partial read beats none
+                limit = min(limit, config.CURSOR_PROBE_SIZE + (budget - 1) * 100)
+                cost = self.requests_for(limit, cursor)
+            planned.append((name, limit))
+            budget -= cost
+        chosen = {name for name, _ in planned}
+        self.skipped = [name for name in subreddits if name not in chosen]
+        return planned
+
+    def observe(self, name: str, listed: int, matched: int, newest: Optional[float],
+                oldest: Optional[float], cursor_created: Optional[float], caught_up: bool,
+                exhausted: bool):
+        """
+        Record one read of a subreddit's `new` listing
+
+        Args:
+            listed: Posts read (newer than the cursor)
+            matched: How many of them matched the keywords
+            newest, oldest: ``created_utc`` of the first and last post read
+            cursor_created: ``created_utc`` of the previous run's cursor post
+            caught_up: The read stopped at the cursor
+            exhausted: The listing ran out of posts
+        """
+        now = self.clock()
+        if cursor_created is None and listed:
+            # First read: the newest post may be long before now (a quiet or
+            # replayed listing), so measure the span the posts themselves cover
+            window = max(newest - oldest, FIRST_READ_MIN_SECONDS)
+        elif caught_up and cursor_created is not None:
+            window = now - cursor_created
+        else:
+            window = now - (oldest if oldest is not None else now)
+        rate = listed / max(window, 60.0) * 3600  # posts/hour
+
+        missed = 0
+        if not (caught_up or exhausted) and listed:
+            if cursor_created is not None:
+                # The unread gap back to the cursor, at the rate just observed
+                missed = int(round(max(0.0, oldest - cursor_created) * rate / 3600))
+            else:
+                missed = None  # First read: no cursor to measure the gap against
+
+        with self._lock:
+            stats = self.stats.setdefault(name, {
+                'rate': rate, 'hit_rate': matched / listed if listed else DEFAULT_HIT_RATE,
+                'fetched': 0, 'missed': 0, 'polls': 0
+            })
+            stats['rate'] += RATE_SMOOTHING * (rate - stats['rate'])
+            if listed:
+                stats['hit_rate'] += RATE_SMOOTHING * (matched / listed - stats['hit_rate'])
+            stats['last_polled'] = now
+            stats['polls'] += 1
+            stats['fetched'] += listed
+            stats['missed'] += missed or 0
+            self.run_coverage[name] = {'fetched': listed, 'missed': missed, 'matched': matched}
+
+    def coverage_lines(self) -> List[str]:
+        """Per-subreddit coverage of this run, for the fetch summary"""
+        lines = []
+        for name, run in sorted(self.run_coverage.items()):
+            stats = self.stats[name]
+            if run['missed'] is None:
+                coverage = 'first read'
+            else:
+                total = run['fetched'] + run['missed']
+                coverage = f"~{run['missed']} missed ({run['fetched'] / total:.0%} coverage)" \
+                    if total else "nothing new"
+            lines.append(f"r/{name}: {run['fetched']} fetched, {coverage}, "
+                         f"{stats['rate']:.1f} posts/h, {stats['hit_rate']:.0%} keyword hits")
+        if self.skipped:
+            lines.append(f"skipped (quiet or over budget): {', '.join(sorted(self.skipped))}")
+        return lines
@@ -0,0 +1,55 @@
+"""Post analysis: parallel runs give the same results as serial ones"""
+from analyzer import PostAnalyzer
+from keyword_matcher import KeywordMatcher
+from sentiment_cache import SentimentCache
+
+TITLES = ['debugging is slow', 'found a bug in billing', 'please add widgets',
+          'the widget crashed', 'love the new theme', 'widgets are terrible']
+
+
+def make_posts(count):
+    return [{'id': str(i), 'title': TITLES[i % len(TITLES)], 'selftext': f"post {i}",
+             'score': i % 30, 'num_comments': i % 7} for i in range(count)]
+
+
+def test_workers_use_the_parent_matcher():
+    # Not config.KEYWORDS, and word boundaries on: 'debugging' is no 'bug'
+    matcher = KeywordMatcher.for_tracker(['widget', 'bug'], {'Bug/Technical Issue': ['bug']},
+                                         word_boundary=True)
+    posts = make_posts(40)
+    serial = PostAnalyzer(matcher=matcher, cache=SentimentCache()).analyze_posts(posts, workers=1)
+    parallel = PostAnalyzer(matcher=matcher, cache=SentimentCache()).analyze_posts(
+        posts, workers=2, chunk_size=5)
+    assert [post['keywords'] for post in parallel] == [post['keywords'] for post in serial]
+    assert [post['categories'] for post in parallel] == [post['categories'] for post in serial]
+    assert serial[0]['keywords'] == [] and serial[1]['keywords'] == ['bug']
+    assert serial[3]['keywords'] == ['widget']
+
+
+def test_cache_hits_start_no_workers(monkeypatch):
+    import analyzer
+    started = []
+    real_pool = analyzer.ProcessPoolExecutor
+
+    def counting_pool(*args, **kwargs):
+        started.append(kwargs['max_workers'])
+        return real_pool(*args, **kwargs)
+    monkeypatch.setattr(analyzer, 'ProcessPoolExecutor', counting_pool)
+
+    posts = make_posts(40)
+    post_analyzer = PostAnalyzer(cache=SentimentCache())
+    post_analyzer.open_pool(workers=2)
+    assert started == []
+    # 8 misses: at most one chunk, scored in-process
+    post_analyzer.analyze_posts(posts[:8], workers=1)
+    mostly_cached = post_analyzer.analyze_posts(posts[:10] + posts[:8] + posts[:8], workers=2,
+                                                chunk_size=5)
+    assert started == []
+    parallel = post_analyzer.analyze_posts(posts, workers=2, chunk_size=5)
+    assert started == [2]
+    assert parallel[:10] == mostly_cached[:10]
+    assert parallel == PostAnalyzer(cache=SentimentCache()).analyze_posts(posts, workers=1)
+    # The kept pool serves later batches
+    post_analyzer.analyze_posts(make_posts(80)[40:], workers=2, chunk_size=5)
+    assert started == [2]
+    post_analyzer.close_pool()
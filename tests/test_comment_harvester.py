@@ -0,0 +1,62 @@
+"""Comment threads: "load more" placeholders, including ones nested in an expansion"""
+import contextlib
+from types import SimpleNamespace
+
+from praw.models import MoreComments
+
+from comment_harvester import CommentHarvester
+
+
+def comment(comment_id, parent_id, depth):
+    return SimpleNamespace(id=comment_id, name=f"t1_{comment_id}", body=f"comment {comment_id}",
+                           author='someone', score=1, depth=depth, parent_id=parent_id)
+
+
+class FakeReddit:
+    """The parts of praw.Reddit that the harvester and PRAW's MoreComments use"""
+
+    def __init__(self, thread, answers):
+        self.thread = thread
+        self.answers = answers
+        self.requests = []
+
+    def submission(self, id):
+        return self.thread
+
+    def post(self, path, data):
+        # morechildren: the answer for the requested children, from the thread's fullname
+        assert data['link_id'] == self.thread.fullname
+        self.requests.append(data['children'])
+        return self.answers[data['children']]
+
+
+def make_harvester(reddit):
+    @contextlib.contextmanager
+    def borrowed_client():
+        yield reddit
+    fetcher = SimpleNamespace(borrowed_client=borrowed_client,
+                              call_api=lambda func, *args, **kwargs: func(*args, **kwargs))
+    return CommentHarvester(fetcher, analyzer=None, more_limit=5, max_depth=5, workers=1)
+
+
+def more(reddit, children, parent_id):
+    return MoreComments(reddit, {'count': len(children), 'children': children,
+                                 'parent_id': parent_id, 'id': children[0], 'name': f"t1_{children[0]}"})
+
+
+def test_expands_placeholders_nested_in_an_expansion():
+    thread = SimpleNamespace(fullname='t3_post', comments=None)
+    reddit = FakeReddit(thread, {})
+    top = more(reddit, ['b', 'c'], 't3_post')
+    # PRAW only sets `submission` on the placeholders of the first response
+    top.submission = thread
+    nested = more(reddit, ['d'], 't1_b')
+    assert nested.submission is None
+    reddit.answers = {'b,c': [comment('b', 't3_post', 0), comment('c', 't3_post', 0), nested],
+                      'd': [comment('d', 't1_b', 1)]}
+    thread.comments = SimpleNamespace(list=lambda: [comment('a', 't3_post', 0), top])
+
+    comments, stats = make_harvester(reddit).harvest_thread({'id': 'post'})
+    assert [c['id'] for c in comments] == ['a', 'b', 'c', 'd']
+    assert reddit.requests == ['b,c', 'd']
+    assert stats['requests'] == 3 and stats['more_expanded'] == 2
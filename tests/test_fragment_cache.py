@@ -0,0 +1,13 @@
+"""Cached post cards must be keyed by every field the card template shows"""
+import os
+import re
+
+from fragment_cache import CARD_FIELDS
+from report_generator import TEMPLATE_DIR
+
+
+def test_card_fields_cover_the_card_template():
+    with open(os.path.join(TEMPLATE_DIR, '_post.html'), encoding='utf-8') as f:
+        source = f.read()
+    shown = set(re.findall(r"\bpost\.(\w+)", source))
+    assert shown <= set(CARD_FIELDS)
@@ -0,0 +1,80 @@
+"""Keyword matching: both matchers agree with the substring loops they replaced"""
+import random
+import re
+
+import pytest
+
+from keyword_matcher import (AUTOMATON_MIN_KEYWORDS, KEYWORD_LABEL, KeywordMatcher,
+                             SubstringMatcher)
+
+KEYWORDS = ['bug', 'issue', 'not working', 'need', 'wish there was']
+CATEGORIES = {
+    'Bug Reports': ['bug', 'crash', 'error'],
+    'Feature Requests': ['wish there was', 'feature', 'add'],
+}
+TEXTS = [
+    'The app has a BUG when it crashes',
+    'debugging this is a pain',
+    'I wish there was a dark mode feature',
+    'Error: not working since the update',
+    'bug_report filed, addition pending',
+    'nothing to see here',
+    '',
+    'need-help: crash!',
+]
+
+
+def old_loops(text, word_boundary=False):
+    """What the fetcher and analyzer did before the shared matcher"""
+    text = text.lower()
+    if word_boundary:
+        def found(keyword):
+            return re.search(rf"(?<!\w){re.escape(keyword)}(?!\w)", text) is not None
+    else:
+        def found(keyword):
+            return keyword in text
+    keywords = {keyword for keyword in KEYWORDS if found(keyword)}
+    labels = {name for name, words in CATEGORIES.items() if any(found(word) for word in words)}
+    if keywords:
+        labels.add(KEYWORD_LABEL)
+    return keywords, labels
+
+
+@pytest.mark.parametrize('matcher_class', [KeywordMatcher, SubstringMatcher])
+@pytest.mark.parametrize('word_boundary', [False, True])
+def test_matches_old_loops(matcher_class, word_boundary):
+    matcher = matcher_class.for_tracker(KEYWORDS, CATEGORIES, word_boundary=word_boundary)
+    assert isinstance(matcher, matcher_class)
+    for text in TEXTS:
+        keywords, labels = old_loops(text, word_boundary)
+        assert matcher.scan(text, KEYWORD_LABEL) == (keywords, labels), text
+        assert matcher.matches(text, KEYWORD_LABEL) == bool(keywords), text
+        assert matcher.matches(text) == bool(labels), text
+
+
+@pytest.mark.parametrize('word_boundary', [False, True])
+def test_random_texts_agree(word_boundary):
+    rng = random.Random(7)
+    alphabet = 'abgu _-'
+    keywords = {''.join(rng.choice('abgu') for _ in range(rng.randint(1, 3))): {'x'} for _ in range(20)}
+    automaton = KeywordMatcher(keywords, word_boundary=word_boundary)
+    substring = SubstringMatcher(keywords, word_boundary=word_boundary)
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert automaton.find(text) == substring.find(text), text
+
+
+def test_word_boundary():
+    matcher = KeywordMatcher.for_tracker(['bug'], {}, word_boundary=True)
+    assert matcher.find('a bug, again') == {'bug'}
+    assert matcher.find('debugging') == set()
+    assert matcher.find('bug_tracker') == set()
+    assert matcher.find('bug') == {'bug'}
+
+
+def test_for_tracker_picks_by_size():
+    assert isinstance(KeywordMatcher.for_tracker(KEYWORDS, CATEGORIES), SubstringMatcher)
+    many = [f"keyword{i}" for i in range(AUTOMATON_MIN_KEYWORDS)]
+    matcher = KeywordMatcher.for_tracker(many, {})
+    assert type(matcher) is KeywordMatcher
+    assert matcher.find('keyword7 and keyword42') == {'keyword7', 'keyword42', 'keyword4'}
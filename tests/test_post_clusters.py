@@ -0,0 +1,80 @@
+"""Near-duplicate clustering: MinHash/LSH assignment and the persistent index"""
+import time
+
+import pytest
+
+from post_clusters import ClusterIndex, shingle_hashes
+
+BASE = ("the app keeps crashing every time I open the settings page after the "
+        "latest update and support has not answered my ticket for a week")
+
+
+def make_post(post_id, title, selftext='', age=0.0):
+    return {'id': post_id, 'title': title, 'selftext': selftext,
+            'created_utc': time.time() - 3600 + age}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ClusterIndex(str(tmp_path / 'clusters.sqlite3'), threshold=0.5, num_perm=128, bands=32)
+    yield index
+    index.close()
+
+
+def test_shingles_cover_any_script():
+    assert len(shingle_hashes('这个应用崩溃了 真的')) == 1
+    assert len(shingle_hashes('Приложение не работает')) == 2
+    assert len(shingle_hashes('🔥🔥🔥')) == 0
+
+
+def test_near_duplicates_share_a_cluster(index):
+    posts = [
+        make_post('a', BASE, age=0),
+        make_post('b', BASE.replace('week', 'month'), age=10),
+        make_post('c', 'looking for a good budget laptop for college programming classes', age=20),
+    ]
+    summary = index.assign(posts)
+    assert posts[0]['cluster_id'] == posts[1]['cluster_id'] == 'a'
+    assert posts[2]['cluster_id'] == 'c'
+    assert summary['duplicates'] == 1
+    assert summary['clusters'] == 1
+    assert posts[0]['cluster_total'] == 2
+    assert len(index) == 3
+
+
+def test_union_is_transitive(index):
+    words = BASE.split()
+    # Each post differs from the next by one word, the ends by three
+    posts = [make_post(str(i), ' '.join(words[:i] + ['changed'] + words[i + 1:]), age=i)
+             for i in range(4, 8)]
+    index.assign(posts)
+    assert len({post['cluster_id'] for post in posts}) == 1
+
+
+def test_later_run_joins_stored_cluster(index):
+    index.assign([make_post('old', BASE)])
+    later = [make_post('new', BASE + ' please help', age=100)]
+    summary = index.assign(later)
+    assert later[0]['cluster_id'] == 'old'
+    assert later[0]['cluster_total'] == 2
+    assert summary['joined_earlier'] == 1
+    assert summary['duplicates'] == 1
+
+
+def test_wordless_posts_are_skipped(index):
+    posts = [make_post('zh', '这个应用崩溃了'), make_post('ru', 'Приложение не работает'),
+             make_post('fire', '🔥🔥🔥'), make_post('ja', 'アプリが動かない'),
+             make_post('smile', '😀 😀')]
+    summary = index.assign(posts)
+    assert summary['duplicates'] == 0
+    assert summary['clusters'] == 0
+    assert summary['skipped'] == 2
+    assert 'cluster_id' not in posts[2] and 'cluster_id' not in posts[4]
+    assert len({post['cluster_id'] for post in posts if 'cluster_id' in post}) == 3
+    assert len(index) == 3
+
+
+def test_prune_forgets_old_posts(index):
+    index.assign([make_post('old', BASE, age=-10 * 86400), make_post('new', 'something else entirely')])
+    assert index.prune(max_age_days=7) == 1
+    assert len(index) == 1
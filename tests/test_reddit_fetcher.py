@@ -0,0 +1,70 @@
+"""Listing cursors: where an incremental read of `new` stops"""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from reddit_fetcher import RedditFetcher
+
+
+def listing(*times):
+    """Submissions newest first, named t3_0, t3_1, ..."""
+    return [SimpleNamespace(name=f"t3_{i}", created_utc=created) for i, created in enumerate(times)]
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    monkeypatch.setattr(config, 'CURSOR_PROBE_SIZE', 2)
+    fetcher = RedditFetcher(reddit=object())
+    fetcher.pages = []
+
+    def fetch_page(subreddit, sort_method, limit, after):
+        items = fetcher.items
+        start = 0 if after is None else [item.name for item in items].index(after) + 1
+        fetcher.pages.append(limit)
+        return items[start:start + limit]
+    monkeypatch.setattr(fetcher, '_fetch_page', fetch_page)
+    return fetcher
+
+
+def read(fetcher, cursor, limit=100):
+    progress = {}
+    names = [s.name for s in fetcher._iter_listing(None, 'new', limit, cursor, progress)]
+    return names, progress
+
+
+def test_stops_at_cursor_post(fetcher):
+    fetcher.items = listing(500, 400, 300, 200, 100)
+    names, progress = read(fetcher, {'fullname': 't3_2', 'created_utc': 300})
+    assert names == ['t3_0', 't3_1']
+    assert progress == {'caught_up': True}
+
+
+def test_keeps_unseen_posts_from_the_cursor_second(fetcher):
+    # t3_1 and t3_3 were posted in the same second as the cursor post t3_2
+    fetcher.items = listing(500, 300, 300, 300, 200)
+    names, _ = read(fetcher, {'fullname': 't3_2', 'created_utc': 300})
+    assert names == ['t3_0', 't3_1']
+
+
+def test_stops_at_older_post_when_cursor_post_is_gone(fetcher):
+    # The cursor post was deleted: t3_2 and t3_3 share its second, t3_4 is older
+    fetcher.items = listing(500, 400, 300, 300, 200)
+    names, progress = read(fetcher, {'fullname': 't3_deleted', 'created_utc': 300})
+    assert names == ['t3_0', 't3_1', 't3_2', 't3_3']
+    assert progress == {'caught_up': True}
+
+
+def test_probe_then_full_pages(fetcher):
+    fetcher.items = listing(*range(1000, 0, -1))
+    names, progress = read(fetcher, {'fullname': 't3_150', 'created_utc': 850}, limit=1000)
+    assert len(names) == 150
+    assert fetcher.pages[0] == 2
+    assert progress == {'caught_up': True}
+
+
+def test_without_cursor_reads_to_the_limit(fetcher):
+    fetcher.items = listing(500, 400, 300)
+    names, progress = read(fetcher, None, limit=10)
+    assert names == ['t3_0', 't3_1', 't3_2']
+    assert progress == {'exhausted': True}
@@ -0,0 +1,73 @@
+"""Seen post IDs: snapshot + log round trip, compaction, migration and pruning"""
+import json
+import os
+import time
+
+import pytest
+
+from seen_store import SeenStore, decode_id, encode_id
+
+
+def make_store(tmp_path, **kwargs):
+    kwargs.setdefault('compact_every', 1000)
+    kwargs.setdefault('max_age_days', 0)
+    kwargs.setdefault('legacy_file', '')
+    return SeenStore(snapshot_file=str(tmp_path / 'seen.bin'), log_file=str(tmp_path / 'seen.log'),
+                     **kwargs)
+
+
+@pytest.mark.parametrize('bloom', [False, True])
+def test_round_trip_through_the_log(tmp_path, bloom):
+    store = make_store(tmp_path, bloom=bloom)
+    assert store.add_many(['1abc', 'zz9', 'not-base36', '1abc']) == ['1abc', 'zz9', 'not-base36']
+    assert store.add_many(['zz9', 'q1']) == ['q1']
+    assert not os.path.exists(tmp_path / 'seen.bin')
+
+    reloaded = make_store(tmp_path, bloom=bloom)
+    assert len(reloaded) == 4
+    assert reloaded.contains_many(['1abc', 'zz9', 'not-base36', 'q1', 'new1', 'Other']) == \
+        [True, True, True, True, False, False]
+
+
+def test_compaction_folds_the_log_into_the_snapshot(tmp_path):
+    store = make_store(tmp_path, compact_every=5)
+    store.add_many([f"a{i}" for i in range(3)])
+    assert os.path.exists(tmp_path / 'seen.log')
+    store.add_many([f"b{i}" for i in range(3)] + ['0legacy'])
+    # Six log entries passed compact_every: the log is gone, the snapshot has everything
+    assert not os.path.exists(tmp_path / 'seen.log')
+    assert os.path.exists(tmp_path / 'seen.bin')
+
+    reloaded = make_store(tmp_path)
+    assert len(reloaded) == 7
+    assert all(reloaded.contains_many([f"a{i}" for i in range(3)] + ['b2', '0legacy']))
+    reloaded.add_many(['c1'])
+    reloaded.compact()
+    assert len(make_store(tmp_path)) == 8
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / 'seen_posts.json'
+    legacy.write_text(json.dumps({'seen_ids': ['abc', 'def']}))
+    store = make_store(tmp_path, legacy_file=str(legacy))
+    assert 'abc' in store and 'def' in store
+    assert not legacy.exists() and (tmp_path / 'seen_posts.json.migrated').exists()
+
+
+def test_prune_drops_old_ids(tmp_path):
+    store = make_store(tmp_path, max_age_days=7)
+    store.add_many(['old1', 'odd_id', 'new1'])
+    assert store.prune(now=time.time() + 8 * 86400) == 3
+    assert len(store) == 0
+
+    store.add_many(['abc'])
+    assert store.prune(now=time.time() + 86400) == 0
+    assert 'abc' in store
+
+
+def test_base36_ids_round_trip():
+    for post_id in ['1', 'abc', '1a2b3c', 'zzzzzzzzzzzz']:
+        assert encode_id(decode_id(post_id)) == post_id
+    # Not canonical base36: kept as strings
+    assert decode_id('0abc') == '0abc'
+    assert decode_id('ABC') == 'ABC'
@@ -0,0 +1,43 @@
+"""Velocity planner: post rates measured from listing reads"""
+import pytest
+
+from subreddit_planner import FIRST_READ_MIN_SECONDS, SubredditPlanner
+
+NOW = 1_700_000_000.0
+HOUR = 3600
+
+
+@pytest.fixture
+def planner():
+    return SubredditPlanner(path='', clock=lambda: NOW)
+
+
+def test_first_read_rate_from_the_posts_span(planner):
+    # 100 posts over the 10 hours before the newest one, itself 30 days old
+    newest = NOW - 30 * 24 * HOUR
+    planner.observe('old', 100, 10, newest=newest, oldest=newest - 10 * HOUR,
+                    cursor_created=None, caught_up=False, exhausted=False)
+    assert planner.stats['old']['rate'] == pytest.approx(10.0)
+    assert planner.run_coverage['old']['missed'] is None
+
+
+def test_first_read_span_has_a_floor(planner):
+    planner.observe('burst', 3, 1, newest=NOW - 60, oldest=NOW - 120,
+                    cursor_created=None, caught_up=False, exhausted=True)
+    assert planner.stats['burst']['rate'] == pytest.approx(3 * HOUR / FIRST_READ_MIN_SECONDS)
+
+
+def test_caught_up_rate_since_the_cursor(planner):
+    planner.stats['sub'] = {'rate': 20.0, 'hit_rate': 0.1, 'fetched': 0, 'missed': 0, 'polls': 1}
+    planner.observe('sub', 20, 2, newest=NOW - 60, oldest=NOW - HOUR,
+                    cursor_created=NOW - 2 * HOUR, caught_up=True, exhausted=False)
+    # 10 posts/h observed, smoothed into the old 20
+    assert planner.stats['sub']['rate'] == pytest.approx(20 + 0.3 * (10 - 20))
+    assert planner.run_coverage['sub']['missed'] == 0
+
+
+def test_missed_posts_when_budget_runs_out(planner):
+    planner.observe('busy', 100, 5, newest=NOW, oldest=NOW - HOUR,
+                    cursor_created=NOW - 3 * HOUR, caught_up=False, exhausted=False)
+    # 100 posts/h, two unread hours back to the cursor
+    assert planner.run_coverage['busy']['missed'] == 200
@@ -0,0 +1,83 @@
+"""Tracker runs on the replay source: a failed run must not lose posts"""
+import contextlib
+import io
+import os
+
+import pytest
+
+import config
+from analyzer import PostAnalyzer
+from reddit_fetcher import RedditFetcher
+from replay_source import ReplayReddit
+
+
+@pytest.fixture
+def reddit(tmp_path, monkeypatch):
+    """Replay source and a scratch working directory for data/ and reports/"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, 'SUBREDDITS', ['sub000', 'sub001'])
+    monkeypatch.setattr(config, 'API_REQUESTS_PER_MINUTE', 60000)
+    monkeypatch.setattr(config, 'HISTORY_DATASET', False)
+    monkeypatch.setattr(config, 'SENTIMENT_CACHE', 'memory')
+    reddit = ReplayReddit(latency=0, posts_per_subreddit=60)
+    monkeypatch.setattr(RedditFetcher, '_new_client', staticmethod(reddit.client))
+    config.ensure_directories()
+    return reddit
+
+
+def make_tracker(**kwargs):
+    from main import Tracker
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Tracker(**kwargs)
+
+
+def run(tracker):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return tracker.run()
+
+
+def failing_analysis(monkeypatch):
+    def fail(self, posts, **kwargs):
+        raise RuntimeError('analysis failed')
+    monkeypatch.setattr(PostAnalyzer, 'analyze_posts', fail)
+
+
+def publish(reddit, count):
+    for name in config.SUBREDDITS:
+        reddit.add_new_posts(name, count)
+
+
+def test_one_shot_run_after_a_failed_one_gets_its_posts(reddit, monkeypatch):
+    tracker = make_tracker()
+    first = run(tracker)['posts']
+    tracker.close()
+    assert first > 0
+    # A short seen-ID log is not folded into the snapshot on every exit
+    assert not os.path.exists(config.SEEN_SNAPSHOT_FILE)
+
+    publish(reddit, 20)
+    tracker = make_tracker()
+    with monkeypatch.context() as patch:
+        failing_analysis(patch)
+        with pytest.raises(RuntimeError):
+            run(tracker)
+    tracker.close()
+
+    tracker = make_tracker()
+    assert run(tracker)['posts'] > 0
+    tracker.close()
+    assert run(make_tracker())['posts'] == 0
+
+
+def test_daemon_cycle_after_a_failed_one_gets_its_posts(reddit, monkeypatch):
+    tracker = make_tracker(whole_day_report=True)
+    run(tracker)
+    publish(reddit, 20)
+    with monkeypatch.context() as patch:
+        failing_analysis(patch)
+        with pytest.raises(RuntimeError):
+            run(tracker)
+    assert run(tracker)['posts'] > 0
+    assert run(tracker)['posts'] == 0
+    tracker.close(compact_seen=True)
+    assert not os.path.exists(config.SEEN_LOG_FILE)
@@ -0,0 +1,97 @@
+"""Trend detection: baselines folded from synthetic hourly counts, spikes and rises"""
+import pytest
+
+from trend_detector import MIN_HISTORY, OPEN_BUCKETS, TrendDetector
+
+HOUR = 3600
+START = 1_000_000 * HOUR
+
+
+def posts_in(bucket, count, subreddit='python', categories=('Bug/Technical Issue',)):
+    return [{'subreddit': subreddit, 'created_utc': START + bucket * HOUR + i * HOUR / (count + 1),
+             'categories': list(categories), 'keywords': ['bug']} for i in range(count)]
+
+
+def feed(detector, counts, **kwargs):
+    for bucket, count in enumerate(counts):
+        detector.update(posts_in(bucket, count, **kwargs))
+
+
+@pytest.fixture
+def detector():
+    return TrendDetector(path='', bucket_hours=1, smoothing=0.2)
+
+
+def at_end_of(bucket):
+    return START + (bucket + 1) * HOUR - 1
+
+
+def test_fold_builds_the_baseline(detector):
+    feed(detector, [3] + [10] * 20)
+    assert detector.detect(at_end_of(20)) == []
+    series = detector.series['subreddit:python']
+    # The first (partial) bucket is skipped; the open ones are not folded yet
+    assert series['buckets'] == 20 - OPEN_BUCKETS
+    assert series['mean'] == pytest.approx(10.0)
+    assert series['var'] == pytest.approx(0.0)
+    assert series['cusum'] == 0.0
+    assert set(series['open']) == {START // HOUR + 19, START // HOUR + 20}
+
+
+def test_empty_buckets_fold_as_zero(detector):
+    feed(detector, [10] * 6)
+    detector.detect(at_end_of(10))
+    series = detector.series['subreddit:python']
+    # Buckets 1-5 held 10 posts, 6-8 none
+    assert series['buckets'] == 10 - OPEN_BUCKETS
+    assert series['mean'] == pytest.approx(10 * 0.8 ** 3)
+
+
+def test_spike_in_the_current_bucket(detector):
+    feed(detector, [10] * 20 + [40])
+    trends = detector.detect(at_end_of(20))
+    # One category in one subreddit: the pair is shown, not its broader series
+    assert [trend['kind'] for trend in trends] == ['category_in_subreddit', 'keyword']
+    trend = trends[0]
+    assert trend['spike'] and not trend['rising']
+    assert trend['label'] == 'Bug/Technical Issue in r/python'
+    assert trend['count'] == 40
+    assert trend['ratio'] == pytest.approx(4.0, abs=0.1)
+
+
+def test_partial_bucket_is_scaled(detector):
+    feed(detector, [10] * 20 + [5])
+    # Half way through the bucket 5 posts are on pace
+    assert detector.detect(START + 20.5 * HOUR) == []
+
+
+def test_sustained_rise_without_a_spike(detector):
+    feed(detector, [10] * 20 + [17] * 6)
+    trends = {trend['kind']: trend for trend in detector.detect(at_end_of(25))}
+    assert 'keyword' in trends
+    assert trends['keyword']['rising'] and not trends['keyword']['spike']
+
+
+@pytest.mark.parametrize('history, flagged', [(MIN_HISTORY - 1, False), (MIN_HISTORY, True)])
+def test_min_history(detector, history, flagged):
+    # The partial first bucket and the previous (still open) one don't count
+    current = 1 + history + OPEN_BUCKETS - 1
+    feed(detector, [10] * current + [100])
+    assert bool(detector.detect(at_end_of(current))) == flagged
+
+
+def test_posts_for_closed_buckets_are_not_counted(detector):
+    feed(detector, [10] * 10)
+    assert detector.update(posts_in(9, 2)) == 2
+    assert detector.update(posts_in(2, 3)) == 0
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / 'trends.json')
+    detector = TrendDetector(path=path, bucket_hours=1, smoothing=0.2)
+    feed(detector, [10] * 20)
+    detector.save()
+    reloaded = TrendDetector(path=path, bucket_hours=1, smoothing=0.2)
+    assert reloaded.series == detector.series
+    # A different bucket length starts over
+    assert len(TrendDetector(path=path, bucket_hours=24)) == 0
@@ -0,0 +1,305 @@
+"""Spike detection over rolling post counts per subreddit, category and keyword"""
+import json
+import math
+import os
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
+import config
+import metrics
+
+if TYPE_CHECKING:
+    from history import HistoryDataset
+
+# Buckets still open to late posts: the current one and the one before it
+OPEN_BUCKETS = 2
+# Completed buckets a series needs before it can be flagged
+MIN_HISTORY = 3
+# CUSUM slack in standard deviations: smaller drifts never add up to an alarm
+CUSUM_SLACK = 0.5
+# Standard deviations one bucket may move the baseline and the CUSUM by: a spike
+# neither masks the next one nor reads as a sustained rise for days after
+BASELINE_CLIP = 3.0
+# Early in a bucket its expected count is taken for at least this share of it
+MIN_ELAPSED = 0.25
+# Empty buckets folded one by one; a longer gap decays the baseline to nothing anyway
+MAX_GAP = 400
+# Series whose baseline fell below this (and that have no open counts) are dropped
+PRUNE_MEAN = 0.01
+# Trends returned by detect(), strongest first
+TOP_TRENDS = 10
+
+
+def post_series(post: Dict) -> Iterable[Tuple[str, str, str]]:
+    """(key, kind, label) of every series a post counts toward"""
+    subreddit = post['subreddit']
+    yield f"subreddit:{subreddit}", 'subreddit', f"r/{subreddit}"
+    for category in post.get('categories') or []:
+        yield f"category:{category}", 'category', category
+        yield (f"category_in_subreddit:{subreddit}/{category}", 'category_in_subreddit',
+               f"{category} in r/{subreddit}")
+    for keyword in post.get('keywords') or []:
+        yield f"keyword:{keyword}", 'keyword', f'"{keyword}"'
+
+
+class TrendDetector:
+    """
+    Rolling post counts with exponentially weighted baselines and spike alarms
+
+    Tracked posts are counted per subreddit, category, keyword and category
+    within a subreddit, in UTC-aligned buckets of ``bucket_hours`` by
+    ``created_utc``. Once a bucket closes its count is folded into the
+    series' exponentially weighted mean and variance and into an upper CUSUM,
+    and dropped. So a post costs O(1) per series it belongs to, and the state
+    (persisted as JSON) stays the same size however long the history gets.
+
+    The current bucket is flagged as a spike when its count is
+    ``TREND_Z_THRESHOLD`` standard deviations above the baseline scaled to
+    the part of the bucket that has passed. A series is flagged as rising when
+    the CUSUM of its completed buckets passes ``TREND_CUSUM_THRESHOLD``: several
+    moderately high buckets in a row, none a spike on its own.
+    """
+
+    def __init__(self, path: str = None, bucket_hours: float = None, smoothing: float = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: JSON file the state persists in (defaults to config.TRENDS_FILE;
+                '' keeps it in memory)
+            bucket_hours: Bucket length (defaults to config.TREND_BUCKET_HOURS)
+            smoothing: Weight of the newest bucket in the baselines
+                (defaults to config.TREND_SMOOTHING)
+            clock: Source of the current time (seconds since the epoch)
+        """
+        self.path = config.TRENDS_FILE if path is None else path
+        self.bucket_hours = config.TREND_BUCKET_HOURS if bucket_hours is None else bucket_hours
+        self.bucket_seconds = self.bucket_hours * 3600
+        self.smoothing = config.TREND_SMOOTHING if smoothing is None else smoothing
+        self.clock = clock
+        self.series: Dict[str, Dict] = {}
+        if self.path:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading trend state: {e}")
+            return
+        if data.get('bucket_hours') != self.bucket_hours:
+            print(f"   Trend buckets changed from {data.get('bucket_hours')}h to "
+                  f"{self.bucket_hours:g}h: starting over (rebuild with python3 trend_detector.py)")
+            return
+        for key, series in data.get('series', {}).items():
+            series['open'] = {int(bucket): count for bucket, count in series['open'].items()}
+            self.series[key] = series
+
+    def save(self):
+        """Write the state to disk (no-op in memory-only mode)"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'bucket_hours': self.bucket_hours,
+                    'series': self.series,
+                    'last_updated': datetime.now().isoformat()
+                }, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving trend state: {e}")
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _fold(self, series: Dict, count: int):
+        """Fold one completed bucket into a series' baseline and CUSUM"""
+        if series.pop('partial', False):
+            # Tracking started partway through it, so it would drag the baseline down
+            return
+        mean, var = series['mean'], series['var']
+        if series['buckets'] >= MIN_HISTORY:
+            # Floored at Poisson noise so a flat baseline can't make every post an alarm
+            deviation = math.sqrt(max(var, mean, 1.0))
+            z = min((count - mean) / deviation, BASELINE_CLIP)
+            series['cusum'] = max(0.0, series['cusum'] + z - CUSUM_SLACK)
+            count = min(count, mean + BASELINE_CLIP * deviation)
+        if series['buckets'] == 0:
+            series['mean'], series['var'] = float(count), 0.0
+        else:
+            diff = count - mean
+            step = self.smoothing * diff
+            series['mean'] = mean + step
+            series['var'] = (1 - self.smoothing) * (var + diff * step)
+        series['buckets'] += 1
+
+    def _advance(self, series: Dict, bucket: int):
+        """Close every open bucket older than the ``OPEN_BUCKETS`` ending at ``bucket``"""
+        closed = bucket - OPEN_BUCKETS
+        if closed <= series['last']:
+            return
+        for start in sorted(series['open']):
+            if start > closed:
+                break
+            for _ in range(min(start - series['last'] - 1, MAX_GAP)):
+                self._fold(series, 0)
+            self._fold(series, series['open'].pop(start))
+            series['last'] = start
+        for _ in range(min(closed - series['last'], MAX_GAP)):
+            self._fold(series, 0)
+        series['last'] = closed
+
+    def observe(self, post: Dict) -> bool:
+        """
+        Count one analyzed post in each of its series
+
+        Returns:
+            False if the post's bucket had already closed (it is not counted)
+        """
+        bucket = self._bucket(post['created_utc'])
+        counted = True
+        for key, kind, label in post_series(post):
+            series = self.series.get(key)
+            if series is None:
+                # Starts at the post's bucket, with no empty history before it
+                series = self.series[key] = {'kind': kind, 'label': label, 'open': {},
+                                             'last': bucket - 1, 'buckets': 0, 'partial': True,
+                                             'mean': 0.0, 'var': 0.0, 'cusum': 0.0}
+            elif bucket <= series['last']:
+                counted = False
+                continue
+            self._advance(series, bucket)
+            series['open'][bucket] = series['open'].get(bucket, 0) + 1
+        return counted
+
+    @metrics.timed('update_trends')
+    def update(self, posts: Iterable[Dict]) -> int:
+        """
+        Count a run's analyzed posts, oldest first
+
+        Returns:
+            Number of posts counted
+        """
+        counted = 0
+        for post in sorted(posts, key=lambda p: p['created_utc']):
+            counted += self.observe(post)
+        metrics.count('trend_posts', counted)
+        return counted
+
+    def detect(self, now: float = None, limit: int = TOP_TRENDS) -> List[Dict]:
+        """
+        Series whose current bucket spikes or whose recent buckets keep running high
+
+        Args:
+            now: Time to detect at (defaults to the clock)
+            limit: Trends returned, strongest spike first
+
+        Returns:
+            [{'kind', 'label', 'count', 'expected', 'ratio', 'z', 'cusum',
+              'spike', 'rising', 'period'}]
+        """
+        now = self.clock() if now is None else now
+        bucket = self._bucket(now)
+        elapsed = max(MIN_ELAPSED, (now - bucket * self.bucket_seconds) / self.bucket_seconds)
+        period = 'today' if self.bucket_hours == 24 else f"in this {self.bucket_hours:g}h bucket"
+        trends: Dict[str, Dict] = {}
+        stale = []
+        for key, series in self.series.items():
+            self._advance(series, bucket)
+            if not series['open'] and series['mean'] < PRUNE_MEAN:
+                stale.append(key)
+                continue
+            if series['buckets'] < MIN_HISTORY:
+                continue
+            count = series['open'].get(bucket, 0)
+            expected = series['mean'] * elapsed
+            z = (count - expected) / math.sqrt(max(series['var'] * elapsed, expected, 1.0))
+            spike = count >= config.TREND_MIN_COUNT and z >= config.TREND_Z_THRESHOLD
+            rising = series['cusum'] >= config.TREND_CUSUM_THRESHOLD
+            if spike or rising:
+                trends[key] = {
+                    'kind': series['kind'],
+                    'label': series['label'],
+                    'count': count,
+                    'expected': round(expected, 1),
+                    'ratio': round(count / expected, 1) if expected > 0 else None,
+                    'z': round(z, 1),
+                    'cusum': round(series['cusum'], 1),
+                    'spike': spike,
+                    'rising': rising,
+                    'period': period,
+                }
+        for key in stale:
+            del self.series[key]
+        # A spike made of one category in one subreddit is shown once, as that pair
+        for key, trend in list(trends.items()):
+            if trend['kind'] != 'category_in_subreddit':
+                continue
+            subreddit, category = key.split(':', 1)[1].split('/', 1)
+            for broader in (f"subreddit:{subreddit}", f"category:{category}"):
+                if broader in trends and trends[broader]['count'] == trend['count']:
+                    del trends[broader]
+        ranked = sorted(trends.values(), key=lambda trend: (trend['spike'], trend['z'], trend['cusum']),
+                        reverse=True)
+        metrics.count('trend_alerts', len(ranked))
+        return ranked[:limit]
+
+    def rebuild(self, history: 'HistoryDataset', start: str = None) -> int:
+        """
+        Recompute the state from the columnar history dataset
+
+        Only the subreddit, timestamp, category and keyword columns are read
+        (never the daily JSON files or the post text). Parts written before
+        keywords were recorded only count toward the other series.
+
+        Args:
+            history: Dataset to read
+            start: First collection date to read (YYYY-MM-DD, default: all)
+
+        Returns:
+            Number of posts counted
+        """
+        from history import split_categories
+        frame = history.load(['subreddit', 'created_utc', 'categories', 'keywords'], start=start)
+        frame = frame.sort_values('created_utc')
+        self.series = {}
+        counted = 0
+        for subreddit, created_utc, categories, keywords in zip(
+                frame['subreddit'].astype(str), frame['created_utc'].astype(float),
+                split_categories(frame), split_categories(frame, 'keywords')):
+            counted += self.observe({'subreddit': subreddit, 'created_utc': created_utc,
+                                     'categories': categories, 'keywords': keywords})
+        return counted
+
+    @staticmethod
+    def describe(trend: Dict) -> str:
+        """One line per trend, for the run log"""
+        parts = [f"{trend['label']}: {trend['count']} posts {trend['period']}"]
+        if trend['spike']:
+            if trend['ratio'] is not None:
+                parts.append(f"{trend['ratio']:g}x the usual {trend['expected']:g}")
+            parts.append(f"z {trend['z']:g}")
+        if trend['rising']:
+            parts.append(f"rising (CUSUM {trend['cusum']:g})")
+        return ', '.join(parts)
+
+
+if __name__ == "__main__":
+    # python3 trend_detector.py: rebuild data/trends.json from data/history
+    from history import HistoryDataset
+    detector = TrendDetector()
+    started = time.perf_counter()
+    posts = detector.rebuild(HistoryDataset())
+    trends = detector.detect()
+    detector.save()
+    print(f"✅ Rebuilt {len(detector)} trend series from {posts} posts in "
+          f"{time.perf_counter() - started:.2f}s -> {detector.path}")
+    for trend in trends:
+        print(f"   📈 {TrendDetector.describe(trend)}")
@@ -0,0 +1,184 @@
+"""SQLite post warehouse (alternative to the per-day posts_YYYY-MM-DD.json files)"""
+import glob
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List
+import config
+
+
+class PostWarehouse:
+    """
+    Embedded SQLite store for analyzed posts
+
+    The database runs in WAL mode, so a report can read while a run is
+    writing. Each post is kept whole as JSON, alongside indexed columns for
+    the common filters (subreddit, time, priority, sentiment, category).
+    Every run is saved with one bulk upsert in a single transaction, and a
+    second run on the same day updates its posts in place instead of
+    overwriting the day.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posts (
+            id TEXT PRIMARY KEY,
+            subreddit TEXT NOT NULL,
+            created_utc REAL NOT NULL,
+            run_date TEXT NOT NULL,
+            priority TEXT,
+            sentiment TEXT,
+            polarity REAL,
+            score INTEGER,
+            num_comments INTEGER,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS post_categories (
+            category TEXT NOT NULL,
+            post_id TEXT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+            PRIMARY KEY (category, post_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_posts_subreddit_created ON posts(subreddit, created_utc);
+        CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_utc);
+        CREATE INDEX IF NOT EXISTS idx_posts_priority_created ON posts(priority, created_utc);
+        CREATE INDEX IF NOT EXISTS idx_posts_sentiment_created ON posts(sentiment, created_utc);
+        CREATE INDEX IF NOT EXISTS idx_posts_run_date ON posts(run_date);
+        CREATE INDEX IF NOT EXISTS idx_post_categories_post ON post_categories(post_id);
+    """
+
+    UPSERT = """
+        INSERT INTO posts (id, subreddit, created_utc, run_date, priority, sentiment,
+                           polarity, score, num_comments, data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            subreddit = excluded.subreddit,
+            created_utc = excluded.created_utc,
+            priority = excluded.priority,
+            sentiment = excluded.sentiment,
+            polarity = excluded.polarity,
+            score = excluded.score,
+            num_comments = excluded.num_comments,
+            data = excluded.data
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Database file (defaults to config.WAREHOUSE_FILE)
+        """
+        self.path = path or config.WAREHOUSE_FILE
+        if path is None:
+            config.ensure_directories()
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # Durable at checkpoints; a crash can only lose the last run's commit
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_posts(self, posts: Iterable[Dict], date_str: str = None) -> int:
+        """
+        Insert or update posts in one transaction
+
+        Args:
+            posts: Analyzed post dictionaries
+            date_str: Run date the posts were collected on (defaults to today)
+
+        Returns:
+            Number of posts written
+        """
+        if date_str is None:
+            date_str = datetime.now().strftime('%Y-%m-%d')
+
+        rows, categories, ids = [], [], []
+        for post in posts:
+            ids.append((post['id'],))
+            rows.append((
+                post['id'], post['subreddit'], post['created_utc'], date_str,
+                post.get('priority'), post.get('sentiment'), post.get('polarity'),
+                post.get('score'), post.get('num_comments'), json.dumps(post),
+            ))
+            categories.extend((category, post['id']) for category in post.get('categories', []))
+
+        with self.conn:
+            self.conn.executemany(self.UPSERT, rows)
+            self.conn.executemany('DELETE FROM post_categories WHERE post_id = ?', ids)
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO post_categories (category, post_id) VALUES (?, ?)', categories
+            )
+        return len(rows)
+
+    def query_posts(self, subreddit: str = None, priority: str = None, sentiment: str = None,
+                    category: str = None, since: float = None, until: float = None,
+                    run_date: str = None, limit: int = None) -> List[Dict]:
+        """
+        Posts matching all given filters, newest first
+
+        Args:
+            since, until: ``created_utc`` bounds (inclusive, exclusive)
+            run_date: Only posts collected on this YYYY-MM-DD run date
+        """
+        clauses, params = [], []
+        for column, value in (('subreddit', subreddit), ('priority', priority),
+                              ('sentiment', sentiment), ('run_date', run_date)):
+            if value is not None:
+                clauses.append(f'p.{column} = ?')
+                params.append(value)
+        if since is not None:
+            clauses.append('p.created_utc >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('p.created_utc < ?')
+            params.append(until)
+        if category is not None:
+            clauses.append('p.id IN (SELECT post_id FROM post_categories WHERE category = ?)')
+            params.append(category)
+
+        sql = 'SELECT p.data FROM posts p'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY p.created_utc DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [json.loads(data) for (data,) in self.conn.execute(sql, params)]
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def import_json_files(self, paths: Iterable[str] = None) -> int:
+        """
+        Load existing posts_YYYY-MM-DD.json files (one transaction per file)
+
+        Args:
+            paths: Files to import (defaults to every daily file in DATA_DIR)
+
+        Returns:
+            Number of posts imported
+        """
+        if paths is None:
+            paths = sorted(glob.glob(os.path.join(config.DATA_DIR, 'posts_*.json')))
+        total = 0
+        for path in paths:
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                date_str = data.get('date') or os.path.basename(path)[len('posts_'):-len('.json')]
+                count = self.upsert_posts(data.get('posts', []), date_str)
+                total += count
+                print(f"Imported {count} posts from {path}")
+            except Exception as e:
+                print(f"Error importing {path}: {e}")
+        return total
+
+
+if __name__ == "__main__":
+    # python3 warehouse.py [data/posts_2024-01-01.json ...]
+    warehouse = PostWarehouse()
+    imported = warehouse.import_json_files(sys.argv[1:] or None)
+    print(f"✅ Imported {imported} posts into {warehouse.path} ({warehouse.count()} total)")
+    warehouse.close()